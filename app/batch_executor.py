@@ -0,0 +1,39 @@
+"""Run independent plugin calls in parallel across worker processes."""
+
+import os
+
+def _invoke(call):
+    """Worker entry point: run one call and capture its result or error message."""
+    func, args = call
+    try:
+        return True, func(*args)
+    except Exception as e:
+        return False, str(e)
+
+class BatchExecutor:
+    """Spreads plugin invocations over a reusable ProcessPoolExecutor.
+
+    Results come back in submission order as ``(ok, value)`` pairs, where value is
+    the result or the error message, so one failing call does not abort the batch.
+    """
+
+    def __init__(self, max_workers=None, chunksize=1):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunksize = max(1, chunksize)
+        self._pool = None
+
+    def map(self, func, arg_tuples):
+        """Call ``func(*args)`` for every tuple in ``arg_tuples`` and return the outcomes."""
+        calls = [(func, tuple(args)) for args in arg_tuples]
+        if not calls:
+            return []
+        if self._pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return list(self._pool.map(_invoke, calls, chunksize=self.chunksize))
+
+    def shutdown(self):
+        """Stop the worker processes, if any were started."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
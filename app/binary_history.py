@@ -0,0 +1,224 @@
+"""Binary, memory-mappable history store used as an alternative to the CSV file.
+
+A store is a directory of fixed-width column files in native byte order:
+
+* ``timestamp.i8`` - int64 nanoseconds since the epoch (0 if not known)
+* ``operation.i4`` - int32 operation codes, names listed in ``operations.json``
+* ``a.f8``, ``b.f8``, ``result.f8`` - float64 operands and results (NaN if missing)
+* ``extras.jsonl`` - values that are not plain floats (large integers, batch
+  summaries), one ``{"row", "column", ...}`` object per line
+
+``to_dataframe`` returns the history in the ``history_schema`` dtypes.
+
+Appends only write to the end of each file. Readers map the columns with
+``np.memmap`` and get zero-copy access without parsing any text. If the process
+dies mid-append, rows that are missing from any column are ignored.
+"""
+
+import json
+import os
+import sys
+from array import array
+
+from app.history_buffer import HistoryBuffer
+from app.history_schema import NUMERIC_COLUMNS, build_frame, conform, detail_texts, for_csv, timestamp_ns
+
+class BinaryHistoryStore:
+    """Append-only columnar history stored as raw typed arrays in a directory."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        # fsync every appended file before returning (set by the write-behind writer)
+        self.fsync = False
+        self.operations = self._read_operations()
+        self.codes = {operation: code for code, operation in enumerate(self.operations)}
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _read_operations(self):
+        try:
+            with open(self._path('operations.json'), encoding='utf-8') as operations:
+                return json.load(operations)
+        except (OSError, ValueError):
+            return []
+
+    def _write_operations(self):
+        temp_path = self._path('operations.json.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as operations:
+            json.dump(self.operations, operations)
+        os.replace(temp_path, self._path('operations.json'))
+
+    def __len__(self):
+        sizes = [self._file_size('operation.i4') // 4]
+        sizes += [self._file_size(f'{column}.f8') // 8 for column in NUMERIC_COLUMNS]
+        # Stores written before timestamps were kept have no timestamp column yet
+        if os.path.exists(self._path('timestamp.i8')):
+            sizes.append(self._file_size('timestamp.i8') // 8)
+        return min(sizes)
+
+    def _file_size(self, name):
+        try:
+            return os.path.getsize(self._path(name))
+        except OSError:
+            return 0
+
+    def append(self, records):
+        """Append history records (dicts with operation, a, b and result)."""
+        if not records:
+            return
+        buffer = HistoryBuffer()
+        # Share the store's operation dictionary so buffer codes are store codes
+        buffer.codes = self.codes
+        buffer.operations = self.operations
+        known_operations = len(self.operations)
+        for record in records:
+            buffer.append(record)
+        self._append_columns(buffer.timestamps, buffer.operation_codes, buffer.columns, buffer.exact,
+                             new_operations=len(self.operations) > known_operations)
+
+    def append_frame(self, frame):
+        """Append the rows of a history DataFrame in any layout ``history_schema.conform`` accepts."""
+        import numpy as np
+        import pandas as pd
+
+        if frame.empty:
+            return
+        frame = conform(frame)
+        local_codes, uniques = pd.factorize(frame['operation'].astype(str))
+        known_operations = len(self.operations)
+        mapping = np.array([self._intern(operation) for operation in uniques], dtype=np.int32)
+        operation_codes = mapping[local_codes]
+        columns = {column: frame[column].to_numpy() for column in NUMERIC_COLUMNS}
+        self._append_columns(timestamp_ns(frame['timestamp']), operation_codes, columns, detail_texts(frame['detail']),
+                             new_operations=len(self.operations) > known_operations)
+
+    def _intern(self, operation):
+        code = self.codes.get(operation)
+        if code is None:
+            code = self.codes[operation] = len(self.operations)
+            self.operations.append(operation)
+        return code
+
+    def _append_columns(self, timestamps, operation_codes, columns, exact, new_operations):
+        os.makedirs(self.directory, exist_ok=True)
+        first_row = len(self)
+        if new_operations:
+            self._write_operations()
+        if exact:
+            with open(self._path('extras.jsonl'), 'a', encoding='utf-8') as extras:
+                for (column, row), value in sorted(exact.items(), key=lambda item: item[0][1]):
+                    entry = {'row': first_row + row, 'column': column}
+                    if isinstance(value, int):
+                        entry['int'] = hex(value)  # hex() is linear, unlike str() for big ints
+                    else:
+                        entry['text'] = str(value)
+                    extras.write(json.dumps(entry) + '\n')
+                self._sync(extras)
+        self._append_raw('timestamp.i8', timestamps, 'q', first_row * 8)
+        self._append_raw('operation.i4', operation_codes, 'i', first_row * 4)
+        for column in NUMERIC_COLUMNS:
+            self._append_raw(f'{column}.f8', columns[column], 'd', first_row * 8)
+
+    def _append_raw(self, name, values, typecode, expected_size):
+        with open(self._path(name), 'ab') as column_file:
+            # Drop a partially written tail left by an interrupted append
+            if column_file.tell() != expected_size:
+                column_file.truncate(expected_size)
+                column_file.seek(expected_size)
+            if isinstance(values, array) and values.typecode == typecode:
+                values.tofile(column_file)
+            else:
+                column_file.write(memoryview(values).cast('B'))
+            self._sync(column_file)
+
+    def _sync(self, file):
+        if self.fsync:
+            file.flush()
+            os.fsync(file.fileno())
+
+    def clear(self):
+        """Remove every row but keep the operation dictionary."""
+        for name in ['timestamp.i8', 'operation.i4', 'extras.jsonl'] + \
+                [f'{column}.f8' for column in NUMERIC_COLUMNS]:
+            if os.path.exists(self._path(name)):
+                os.remove(self._path(name))
+
+    def write_frame(self, frame):
+        """Replace the store's contents with a DataFrame."""
+        self.clear()
+        self.append_frame(frame)
+
+    def columns(self):
+        """Return the columns as read-only ``np.memmap`` arrays (zero copy)."""
+        import numpy as np
+
+        rows = len(self)
+        result = {}
+        for column, name, dtype in [('timestamp', 'timestamp.i8', np.int64), ('operation', 'operation.i4', np.int32)] + \
+                [(column, f'{column}.f8', np.float64) for column in NUMERIC_COLUMNS]:
+            if rows == 0:
+                result[column] = np.empty(0, dtype=dtype)
+            elif not os.path.exists(self._path(name)):
+                result[column] = np.zeros(rows, dtype=dtype)  # No timestamps recorded yet
+            else:
+                result[column] = np.memmap(self._path(name), dtype=dtype, mode='r', shape=(rows,))
+        return result
+
+    def extras(self):
+        """Return ``{(column, row): value}`` for values stored out of line."""
+        extras = {}
+        rows = len(self)
+        try:
+            with open(self._path('extras.jsonl'), encoding='utf-8') as extras_file:
+                for line in extras_file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # Torn final line from an interrupted append
+                    if entry['row'] >= rows:
+                        continue
+                    value = int(entry['int'], 16) if 'int' in entry else entry['text']
+                    extras[(entry['column'], entry['row'])] = value
+        except OSError:
+            pass
+        return extras
+
+    def to_dataframe(self):
+        """Build a history DataFrame (categorical operations, float64 values)."""
+        import pandas as pd
+
+        columns = self.columns()
+        operation = pd.Categorical.from_codes(columns['operation'], categories=self.operations) \
+            if len(columns['operation']) else pd.Categorical([])
+        return build_frame(columns['timestamp'], operation, columns, self.extras())
+
+def csv_to_binary(csv_path, directory, chunksize=1_000_000):
+    """Convert a history CSV file into a binary store, reading it in chunks."""
+    import pandas as pd
+
+    store = BinaryHistoryStore(directory)
+    store.clear()
+    # Every field is read as text so large integers stay exact
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize, dtype=object):
+        store.append_frame(chunk.reset_index(drop=True))
+    return store
+
+def binary_to_csv(directory, csv_path):
+    """Write a binary store back out as a history CSV file."""
+    for_csv(BinaryHistoryStore(directory).to_dataframe()).to_csv(csv_path, index=False)
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 3 or argv[0] not in ('to-binary', 'to-csv'):
+        print("Usage: python -m app.binary_history to-binary <history.csv> <store_dir>\n"
+              "       python -m app.binary_history to-csv <store_dir> <history.csv>")
+        return 2
+    if argv[0] == 'to-binary':
+        csv_to_binary(argv[1], argv[2])
+    else:
+        binary_to_csv(argv[1], argv[2])
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
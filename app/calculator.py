@@ -1,7 +1,13 @@
 """Calculator module providing basic arithmetic operations"""
 
+from app.operands import divide_elementwise, is_batch
+
 class Calculator:
-    """A simple calculator that performs basic arithmetic operations"""
+    """A simple calculator that performs basic arithmetic operations
+
+    Operands may be numbers or NumPy arrays; arrays are evaluated elementwise
+    with broadcasting.
+    """
 
     def add(self, a, b):
         """Adds two numbers"""
@@ -16,7 +22,13 @@ class Calculator:
         return a * b
 
     def divide(self, a, b):
-        """Divides the first number by the second number"""
+        """Divides the first number by the second number
+
+        For array operands, elements with a zero divisor are masked in the result
+        instead of raising for the whole batch.
+        """
+        if is_batch(a) or is_batch(b):
+            return divide_elementwise(a, b)
         if b == 0:
             raise ValueError("Cannot divide by zero")
         return a / b
@@ -1,17 +1,21 @@
 from app.commands import AddCommand, SubtractCommand, MultiplyCommand, DivideCommand
 
+class UnknownCommandError(ValueError):
+    """Raised when a command name is not registered."""
+
 class CommandFactory:
     """Factory to create command objects based on command name."""
 
+    COMMANDS = {
+        'add': AddCommand,
+        'subtract': SubtractCommand,
+        'multiply': MultiplyCommand,
+        'divide': DivideCommand,
+    }
+
     @staticmethod
     def create(command_name, calculator):
-        if command_name == 'add':
-            return AddCommand(calculator)
-        elif command_name == 'subtract':
-            return SubtractCommand(calculator)
-        elif command_name == 'multiply':
-            return MultiplyCommand(calculator)
-        elif command_name == 'divide':
-            return DivideCommand(calculator)
-        else:
-            raise ValueError(f"Unknown command: {command_name}")
+        command_class = CommandFactory.COMMANDS.get(command_name)
+        if command_class is None:
+            raise UnknownCommandError(f"Unknown command: {command_name}")
+        return command_class(calculator)
@@ -1,3 +1,5 @@
+from app.operands import parse_operand
+
 class Command:
     """Base class for all commands."""
     def execute(self, *args):
@@ -8,25 +10,25 @@ class AddCommand(Command):
         self.calculator = calculator
 
     def execute(self, a, b):
-        return self.calculator.add(float(a), float(b))
+        return self.calculator.add(parse_operand(a), parse_operand(b))
 
 class SubtractCommand(Command):
     def __init__(self, calculator):
         self.calculator = calculator
 
     def execute(self, a, b):
-        return self.calculator.subtract(float(a), float(b))
+        return self.calculator.subtract(parse_operand(a), parse_operand(b))
 
 class MultiplyCommand(Command):
     def __init__(self, calculator):
         self.calculator = calculator
 
     def execute(self, a, b):
-        return self.calculator.multiply(float(a), float(b))
+        return self.calculator.multiply(parse_operand(a), parse_operand(b))
 
 class DivideCommand(Command):
     def __init__(self, calculator):
         self.calculator = calculator
 
     def execute(self, a, b):
-        return self.calculator.divide(float(a), float(b))
+        return self.calculator.divide(parse_operand(a), parse_operand(b))
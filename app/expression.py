@@ -0,0 +1,142 @@
+"""Compiler for calculator expressions such as ``sqrt(power(3,2)) + 4 / 2``.
+
+Expressions are parsed with ``ast``, checked against a small grammar (numbers,
+``+ - * / **``, unary minus, calls to built-in and plugin functions, the
+constants ``pi`` and ``e`` and the previous result ``ans``) and compiled into
+nested closures. Sub-expressions built only from numbers, constants and the
+built-in arithmetic are evaluated once at compile time; plugin calls always run
+at evaluation time, where the REPL applies its result cache and plugin timeout.
+Compiled expressions are cached by source text, so a repeated line skips
+parsing entirely.
+"""
+
+import ast
+import math
+
+CONSTANTS = {'pi': math.pi, 'e': math.e}
+# Short names for plugin functions
+ALIASES = {'sqrt': 'square_root', 'sin': 'sine', 'cos': 'cosine', 'tan': 'tangent', 'pow': 'power'}
+# Words a line typed without 'calc' can start with and still be taken as an expression
+LEADING_NAMES = frozenset(CONSTANTS) | frozenset(ALIASES) | {'ans'}
+
+class ExpressionError(ValueError):
+    """Raised for expressions outside the supported grammar."""
+
+class CompiledExpression:
+    """A compiled expression; call ``evaluate(ans)`` to run it."""
+
+    def __init__(self, source, function, constant):
+        self.source = source
+        self.function = function
+        # True if the whole expression folded to a single value
+        self.constant = constant
+
+    def evaluate(self, ans=None):
+        return self.function(ans)
+
+class ExpressionCompiler:
+    """Compiles expression text against a calculator and a plugin function resolver.
+
+    ``resolve(name)`` returns the callable for a plugin function or raises ``KeyError``.
+    """
+
+    def __init__(self, calculator, resolve, max_entries=1024):
+        self.resolve = resolve
+        self.max_entries = max_entries
+        self.cache = {}
+        self.hits = 0
+        self.misses = 0
+        self.builtins = {
+            'add': calculator.add,
+            'subtract': calculator.subtract,
+            'multiply': calculator.multiply,
+            'divide': calculator.divide,
+        }
+        self.operators = {
+            ast.Add: calculator.add,
+            ast.Sub: calculator.subtract,
+            ast.Mult: calculator.multiply,
+            ast.Div: calculator.divide,
+        }
+
+    def compile(self, source):
+        """Return the CompiledExpression for ``source``, from the cache if possible."""
+        compiled = self.cache.get(source)
+        if compiled is not None:
+            self.hits += 1
+            return compiled
+        self.misses += 1
+        try:
+            tree = ast.parse(source.strip(), mode='eval')
+        except SyntaxError as e:
+            raise ExpressionError(f"Invalid expression: {source}") from e
+        constant, value = self._compile(tree.body)
+        if constant:
+            compiled = CompiledExpression(source, lambda ans, value=value: value, True)
+        else:
+            compiled = CompiledExpression(source, value, False)
+        if len(self.cache) >= self.max_entries:
+            # Evict the oldest entry; dicts keep insertion order
+            del self.cache[next(iter(self.cache))]
+        self.cache[source] = compiled
+        return compiled
+
+    def evaluate(self, source, ans=None):
+        return self.compile(source).evaluate(ans)
+
+    def _compile(self, node):
+        """Return ``(True, value)`` for a folded constant or ``(False, closure(ans))``."""
+        if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+            return True, float(node.value)
+        if isinstance(node, ast.Name):
+            if node.id in CONSTANTS:
+                return True, CONSTANTS[node.id]
+            if node.id == 'ans':
+                return False, self._ans
+            raise ExpressionError(f"Unknown name: {node.id}")
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+            negate = isinstance(node.op, ast.USub)
+            return self._apply((lambda x: -x) if negate else (lambda x: x), [node.operand], True)
+        if isinstance(node, ast.BinOp):
+            if isinstance(node.op, ast.Pow):
+                func, builtin = self._function('power')
+            elif type(node.op) in self.operators:
+                func, builtin = self.operators[type(node.op)], True
+            else:
+                raise ExpressionError(f"Unsupported operator: {type(node.op).__name__}")
+            return self._apply(func, [node.left, node.right], builtin)
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+            func, builtin = self._function(node.func.id)
+            return self._apply(func, node.args, builtin)
+        raise ExpressionError(f"Unsupported expression element: {ast.unparse(node)}")
+
+    def _function(self, name):
+        """Return ``(func, builtin)``; only built-in arithmetic is folded at compile time."""
+        if name in self.builtins:
+            return self.builtins[name], True
+        try:
+            return self.resolve(ALIASES.get(name, name)), False
+        except KeyError:
+            raise ExpressionError(f"Unknown function: {name}") from None
+
+    @staticmethod
+    def _ans(ans):
+        if ans is None:
+            raise ExpressionError("'ans' has no value yet")
+        return ans
+
+    def _apply(self, func, arg_nodes, builtin):
+        compiled = [self._compile(arg) for arg in arg_nodes]
+        if builtin and all(constant for constant, _ in compiled):
+            try:
+                return True, func(*(value for _, value in compiled))
+            except Exception:
+                pass  # Leave it to raise when evaluated, like any other error
+        getters = [(lambda ans, value=value: value) if constant else value for constant, value in compiled]
+        if len(getters) == 1:
+            first, = getters
+            return False, lambda ans: func(first(ans))
+        if len(getters) == 2:
+            first, second = getters
+            return False, lambda ans: func(first(ans), second(ans))
+        return False, lambda ans: func(*(getter(ans) for getter in getters))
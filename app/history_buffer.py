@@ -0,0 +1,64 @@
+"""Columnar, append-only buffer for calculation history records."""
+
+from array import array
+
+from app.history_schema import NUMERIC_COLUMNS, build_frame, parse_detail, split_value
+
+class HistoryBuffer:
+    """Stores records in typed arrays so appends never copy existing rows.
+
+    Timestamps live in an int64 array, operands and results in float64 arrays,
+    and operation names are interned to integer codes. Text for values that are
+    not plain floats (see ``history_schema``) is kept in a small side table keyed
+    by row.
+    """
+
+    NUMERIC_COLUMNS = NUMERIC_COLUMNS
+
+    def __init__(self):
+        self.codes = {}
+        self.operations = []
+        self.clear()
+
+    def clear(self):
+        """Drop all buffered records but keep the interned operation names."""
+        self.timestamps = array('q')
+        self.operation_codes = array('i')
+        self.columns = {column: array('d') for column in self.NUMERIC_COLUMNS}
+        self.exact = {}
+
+    def __len__(self):
+        return len(self.operation_codes)
+
+    def intern(self, operation):
+        """Return the integer code for an operation name, assigning one if needed."""
+        code = self.codes.get(operation)
+        if code is None:
+            code = self.codes[operation] = len(self.operations)
+            self.operations.append(operation)
+        return code
+
+    def append(self, record):
+        """Append one record with 'operation', 'a', 'b' and 'result' keys.
+
+        'timestamp' (ns since the epoch) and 'detail' are optional.
+        """
+        row = len(self.operation_codes)
+        self.timestamps.append(int(record.get('timestamp') or 0))
+        self.operation_codes.append(self.intern(record['operation']))
+        for column, text in parse_detail(record.get('detail')).items():
+            self.exact[(column, row)] = text
+        for column in self.NUMERIC_COLUMNS:
+            number, text = split_value(record[column])
+            if text is not None:
+                self.exact[(column, row)] = text
+            self.columns[column].append(number)
+
+    def to_dataframe(self):
+        """Build a history DataFrame in the schema's dtypes from the buffered columns."""
+        import numpy as np
+        import pandas as pd
+
+        codes = np.frombuffer(self.operation_codes, dtype=np.intc)
+        operation = pd.Categorical.from_codes(codes, categories=self.operations)
+        return build_frame(self.timestamps, operation, self.columns, self.exact)
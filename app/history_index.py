@@ -0,0 +1,159 @@
+"""Secondary indexes over the history for selective queries without full scans."""
+
+from array import array
+
+from app.history_schema import NUMERIC_COLUMNS, float_column, to_float
+
+class SortedColumn:
+    """A float column kept sorted for range lookups, with a small unsorted tail.
+
+    Appends go to the tail in O(1); once the tail grows past ``merge_threshold``
+    (or the square root of the column size) it is sorted and merged into the
+    main arrays, so appends stay cheap and lookups stay logarithmic.
+    """
+
+    def __init__(self, merge_threshold=1024):
+        import numpy as np
+
+        self.merge_threshold = merge_threshold
+        self.values = np.empty(0, dtype=np.float64)
+        self.rows = np.empty(0, dtype=np.int64)
+        self.tail_values = array('d')
+        self.tail_rows = array('q')
+
+    def extend(self, values, first_row):
+        """Add a block of values for consecutive rows starting at ``first_row``."""
+        import numpy as np
+
+        keep = ~np.isnan(values)
+        rows = np.arange(first_row, first_row + len(values), dtype=np.int64)[keep]
+        self._merge(values[keep], rows)
+
+    def add(self, value, row):
+        if value != value:  # NaN never matches a range
+            return
+        self.tail_values.append(value)
+        self.tail_rows.append(row)
+        if len(self.tail_values) > max(self.merge_threshold, int(len(self.values) ** 0.5)):
+            self.flush()
+
+    def flush(self):
+        """Merge the unsorted tail into the sorted arrays."""
+        import numpy as np
+
+        if self.tail_values:
+            values = np.frombuffer(self.tail_values, dtype=np.float64).copy()
+            rows = np.frombuffer(self.tail_rows, dtype=np.int64).copy()
+            self.tail_values = array('d')
+            self.tail_rows = array('q')
+            self._merge(values, rows)
+
+    def _merge(self, values, rows):
+        import numpy as np
+
+        if not len(values):
+            return
+        values = np.concatenate([self.values, values])
+        rows = np.concatenate([self.rows, rows])
+        order = np.argsort(values, kind='stable')
+        self.values = values[order]
+        self.rows = rows[order]
+
+    def count(self, low, high):
+        """Approximate number of rows in ``[low, high]`` (sorted part plus tail size)."""
+        import numpy as np
+
+        start = np.searchsorted(self.values, low, side='left')
+        stop = np.searchsorted(self.values, high, side='right')
+        return int(stop - start) + len(self.tail_values)
+
+    def rows_between(self, low, high):
+        """Return the row ids whose value lies in ``[low, high]``."""
+        import numpy as np
+
+        start = np.searchsorted(self.values, low, side='left')
+        stop = np.searchsorted(self.values, high, side='right')
+        rows = self.rows[start:stop]
+        if self.tail_values:
+            tail_values = np.frombuffer(self.tail_values, dtype=np.float64)
+            tail_rows = np.frombuffer(self.tail_rows, dtype=np.int64)
+            rows = np.concatenate([rows, tail_rows[(tail_values >= low) & (tail_values <= high)]])
+        return rows
+
+class HistoryIndex:
+    """Per-operation row lists and sorted a/b/result columns, maintained on append.
+
+    Row ids are positions in the history DataFrame. Ranges are inclusive
+    ``(low, high)`` pairs where either end may be None.
+    """
+
+    def __init__(self):
+        self.size = 0
+        self.by_operation = {}
+        self.values = {column: array('d') for column in NUMERIC_COLUMNS}
+        self.sorted = {column: SortedColumn() for column in NUMERIC_COLUMNS}
+
+    @classmethod
+    def from_frame(cls, frame):
+        """Build an index for every row of a history DataFrame."""
+        import numpy as np
+        import pandas as pd
+
+        index = cls()
+        if frame.empty:
+            return index
+        # Categorical operations factorize without comparing strings
+        codes, operations = pd.factorize(frame['operation'])
+        for code, operation in enumerate(operations):
+            index.by_operation[str(operation)] = array('q', np.flatnonzero(codes == code).tolist())
+        for column in NUMERIC_COLUMNS:
+            values, _ = float_column(frame[column])
+            index.values[column].frombytes(values.astype(np.float64).tobytes())
+            index.sorted[column].extend(values, 0)
+        index.size = len(frame)
+        return index
+
+    def add(self, record):
+        """Index one appended record."""
+        row = self.size
+        self.by_operation.setdefault(record['operation'], array('q')).append(row)
+        for column in NUMERIC_COLUMNS:
+            value, _ = to_float(record[column])
+            self.values[column].append(value)
+            self.sorted[column].add(value, row)
+        self.size += 1
+
+    def query(self, operation=None, a=None, b=None, result=None):
+        """Return the sorted row ids matching every given condition."""
+        import numpy as np
+
+        ranges = {column: self._bounds(bounds) for column, bounds in
+                  (('a', a), ('b', b), ('result', result)) if bounds is not None}
+
+        # Start from the most selective condition, then check the rest per candidate
+        candidates = None
+        estimates = [(self.sorted[column].count(*bounds), column) for column, bounds in ranges.items()]
+        if operation is not None:
+            estimates.append((len(self.by_operation.get(operation, ())), 'operation'))
+        if not estimates:
+            return np.arange(self.size, dtype=np.int64)
+        _, driver = min(estimates)
+        if driver == 'operation':
+            candidates = np.frombuffer(self.by_operation.get(operation, array('q')), dtype=np.int64)
+        else:
+            candidates = self.sorted[driver].rows_between(*ranges.pop(driver))
+
+        mask = np.ones(len(candidates), dtype=bool)
+        if operation is not None and driver != 'operation':
+            rows = self.by_operation.get(operation, array('q'))
+            mask &= np.isin(candidates, np.frombuffer(rows, dtype=np.int64)) if rows else False
+        for column, (low, high) in ranges.items():
+            values = np.frombuffer(self.values[column], dtype=np.float64)[candidates]
+            mask &= (values >= low) & (values <= high)
+        return np.sort(candidates[mask])
+
+    @staticmethod
+    def _bounds(bounds):
+        low, high = bounds
+        return (float('-inf') if low is None else float(low),
+                float('inf') if high is None else float(high))
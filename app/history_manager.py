@@ -1,32 +1,310 @@
-from app.pandas_facade import PandasFacade
-import pandas as pd
+import csv
+import math
+import os
+import shutil
+import threading
+import time
+from contextlib import nullcontext
+from app.binary_history import BinaryHistoryStore
+from app.history_buffer import HistoryBuffer
+from app.history_index import HistoryIndex
+from app import history_schema
+from app.history_schema import COLUMNS, NUMERIC_COLUMNS
+from app.history_segments import SegmentedHistory
+from app.history_writer import HistoryWriter
+
+# pandas is imported on first use (see _pandas) so that starting the calculator and
+# running arithmetic or plugin commands does not pay for importing it.
+
+def _pandas():
+    import pandas as pd
+    from app.pandas_facade import PandasFacade
+    return pd, PandasFacade
 
 class HistoryManager:
-    def __init__(self, history_file='data/calculation_history.csv'):
+    def __init__(self, history_file='data/calculation_history.csv', journal=False, backend='csv',
+                 multi_writer=False):
+        if backend not in ('csv', 'binary'):
+            raise ValueError(f"Unknown history backend: {backend}")
+        if multi_writer and backend != 'csv':
+            raise ValueError("Multi-writer mode requires the csv history backend")
         self.history_file = history_file
-        self.history = PandasFacade.load_csv(self.history_file)
+        # The binary backend stores memory-mapped columns in the history_file.bin directory
+        self.store = BinaryHistoryStore(f"{history_file}.bin") if backend == 'binary' else None
+        # In journal mode each record is appended as one line to the journal file
+        # instead of rewriting the whole snapshot; compact() merges the two.
+        self.journal = journal
+        self.journal_file = f"{history_file}.journal"
+        # In multi-writer mode several processes share history_file: each appends
+        # timestamped records to its own segment and reads merge them all
+        self.segments = SegmentedHistory(history_file) if multi_writer else None
+        # New records go to a columnar buffer; the DataFrame is only rebuilt on demand.
+        self.buffer = HistoryBuffer()
+        # With autosave off, records are only persisted when flush() is called
+        self.autosave = True
+        self.pending = []
+        # The CSV is read the first time the history is needed, not at startup
+        self._history = None
+        # Query indexes are built on the first query and then maintained on append
+        self._index = None
+        # Optional write-behind thread (see start_writer); _lock guards pending and the
+        # buffer, _write_lock makes each write to disk happen on its own
+        self.writer = None
+        self.fsync = False
+        self._lock = threading.Lock()
+        self._write_lock = threading.RLock()
+        # Files already checked to be in the schema's layout before appending to them
+        self._current_layout = set()
+
+    @property
+    def loaded(self):
+        """True once the history file has been read into a DataFrame."""
+        return self._history is not None
+
+    @property
+    def history(self):
+        """The full history as a DataFrame, materialized from the buffer when needed."""
+        if self._history is None:
+            with self._write_lock:
+                self._load()
+                # Records flushed before the first load are already on disk
+                self._buffer_pending()
+        if len(self.buffer):
+            self._history = history_schema.concat([self._history, self.buffer.to_dataframe()])
+            self.buffer.clear()
+        return self._history
+
+    @history.setter
+    def history(self, dataframe):
+        self.buffer.clear()
+        self._history = dataframe
+        self._index = None
 
     def load_history(self):
-        self.history = PandasFacade.load_csv(self.history_file)
+        with self._write_lock:
+            self._load()
+            self._index = None
+            with self._lock:
+                self.buffer.clear()
+                self.pending = []
+
+    def _buffer_pending(self):
+        with self._lock:
+            self.buffer.clear()
+            for record in self.pending:
+                self.buffer.append(record)
+
+    def _load(self):
+        if self.store is not None:
+            self._history = self.store.to_dataframe()
+            return
+        if self.segments is not None:
+            with self.segments.locked():
+                self._history = self._load_merged()
+            return
+        history = history_schema.read_csv(self.history_file)
+        if self.journal:
+            history = history_schema.concat([history, history_schema.read_csv(self.journal_file, header=False)])
+        self._history = history
+
+    def _load_merged(self):
+        """Read the snapshot followed by every process's segment in timestamp order."""
+        merged = HistoryBuffer()
+        for row in self.segments.rows():
+            merged.append(dict(zip(COLUMNS, row)))
+        return history_schema.concat([history_schema.read_csv(self.history_file), merged.to_dataframe()])
 
     def save_history(self):
-        PandasFacade.save_csv(self.history, self.history_file)
+        """Write the whole history, replacing the file atomically (temp file + rename)."""
+        with self._write_lock:
+            if self.store is not None:
+                self.store.write_frame(self.history)
+                return
+            self._write_snapshot(self.history)
+
+    def _write_snapshot(self, dataframe):
+        _, PandasFacade = _pandas()
+        temp_path = f"{self.history_file}.tmp"
+        PandasFacade.save_csv(history_schema.for_csv(dataframe), temp_path)
+        if os.path.exists(temp_path):
+            self._replace(temp_path)
 
     def record(self, record):
-        # Ensure the record contains all required fields
-        if all(key in record for key in ['operation', 'a', 'b', 'result']) and not any(pd.isna(value) for value in record.values()):
-            try:
-                # Use PandasFacade to handle DataFrame concatenation
-                new_record = pd.DataFrame([record])
-                self.history = PandasFacade.concat_dataframes(self.history, record)
+        self.record_many([record])
 
-                self.save_history()
+    def record_many(self, records):
+        """Record several calculations with a single write to disk."""
+        # Ensure each record contains all required fields
+        records = [record for record in records if self._is_valid(record)]
+        # Convert to the schema's types (segments from different processes are merged by timestamp)
+        now = time.time_ns()
+        normalized = []
+        for record in records:
+            # A record that does not fit the schema is reported and skipped, not the whole batch
+            try:
+                normalized.append(history_schema.normalize(record, now))
             except Exception as e:
                 print(f"Error recording history: {e}")
+        records = normalized
+        if not records:
+            return
+        try:
+            with self._lock:
+                for record in records:
+                    self.buffer.append(record)
+                    if self._index is not None:
+                        self._index.add(record)
+                self.pending.extend(records)
+
+            if self.autosave:
+                if self.writer is not None:
+                    self.writer.notify(len(records))
+                else:
+                    self.flush()
+        except Exception as e:
+            print(f"Error recording history: {e}")
+
+    @staticmethod
+    def _is_valid(record):
+        return 'operation' in record and all(key in record for key in NUMERIC_COLUMNS) and not any(
+            value is None or (isinstance(value, float) and math.isnan(value)) for value in record.values())
+
+    def flush(self):
+        """Persist records that have not been written yet.
+
+        Journal and binary stores are appended to; the CSV snapshot is copied to a
+        temporary file, extended and renamed over the original, so a crash never
+        leaves a truncated file. That copy is the price of the atomic write: each
+        flush without the journal takes time proportional to the whole history,
+        so large histories should use journal mode (or write-behind batching).
+        With ``fsync`` set, data reaches the disk first.
+        """
+        with self._write_lock:
+            with self._lock:
+                records, self.pending = self.pending, []
+            if not records:
+                return
+            try:
+                if self.store is not None:
+                    self.store.append(records)
+                elif self.segments is not None:
+                    self.segments.append([history_schema.to_row(record) for record in records])
+                elif self.journal:
+                    self._append_journal(records)
+                else:
+                    self._append_snapshot(records)
+            except Exception:
+                with self._lock:
+                    self.pending[:0] = records
+                raise
+
+    def _append_journal(self, records):
+        self._ensure_layout(self.journal_file, header=False)
+        with open(self.journal_file, 'a', newline='', encoding='utf-8') as journal:
+            csv.writer(journal).writerows(history_schema.to_row(record) for record in records)
+            self._sync(journal)
+
+    def _append_snapshot(self, records):
+        self._ensure_layout(self.history_file, header=True)
+        temp_path = f"{self.history_file}.tmp"
+        has_header = os.path.exists(self.history_file) and os.path.getsize(self.history_file) > 0
+        if has_header:
+            shutil.copyfile(self.history_file, temp_path)
+        elif os.path.dirname(self.history_file):
+            os.makedirs(os.path.dirname(self.history_file), exist_ok=True)
+        with open(temp_path, 'a' if has_header else 'w', newline='', encoding='utf-8') as snapshot:
+            writer = csv.writer(snapshot)
+            if not has_header:
+                writer.writerow(COLUMNS)
+            writer.writerows(history_schema.to_row(record) for record in records)
+            self._sync(snapshot)
+        self._replace(temp_path)
+
+    def _ensure_layout(self, path, header):
+        """Migrate a file written before the schema so new rows can be appended to it."""
+        if path not in self._current_layout:
+            if history_schema.migrate(path, header=header):
+                print(f"Migrated {path} to the current history layout (original kept as {path}.bak)")
+            self._current_layout.add(path)
+
+    def _sync(self, file):
+        if self.fsync:
+            file.flush()
+            os.fsync(file.fileno())
+
+    def _replace(self, temp_path):
+        if self.fsync:
+            with open(temp_path, 'rb') as written:
+                os.fsync(written.fileno())
+        os.replace(temp_path, self.history_file)
+
+    def start_writer(self, max_batch=256, max_delay=0.05):
+        """Persist records from a background thread in groups, with fsync on each write."""
+        if self.writer is None:
+            self.fsync = True
+            if self.store is not None:
+                self.store.fsync = True
+            if self.segments is not None:
+                self.segments.fsync = True
+            self.writer = HistoryWriter(self, max_batch=max_batch, max_delay=max_delay).start()
+        return self.writer
+
+    def close(self):
+        """Stop the background writer, if any, and write everything still pending."""
+        if self.writer is not None:
+            self.writer.stop()
+            self.writer = None
+        self.flush()
+
+    def compact(self):
+        """Merge the journal into the snapshot file and start a new, empty journal.
+
+        In multi-writer mode every process's segment is merged into the snapshot
+        and removed, under an exclusive lock that holds off other writers.
+        """
+        with self._write_lock:
+            if self.segments is not None:
+                self.flush()
+                with self.segments.locked(exclusive=True):
+                    history = self._load_merged()
+                    self._write_snapshot(history)
+                    self.segments.remove()
+                self.history = history
+                self._buffer_pending()
+                return
+            with self._lock:
+                self.pending = []
+            self.save_history()
+            if os.path.exists(self.journal_file):
+                os.remove(self.journal_file)
+
+    @property
+    def index(self):
+        """Secondary indexes over the history, built on first use."""
+        if self._index is None:
+            self._index = HistoryIndex.from_frame(self.history)
+        return self._index
+
+    def query(self, operation=None, a=None, b=None, result=None):
+        """Return the history rows matching an operation and inclusive (low, high) ranges.
+
+        Either end of a range may be None. Conditions are combined with AND.
+        """
+        rows = self.index.query(operation=operation, a=a, b=b, result=result)
+        return self.history.iloc[rows]
 
     def get_history(self):
+        _, PandasFacade = _pandas()
         return PandasFacade.get_dataframe_string(self.history)
 
     def clear_history(self):
-        self.history = pd.DataFrame(columns=['operation', 'a', 'b', 'result'])
-        self.save_history()
+        with self._write_lock:
+            self.history = history_schema.empty_frame()
+            with self._lock:
+                self.pending = []
+            with self.segments.locked(exclusive=True) if self.segments is not None else nullcontext():
+                self.save_history()
+                if self.segments is not None:
+                    self.segments.remove()
+            if os.path.exists(self.journal_file):
+                os.remove(self.journal_file)
@@ -0,0 +1,143 @@
+"""Streaming, paginated reads of the history that never load the whole file."""
+
+import csv
+import os
+from contextlib import nullcontext
+from itertools import islice
+
+from app.history_schema import LEGACY_COLUMNS, NUMERIC_COLUMNS, format_detail, to_row
+
+def iter_lines(path, skip_header=False):
+    """Yield the lines of a text file one at a time."""
+    try:
+        with open(path, encoding='utf-8', newline='') as history_file:
+            if skip_header:
+                next(history_file, None)
+            for line in history_file:
+                yield line
+    except FileNotFoundError:
+        return
+
+def tail_lines(path, count, skip_header=False, block_size=64 * 1024):
+    """Return the last ``count`` lines of a file by reading blocks backwards from the end."""
+    if count <= 0:
+        return []
+    try:
+        history_file = open(path, 'rb')
+    except FileNotFoundError:
+        return []
+    with history_file:
+        position = history_file.seek(0, os.SEEK_END)
+        data = b''
+        # One extra newline is needed to know the earliest line is complete
+        while position > 0 and data.count(b'\n') <= count:
+            step = min(block_size, position)
+            position -= step
+            history_file.seek(position)
+            data = history_file.read(step) + data
+    lines = data.decode('utf-8').splitlines(keepends=True)
+    if position == 0 and skip_header and lines:
+        lines = lines[1:]
+    return lines[-count:]
+
+def parse_lines(lines):
+    """Parse CSV lines into lists of field strings."""
+    return csv.reader(lines)
+
+def schema_rows(rows):
+    """Pad rows from files written before the schema to its column order."""
+    for row in rows:
+        yield [''] + row + [''] if len(row) == len(LEGACY_COLUMNS) else row
+
+class HistoryReader:
+    """Serves head/tail/page/since views from the files behind a HistoryManager.
+
+    For the CSV backend the logical history is the snapshot file, then the journal
+    (or, in multi-writer mode, every process's segment merged by timestamp), then
+    records that have not been flushed yet. The binary backend is sliced straight
+    from its memory-mapped columns. Rows are lists of field strings in
+    ``history_schema.COLUMNS`` order.
+    """
+
+    def __init__(self, history_manager):
+        self.history_manager = history_manager
+
+    def _sources(self):
+        manager = self.history_manager
+        sources = [(manager.history_file, True)]
+        if manager.journal:
+            sources.append((manager.journal_file, False))
+        return sources
+
+    def _pending_rows(self):
+        return [[str(field) for field in to_row(record)] for record in self.history_manager.pending]
+
+    def since(self, start):
+        """Yield every row from zero-based row index ``start`` onwards."""
+        store = self.history_manager.store
+        if store is not None:
+            yield from self._store_rows(start, None)
+            return
+        rows = self._iter_rows()
+        yield from islice(rows, start, None)
+
+    def head(self, count):
+        """Yield the first ``count`` rows."""
+        yield from self.page(1, count)
+
+    def page(self, number, size=20):
+        """Yield the rows on one-based page ``number`` of ``size`` rows."""
+        start = (number - 1) * size
+        if self.history_manager.store is not None:
+            yield from self._store_rows(start, start + size)
+            return
+        yield from islice(self._iter_rows(), start, start + size)
+
+    def tail(self, count):
+        """Return the last ``count`` rows, reading only the end of each file."""
+        if self.history_manager.store is not None:
+            total = len(self.history_manager.store) + len(self.history_manager.pending)
+            return list(self._store_rows(max(0, total - count), None))
+        rows = self._pending_rows()[-count:] if count > 0 else []
+        segments = self.history_manager.segments
+        with segments.locked() if segments is not None else nullcontext():
+            if segments is not None and len(rows) < count:
+                rows = segments.tail(count - len(rows)) + rows
+            for path, has_header in reversed(self._sources()):
+                missing = count - len(rows)
+                if missing <= 0:
+                    break
+                rows = list(schema_rows(parse_lines(tail_lines(path, missing, skip_header=has_header)))) + rows
+        return rows
+
+    def _iter_rows(self):
+        segments = self.history_manager.segments
+        # Hold off compaction so no row is seen twice or missed while it moves
+        with segments.locked() if segments is not None else nullcontext():
+            for path, has_header in self._sources():
+                yield from schema_rows(parse_lines(iter_lines(path, skip_header=has_header)))
+            if segments is not None:
+                yield from segments.rows()
+        yield from self._pending_rows()
+
+    def _store_rows(self, start, stop):
+        store = self.history_manager.store
+        stored = len(store)
+        stop_in_store = stored if stop is None else min(stop, stored)
+        if start < stop_in_store:
+            columns = store.columns()
+            extras = store.extras() if os.path.exists(store._path('extras.jsonl')) else {}
+            for row in range(start, stop_in_store):
+                timestamp = int(columns['timestamp'][row])
+                values = [str(timestamp or ''), store.operations[columns['operation'][row]]]
+                texts = {}
+                for column in NUMERIC_COLUMNS:
+                    value = float(columns[column][row])
+                    values.append('' if value != value else repr(value))
+                    if (column, row) in extras:
+                        texts[column] = str(extras[(column, row)])
+                yield values + [format_detail(texts)]
+        pending = self._pending_rows()
+        first_pending = max(0, start - stored)
+        last_pending = len(pending) if stop is None else max(0, stop - stored)
+        yield from pending[first_pending:last_pending]
@@ -0,0 +1,364 @@
+"""Column schema of the calculation history, enforced when recording and loading.
+
+==========  ===============  ==================================================
+column      dtype            contents
+==========  ===============  ==================================================
+timestamp   datetime64[ns]   when the calculation was recorded (NaT for rows
+                             from files written before timestamps were kept)
+operation   category         command name
+a, b        float64          operands, NaN when missing
+result      float64          result
+detail      category         JSON object with the text of values that are not
+                             plain numbers, keyed by column; NaN otherwise
+==========  ===============  ==================================================
+
+A value that is not a number (a ``calc`` expression, a batch or sweep summary)
+is NaN in its float column and kept as text in ``detail``. Integers beyond
+float precision keep their nearest float (±inf beyond the float range) in the
+column and their exact digits, or their large-result summary, in ``detail``. In CSV files timestamps are
+integer nanoseconds since the epoch (0 when unknown) and other missing values
+are empty fields.
+
+Files from before the schema (``operation,a,b,result`` with text operands) are
+converted when loaded and rewritten in the new layout with::
+
+    python -m app.history_schema migrate data/calculation_history.csv
+"""
+
+import csv
+import json
+import math
+import os
+import shutil
+import sys
+
+COLUMNS = ['timestamp', 'operation', 'a', 'b', 'result', 'detail']
+NUMERIC_COLUMNS = ('a', 'b', 'result')
+# Layout of history files written before the schema
+LEGACY_COLUMNS = ['operation', 'a', 'b', 'result']
+# read_csv dtypes for files in the current layout; timestamps become datetime64 afterwards
+CSV_DTYPES = {'timestamp': 'int64', 'operation': 'category', 'a': 'float64', 'b': 'float64',
+              'result': 'float64', 'detail': 'category'}
+CATEGORICAL_COLUMNS = ('operation', 'detail')
+MAX_EXACT_FLOAT_INT = 2 ** 53
+NAN = float('nan')
+
+def to_float(value):
+    """Return ``(number, None)``, or ``(nan, value)`` when value is not exactly a float.
+
+    Missing values (``''``) become NaN; very large integers and non-numeric text are
+    returned as the second item so callers can keep them out of line.
+    """
+    if isinstance(value, float):
+        return value, None
+    if value == '':
+        return NAN, None
+    if isinstance(value, str):
+        digits = value.strip().lstrip('+-')
+        if len(digits) > 15 and digits.isdigit():
+            # Integer text (e.g. a factorial read back from CSV) keeps its exact value
+            try:
+                value = int(value)
+            except ValueError:
+                return NAN, value
+    if isinstance(value, int) and abs(value) > MAX_EXACT_FLOAT_INT:
+        return NAN, value
+    try:
+        return float(value), None
+    except (TypeError, ValueError, OverflowError):
+        return NAN, value
+
+def float_column(series):
+    """Convert a DataFrame column to ``(float64 array, {row: exact value})``.
+
+    Numeric columns convert without copying row by row; object columns (text,
+    large integers) go through ``to_float`` so nothing is silently rounded.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if pd.api.types.is_numeric_dtype(series):
+        return series.to_numpy(dtype=np.float64, na_value=np.nan), {}
+    objects = series.to_numpy(dtype=object)
+    try:
+        values = pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan, copy=True)
+        # Only text, missing values and integers that may exceed float precision need a closer look
+        rows = np.flatnonzero(~(np.abs(values) < MAX_EXACT_FLOAT_INT))
+    except (TypeError, ValueError, OverflowError):
+        values = np.empty(len(series), dtype=np.float64)
+        rows = range(len(series))
+    exact = {}
+    for row in rows:
+        value = objects[row]
+        if value is None or (isinstance(value, float) and value != value):
+            values[row] = np.nan
+            continue
+        values[row], extra = to_float(value)
+        if extra is not None:
+            exact[int(row)] = extra
+    return values, exact
+
+def split_value(value):
+    """Return ``(float, text)`` for an operand or result; text is None for plain numbers."""
+    if type(value) is float:
+        return value, None
+    number, exact = to_float(value)
+    if exact is None:
+        return number, None
+    if isinstance(exact, int):
+        return _nearest_float(exact), _int_text(exact)
+    from app.large_result import LargeResult
+    if isinstance(exact, LargeResult):
+        # The summary goes to detail; the column keeps ±inf so numeric queries still match
+        return _nearest_float(exact.value), str(exact)
+    return number, str(exact)
+
+def _nearest_float(value):
+    try:
+        return float(value)
+    except OverflowError:
+        return math.inf if value > 0 else -math.inf
+
+def _int_text(value):
+    try:
+        return str(value)
+    except ValueError:  # Beyond sys.get_int_max_str_digits()
+        from app.large_result import to_decimal_string
+        return to_decimal_string(value)
+
+def normalize(record, timestamp):
+    """Return a record with the schema's columns: float values, text moved to 'detail'.
+
+    ``timestamp`` (ns since the epoch) is used unless the record has one.
+    """
+    texts = parse_detail(record.get('detail'))
+    normalized = {'timestamp': record.get('timestamp') or timestamp, 'operation': str(record['operation'])}
+    for column in NUMERIC_COLUMNS:
+        normalized[column], text = split_value(record[column])
+        if text is not None:
+            texts[column] = text
+    normalized['detail'] = format_detail(texts)
+    return normalized
+
+def parse_detail(detail):
+    """Return the ``{column: text}`` mapping stored in a detail cell."""
+    if not isinstance(detail, str) or not detail:
+        return {}
+    return json.loads(detail)
+
+def format_detail(texts):
+    return json.dumps(texts) if texts else ''
+
+def to_row(record):
+    """Return a normalized record as CSV fields in column order."""
+    return [record['timestamp'] or 0, record['operation']] + \
+        ['' if record[column] != record[column] else repr(record[column]) for column in NUMERIC_COLUMNS] + \
+        [record['detail']]
+
+def exact_value(frame, row, column):
+    """Return the recorded value of a cell: its detail text (large ints as int) or its float."""
+    text = parse_detail(frame.at[row, 'detail']).get(column)
+    if text is None:
+        return frame.at[row, column]
+    if text.lstrip('-').isdigit():
+        try:
+            return int(text)
+        except ValueError:  # Beyond sys.get_int_max_str_digits()
+            pass
+    return text
+
+def empty_frame():
+    """Return a history DataFrame with no rows."""
+    import numpy as np
+    import pandas as pd
+
+    return pd.DataFrame({
+        'timestamp': np.empty(0, dtype='datetime64[ns]'),
+        'operation': pd.Categorical([]),
+        **{column: np.empty(0, dtype=np.float64) for column in NUMERIC_COLUMNS},
+        'detail': pd.Categorical([]),
+    })
+
+def build_frame(timestamps, operation, columns, texts):
+    """Assemble a history DataFrame from typed columns.
+
+    ``timestamps`` are int64 ns with 0 for unknown, ``operation`` a Categorical,
+    ``columns`` float64 arrays and ``texts`` a ``{(column, row): text}`` table.
+    """
+    import numpy as np
+    import pandas as pd
+
+    rows = len(operation)
+    # Most rows have no detail: code -1 (NaN), and each distinct text is stored once
+    detail_codes = np.full(rows, -1, dtype=np.int32)
+    details = {}
+    by_row = {}
+    for (column, row), text in texts.items():
+        by_row.setdefault(row, {})[column] = text
+    for row, row_texts in by_row.items():
+        ordered = {}
+        for column in NUMERIC_COLUMNS:
+            if column in row_texts:
+                text = row_texts[column]
+                # Binary stores keep large integers as ints
+                ordered[column] = text if isinstance(text, str) else _int_text(text)
+        detail_codes[row] = details.setdefault(format_detail(ordered), len(details))
+    return pd.DataFrame({
+        'timestamp': datetimes(timestamps),
+        'operation': operation,
+        **{column: np.asarray(columns[column], dtype=np.float64) for column in NUMERIC_COLUMNS},
+        'detail': pd.Categorical.from_codes(detail_codes, categories=list(details)),
+    })
+
+def conform(frame):
+    """Convert a DataFrame in any earlier layout (text operands, no timestamp) to the schema."""
+    import numpy as np
+    import pandas as pd
+
+    rows = len(frame)
+    if not rows:
+        return empty_frame()
+    texts = detail_texts(frame['detail']) if 'detail' in frame else {}
+    columns = {}
+    for column in NUMERIC_COLUMNS:
+        if column not in frame:
+            columns[column] = np.full(rows, np.nan)
+            continue
+        columns[column], exact = float_column(frame[column])
+        for row, value in exact.items():
+            columns[column][row], texts[(column, row)] = split_value(value)
+    operation = frame['operation'] if 'operation' in frame else pd.Series([''] * rows)
+    if not isinstance(operation.dtype, pd.CategoricalDtype):
+        operation = operation.astype(str).astype('category')
+    timestamps = timestamp_ns(frame['timestamp']) if 'timestamp' in frame else np.zeros(rows, dtype=np.int64)
+    return build_frame(timestamps, operation.array, columns, texts)
+
+def detail_texts(details):
+    """Return ``{(column, row): text}`` for a detail column."""
+    import numpy as np
+    import pandas as pd
+
+    details = details.to_numpy(dtype=object)
+    texts = {}
+    for row in np.flatnonzero(pd.notna(details)):
+        for column, text in parse_detail(details[row]).items():
+            texts[(column, int(row))] = text
+    return texts
+
+def datetimes(timestamps):
+    """Return int64 ns timestamps as datetime64[ns], with NaT for 0."""
+    import numpy as np
+
+    stamps = np.array(timestamps, dtype=np.int64)
+    stamps[stamps == 0] = np.iinfo(np.int64).min  # NaT
+    return stamps.view('datetime64[ns]')
+
+def timestamp_ns(series):
+    """Return int64 ns timestamps with 0 for unknown ones."""
+    import numpy as np
+    import pandas as pd
+
+    if pd.api.types.is_datetime64_dtype(series):
+        stamps = series.to_numpy(dtype='datetime64[ns]').view(np.int64).copy()
+        stamps[stamps == np.iinfo(np.int64).min] = 0
+        return stamps
+    if pd.api.types.is_integer_dtype(series) and not series.hasnans:
+        return series.to_numpy(dtype=np.int64)
+    return np.array([int(value) if str(value).isdigit() else 0 for value in series], dtype=np.int64)
+
+def concat(frames):
+    """Concatenate history DataFrames, keeping the categorical columns categorical."""
+    import numpy as np
+    import pandas as pd
+    from pandas.api.types import union_categoricals
+
+    frames = [frame for frame in frames if len(frame)]
+    if not frames:
+        return empty_frame()
+    if len(frames) == 1:
+        return frames[0]
+    combined = pd.concat(frames, ignore_index=True)
+    for column in CATEGORICAL_COLUMNS:
+        parts = [frame[column] for frame in frames]
+        named = [part for part in parts if len(part.cat.categories)]
+        if not named:
+            combined[column] = pd.Categorical.from_codes(np.full(len(combined), -1), categories=[])
+            continue
+        # A column without categories (e.g. no detail at all) takes the others' category dtype
+        no_categories = named[0].cat.categories[:0]
+        parts = [part if len(part.cat.categories) else
+                 pd.Series(pd.Categorical.from_codes(part.cat.codes, categories=no_categories)) for part in parts]
+        combined[column] = union_categoricals(parts, ignore_order=True)
+    return combined
+
+def read_csv(path, header=True):
+    """Load a history file (a snapshot with a header, or a headerless journal) in schema form."""
+    import pandas as pd
+    from app.pandas_facade import PandasFacade
+
+    columns = file_columns(path, header)
+    if columns is None:
+        return empty_frame()
+    options = {} if header else {'header': None, 'names': columns}
+    if columns == COLUMNS:
+        try:
+            frame = pd.read_csv(path, dtype=CSV_DTYPES, **options)
+        except (TypeError, ValueError):
+            pass  # A field that does not fit its dtype, e.g. a hand-edited file
+        else:
+            frame['timestamp'] = datetimes(frame['timestamp'].to_numpy())
+            return frame
+    # Older layout: read every field as text so large integers stay exact
+    frame = PandasFacade.load_csv(path, dtype=object, **options)
+    return conform(frame) if len(frame.columns) else empty_frame()
+
+def file_columns(path, header=True):
+    """Return the column layout of a history file, or None if it is missing or empty."""
+    try:
+        with open(path, newline='', encoding='utf-8') as history_file:
+            first = history_file.readline()
+    except FileNotFoundError:
+        return None
+    if not first.strip():
+        return None
+    fields = next(csv.reader([first]))
+    if header:
+        return fields
+    return COLUMNS if len(fields) == len(COLUMNS) else LEGACY_COLUMNS
+
+def for_csv(frame):
+    """Return the DataFrame as written to CSV, with integer ns timestamps."""
+    return frame.assign(timestamp=timestamp_ns(frame['timestamp']))[COLUMNS]
+
+def migrate(path, header=True, backup=True):
+    """Rewrite a history file in the schema's layout; return False if it already was.
+
+    The original is kept as ``<path>.bak`` when ``backup`` is set.
+    """
+    columns = file_columns(path, header)
+    if columns is None or columns == COLUMNS:
+        return False
+    frame = for_csv(read_csv(path, header))
+    temp_path = f"{path}.tmp"
+    frame.to_csv(temp_path, index=False, header=header)
+    if backup:
+        shutil.copy2(path, f"{path}.bak")
+    os.replace(temp_path, path)
+    return True
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) < 2 or argv[0] != 'migrate':
+        print("Usage: python -m app.history_schema migrate <history.csv> [<history.csv.journal> ...]")
+        return 2
+    for path in argv[1:]:
+        # Journals and segments have no header row
+        header = not path.endswith('.journal')
+        if migrate(path, header=header):
+            print(f"Migrated {path} (original kept as {path}.bak)")
+        else:
+            print(f"{path} is already in the current layout")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""Per-process history segments for several calculator processes sharing one history.
+
+Each process appends its records, which start with a nanosecond timestamp, to its
+own segment file ``<history_file>.segments/<host>-<pid>.csv``, so writers never
+interleave or overwrite each other's rows. Readers merge the segments by
+timestamp. Appends hold a shared ``fcntl`` lock on ``<history_file>.lock`` and
+compaction (folding the segments into the snapshot) holds it exclusively, so no
+row can be appended to a segment while it is being merged and removed.
+"""
+
+import contextlib
+import csv
+import heapq
+import os
+import socket
+
+try:
+    import fcntl
+except ImportError:  # Windows: segments still keep writers apart, compaction is not locked
+    fcntl = None
+
+from app.history_reader import tail_lines
+from app.history_schema import COLUMNS
+
+class SegmentedHistory:
+    """The segment files of one history file, and this process's own segment."""
+
+    def __init__(self, history_file, fsync=False):
+        self.directory = f"{history_file}.segments"
+        self.lock_file = f"{history_file}.lock"
+        self.fsync = fsync
+        self.name = f"{socket.gethostname()}-{os.getpid()}.csv"
+
+    @property
+    def path(self):
+        return os.path.join(self.directory, self.name)
+
+    @contextlib.contextmanager
+    def locked(self, exclusive=False):
+        """Hold the history's advisory lock: shared for appends, exclusive for compaction."""
+        if fcntl is None:
+            yield
+            return
+        if os.path.dirname(self.lock_file):
+            os.makedirs(os.path.dirname(self.lock_file), exist_ok=True)
+        with open(self.lock_file, 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def append(self, rows):
+        """Append rows in ``history_schema.COLUMNS`` order to this process's segment."""
+        with self.locked():
+            os.makedirs(self.directory, exist_ok=True)
+            # Opened per write: compaction may have removed the file since the last one
+            with open(self.path, 'a', newline='', encoding='utf-8') as segment:
+                csv.writer(segment).writerows(rows)
+                if self.fsync:
+                    segment.flush()
+                    os.fsync(segment.fileno())
+
+    def paths(self):
+        try:
+            names = sorted(os.listdir(self.directory))
+        except FileNotFoundError:
+            return []
+        return [os.path.join(self.directory, name) for name in names if name.endswith('.csv')]
+
+    def rows(self):
+        """Yield the rows of every segment merged by timestamp, timestamp first."""
+        return heapq.merge(*(self._read(path) for path in self.paths()), key=_timestamp)
+
+    def tail(self, count):
+        """Return the last ``count`` merged rows, reading only the end of each segment."""
+        if count <= 0:
+            return []
+        rows = [_valid_rows(csv.reader(tail_lines(path, count))) for path in self.paths()]
+        return list(heapq.merge(*rows, key=_timestamp))[-count:]
+
+    def remove(self):
+        """Delete all segments; call while holding the exclusive lock."""
+        for path in self.paths():
+            os.remove(path)
+
+    @staticmethod
+    def _read(path):
+        try:
+            with open(path, newline='', encoding='utf-8') as segment:
+                yield from _valid_rows(csv.reader(segment))
+        except FileNotFoundError:
+            return
+
+def _timestamp(row):
+    return int(row[0])
+
+def _valid_rows(rows):
+    """Skip rows a crashed writer left incomplete."""
+    for row in rows:
+        if len(row) == len(COLUMNS) and row[0].isdigit():
+            yield row
@@ -0,0 +1,60 @@
+"""Write-behind persistence for the calculation history."""
+
+import logging
+import threading
+
+class HistoryWriter:
+    """Background thread that flushes a HistoryManager's pending records in groups.
+
+    ``notify`` is called after records are queued. The thread flushes once
+    ``max_batch`` records are waiting or ``max_delay`` seconds after the first
+    one arrived, so a burst of commands costs one write (and one fsync) instead
+    of one per command.
+    """
+
+    def __init__(self, manager, max_batch=256, max_delay=0.05):
+        self.manager = manager
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.queued = 0
+        self.flushes = 0
+        self.stopping = False
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self._run, name='history-writer', daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def notify(self, count):
+        """Tell the writer that ``count`` more records are pending."""
+        with self.condition:
+            self.queued += count
+            # Wake the thread for the first record of a group and when the group is full
+            if self.queued == count or self.queued >= self.max_batch:
+                self.condition.notify()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.queued and not self.stopping:
+                    self.condition.wait()
+                if not self.queued:
+                    return
+                if self.queued < self.max_batch and not self.stopping:
+                    # Let the group fill up, unless it reaches max_batch first
+                    self.condition.wait(self.max_delay)
+                self.queued = 0
+            try:
+                self.manager.flush()
+                self.flushes += 1
+            except Exception as e:
+                # The records stay pending and are retried with the next group or on close
+                logging.error("Background history flush failed: %s", e)
+
+    def stop(self, timeout=None):
+        """Flush what is queued and stop the thread."""
+        with self.condition:
+            self.stopping = True
+            self.condition.notify()
+        self.thread.join(timeout)
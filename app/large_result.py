@@ -0,0 +1,155 @@
+"""Compact handling of very large integer results (factorials, exact powers).
+
+CPython converts ints to decimal text in quadratic time, so a result with a few
+hundred thousand digits takes seconds to print or write to the history CSV.
+Large results are instead summarised by their digit count, leading and trailing
+digits and a SHA-256 of their binary form, all computed in roughly linear time.
+The full decimal text is only produced on request, with a subquadratic
+divide-and-conquer conversion.
+"""
+
+import decimal
+import hashlib
+import math
+import os
+
+EDGE_DIGITS = 20
+LOG10_2 = math.log10(2)
+
+def digit_bits(digits):
+    """Return the bit length above which an int has more than ``digits`` digits."""
+    return int(digits / LOG10_2)
+
+def to_bytes(value):
+    return value.to_bytes(value.bit_length() // 8 + 1, 'little', signed=True)
+
+def from_bytes(data):
+    return int.from_bytes(data, 'little', signed=True)
+
+def to_decimal_string(value):
+    """Convert an int of any size to decimal text in subquadratic time.
+
+    The int is split in halves by bit position and recombined with ``decimal``
+    arithmetic, whose multiplication is fast for huge operands. This also avoids
+    the ``sys.set_int_max_str_digits`` limit.
+    """
+    D = decimal.Decimal
+    powers = {}
+
+    def power_of_two(width):
+        result = powers.get(width)
+        if result is None:
+            if width <= 128:
+                result = D(2) ** width
+            elif width - 1 in powers:
+                result = powers[width - 1] + powers[width - 1]
+            else:
+                half = width >> 1
+                result = power_of_two(half) * power_of_two(width - half)
+            powers[width] = result
+        return result
+
+    def convert(number, width):
+        if width <= 128:
+            return D(number)
+        half = width >> 1
+        high = number >> half
+        low = number - (high << half)
+        return convert(low, half) + convert(high, width - half) * power_of_two(half)
+
+    magnitude = abs(value)
+    with decimal.localcontext() as context:
+        context.prec = decimal.MAX_PREC
+        context.Emax = decimal.MAX_EMAX
+        context.Emin = decimal.MIN_EMIN
+        context.traps[decimal.Inexact] = True
+        text = str(convert(magnitude, magnitude.bit_length()))
+    return '-' + text if value < 0 else text
+
+def _leading_digits(magnitude, count):
+    """Return ``(total digits, first count digits)`` of a positive int without converting it."""
+    shift = max(magnitude.bit_length() - 256, 0)
+    with decimal.localcontext() as context:
+        context.prec = 80
+        margin = decimal.Decimal('1e-30')
+        logarithm = decimal.Decimal(magnitude >> shift).log10() + shift * decimal.Decimal(2).log10()
+        exponent = int(logarithm)
+        fraction = logarithm - exponent
+        if margin < fraction < 1 - margin:
+            digits = exponent + 1
+            scaled = decimal.Decimal(10) ** (fraction + min(count, digits) - 1)
+            # Unless the digits after the leading ones are (nearly) all zeros or
+            # nines, the logarithm is far more precise than the rounding needs
+            if int(scaled - margin) == int(scaled + margin):
+                return digits, str(int(scaled))
+    # Too close to call from the logarithm: compare exactly
+    digits = exponent + 1 if magnitude >= 10 ** exponent else exponent
+    if magnitude >= 10 ** digits:
+        digits += 1
+    return digits, str(magnitude // 10 ** max(digits - count, 0))
+
+class LargeResult:
+    """Summary of a large integer: digits, leading/trailing digits and a hash.
+
+    ``str()`` gives the compact form used for printing and for the history;
+    ``full()`` converts the whole value to decimal text.
+    """
+
+    def __init__(self, value):
+        self.value = value
+        magnitude = abs(value)
+        self.digits, self.leading = _leading_digits(magnitude, EDGE_DIGITS)
+        self.trailing = str(magnitude % 10 ** EDGE_DIGITS).zfill(min(EDGE_DIGITS, self.digits))
+        self.sha256 = hashlib.sha256(to_bytes(value)).hexdigest()
+
+    def __str__(self):
+        sign = '-' if self.value < 0 else ''
+        return f"{sign}{self.leading}...{self.trailing} ({self.digits} digits; sha256:{self.sha256[:16]})"
+
+    def full(self):
+        return to_decimal_string(self.value)
+
+class LargeResultStore:
+    """Decides which results are large and optionally keeps them as binary blobs.
+
+    Integers with more than ``threshold_digits`` digits are wrapped in a
+    ``LargeResult``. With a ``blob_dir`` every large result is also written to
+    ``<blob_dir>/<sha256>.bin`` so it can be shown again in full later.
+    """
+
+    def __init__(self, threshold_digits=1000, blob_dir=None):
+        self.threshold_bits = digit_bits(threshold_digits)
+        self.blob_dir = blob_dir
+        self.last = None
+
+    def wrap(self, value):
+        """Return a LargeResult for large ints, or the value unchanged."""
+        if type(value) is not int or value.bit_length() <= self.threshold_bits:
+            return value
+        large = self.last = LargeResult(value)
+        if self.blob_dir:
+            self.save_blob(large)
+        return large
+
+    def blob_path(self, sha256):
+        return os.path.join(self.blob_dir, f"{sha256}.bin")
+
+    def save_blob(self, large):
+        os.makedirs(self.blob_dir, exist_ok=True)
+        path = self.blob_path(large.sha256)
+        if not os.path.exists(path):
+            with open(path, 'wb') as blob:
+                blob.write(to_bytes(large.value))
+        return path
+
+    def find(self, sha256_prefix=None):
+        """Return the LargeResult with the given hash prefix, or the last one if None."""
+        if sha256_prefix is None or (self.last is not None and self.last.sha256.startswith(sha256_prefix)):
+            return self.last
+        if not self.blob_dir or not os.path.isdir(self.blob_dir):
+            return None
+        for file_name in sorted(os.listdir(self.blob_dir)):
+            if file_name.startswith(sha256_prefix) and file_name.endswith('.bin'):
+                with open(os.path.join(self.blob_dir, file_name), 'rb') as blob:
+                    return LargeResult(from_bytes(blob.read()))
+        return None
@@ -0,0 +1,138 @@
+"""Low-overhead per-command latency histograms."""
+
+import json
+
+PHASES = ('parse', 'dispatch', 'compute', 'record', 'total')
+# Key shared by every command name that is not registered, so typos cannot grow the table
+UNKNOWN_COMMAND = '<unknown>'
+
+class LogHistogram:
+    """Histogram of nanosecond durations in log-linear buckets.
+
+    Values below 16 ns get a bucket each; above that every power of two is split
+    into 8 sub-buckets, so a bucket spans at most 12.5% of its value. Recording
+    is an integer ``bit_length`` and a list increment.
+    """
+
+    SUB_BITS = 3
+    SUB_BUCKETS = 1 << SUB_BITS
+    LINEAR_LIMIT = 2 * SUB_BUCKETS
+
+    def __init__(self):
+        # Enough buckets for durations up to 2**36 ns (about 68 s); longer ones share the last bucket
+        self.counts = [0] * (self.bucket((1 << 36) - 1) + 1)
+        self.total = 0
+        self.max = 0
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    @classmethod
+    def bucket(cls, value):
+        if value < cls.LINEAR_LIMIT:
+            return max(value, 0)
+        shift = value.bit_length() - cls.SUB_BITS - 1
+        # Equal to LINEAR_LIMIT + (shift - 1) * SUB_BUCKETS + (value >> shift) - SUB_BUCKETS
+        return (shift << cls.SUB_BITS) + (value >> shift)
+
+    @classmethod
+    def bucket_bounds(cls, index):
+        """Return the inclusive ``(low, high)`` values covered by a bucket."""
+        if index < cls.LINEAR_LIMIT:
+            return index, index
+        shift, sub = divmod(index - cls.LINEAR_LIMIT, cls.SUB_BUCKETS)
+        shift += 1
+        low = (cls.SUB_BUCKETS + sub) << shift
+        return low, low + (1 << shift) - 1
+
+    def record(self, value):
+        # Inlined bucket() for SUB_BITS = 3; this runs several times per command
+        if value < 16:
+            index = value if value > 0 else 0
+        else:
+            shift = value.bit_length() - 4
+            index = (shift << 3) + (value >> shift)
+        try:
+            self.counts[index] += 1
+        except IndexError:
+            self.counts[-1] += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, percent):
+        """Return the upper bound of the bucket holding the given percentile (capped at max)."""
+        count = self.count
+        if not count:
+            return 0
+        rank = max(1, -(-count * percent // 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self.bucket_bounds(index)[1], self.max)
+        return self.max
+
+    def summary(self):
+        count = self.count
+        return {
+            'count': count,
+            'mean_ns': self.total / count if count else 0,
+            'p50_ns': self.percentile(50),
+            'p95_ns': self.percentile(95),
+            'p99_ns': self.percentile(99),
+            'max_ns': self.max,
+        }
+
+class LatencyStats:
+    """Latency histograms keyed by command and phase.
+
+    The phases are ``parse`` (splitting the input line), ``dispatch`` (registry
+    lookup, logging and output around the command), ``compute`` (the arithmetic
+    or plugin call), ``record`` (appending to the history) and ``total``.
+    """
+
+    def __init__(self):
+        self.histograms = {}
+        # command -> (dispatch, compute, record, total) histograms for record_call()
+        self.calls = {}
+
+    def record(self, command_name, phase, nanoseconds):
+        histogram = self.histograms.get((command_name, phase))
+        if histogram is None:
+            histogram = self.histograms[(command_name, phase)] = LogHistogram()
+        histogram.record(nanoseconds)
+
+    def record_call(self, command_name, dispatch_ns, compute_ns, record_ns, total_ns):
+        """Record the phases of one command with a single lookup."""
+        histograms = self.calls.get(command_name)
+        if histograms is None:
+            histograms = self.calls[command_name] = tuple(
+                self.histograms.setdefault((command_name, phase), LogHistogram())
+                for phase in ('dispatch', 'compute', 'record', 'total'))
+        dispatch, compute, record, total = histograms
+        dispatch.record(dispatch_ns)
+        compute.record(compute_ns)
+        if record_ns:
+            record.record(record_ns)
+        total.record(total_ns)
+
+    def summary(self):
+        """Return ``{command: {phase: stats}}`` in command order."""
+        summary = {}
+        for (command_name, phase), histogram in sorted(self.histograms.items(),
+                                                       key=lambda item: (item[0][0], PHASES.index(item[0][1]))):
+            if not histogram.count:
+                continue
+            summary.setdefault(command_name, {})[phase] = histogram.summary()
+        return summary
+
+    def clear(self):
+        self.histograms.clear()
+        self.calls.clear()
+
+    def dump(self, path):
+        """Write the summary to a JSON file."""
+        with open(path, 'w', encoding='utf-8') as output:
+            json.dump(self.summary(), output, indent=2)
@@ -1,30 +1,188 @@
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
+import threading
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+# Per-command INFO lines ("Executing command", "Recording operation") go through
+# this logger so they can be sampled without touching other messages.
+COMMAND_LOGGER = 'app.commands'
+
+_listener = None
+_queue_handler = None
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """Queue records as they are; the listener thread formats them.
+
+    The stock ``QueueHandler.prepare`` merges the message and arguments in the
+    calling thread. Log arguments here are immutable or not changed after the
+    call, so formatting can safely wait for the listener. Records at
+    ``flush_level`` or above (warnings and errors) are only returned from once
+    the listener has written them, so they appear next to the output of the
+    command that caused them rather than in the middle of a later one.
+    """
+
+    def __init__(self, log_queue, flush_level=logging.WARNING):
+        super().__init__(log_queue)
+        self.flush_level = flush_level
+        self.listener = None
+
+    def prepare(self, record):
+        return record
+
+    def emit(self, record):
+        super().emit(record)
+        if record.levelno >= self.flush_level and self.listener is not None:
+            self.listener.flush()
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """A QueueListener that writes records in bursts.
+
+    When the queue runs dry it flushes its handlers and sleeps for ``interval``
+    seconds, so records that arrive meanwhile are written together instead of
+    waking the listener thread (and contending for the GIL) once per record.
+    """
+
+    def __init__(self, log_queue, *handlers, interval=0.05, **kwargs):
+        super().__init__(log_queue, *handlers, **kwargs)
+        self.interval = interval
+        # Set by flush() to cut the pause short
+        self._wake = threading.Event()
+
+    def dequeue(self, block):
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            if not block:
+                raise
+        for handler in self.handlers:
+            handler.flush()
+        self._wake.wait(self.interval)
+        self._wake.clear()
+        return self.queue.get()
+
+    def flush(self, timeout=1.0):
+        """Wait until every record queued so far has been written (at most ``timeout`` seconds)."""
+        if self._thread is None or threading.current_thread() is self._thread:
+            return
+        written = threading.Event()
+        self.queue.put(written)
+        self._wake.set()
+        written.wait(timeout)
+
+    def handle(self, record):
+        if isinstance(record, threading.Event):
+            # A flush() marker: everything queued before it has been handled
+            for handler in self.handlers:
+                handler.flush()
+            record.set()
+            return
+        super().handle(record)
+
+class BufferedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Size-rotated log file written without a flush per record.
+
+    The listener flushes between bursts and ``close`` flushes the rest. Rollover
+    checks the current file size instead of formatting each record twice, so a
+    file may exceed ``maxBytes`` by the one record written before it rotates.
+    """
+
+    def shouldRollover(self, record):
+        if self.stream is None:
+            self.stream = self._open()
+        return self.maxBytes > 0 and self.stream.tell() >= self.maxBytes
+
+    def emit(self, record):
+        try:
+            if self.shouldRollover(record):
+                self.doRollover()
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+
+class SamplingFilter(logging.Filter):
+    """Keep one in every ``every`` INFO-or-lower records of each message; warnings always pass.
+
+    Counting per message template keeps the lines of one command together: the
+    same commands keep both their "Executing" and their "Recording" line.
+    """
+
+    def __init__(self, every):
+        super().__init__()
+        self.every = every
+        self.seen = {}
+
+    def filter(self, record):
+        if record.levelno > logging.INFO:
+            return True
+        seen = self.seen.get(record.msg, 0)
+        self.seen[record.msg] = seen + 1
+        return seen % self.every == 0
+
+def _no_caller(stack_info=False, stacklevel=1):
+    return "(unknown file)", 0, "(unknown function)", None
+
+def setup_logging(level=None, log_file=None, max_bytes=None, backup_count=None, sample_rate=None):
+    """Configure logging once; later calls return the running listener unchanged.
+
+    Records are put on an in-memory queue by the calling thread and written by
+    a ``QueueListener`` thread, either to stderr or to ``LOG_FILE`` rotated at
+    ``LOG_MAX_BYTES`` (default 10 MiB, ``LOG_BACKUP_COUNT`` files kept).
+    ``LOG_SAMPLE_RATE`` (0-1, default 1) keeps that fraction of the per-command
+    INFO records. Arguments override the environment variables.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return _listener
+
+    level = (level or os.getenv('LOG_LEVEL', 'INFO')).upper()
+    numeric_level = getattr(logging, level, logging.INFO)
+    log_file = log_file or os.getenv('LOG_FILE') or None
+    if max_bytes is None:
+        max_bytes = int(os.getenv('LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+    if backup_count is None:
+        backup_count = int(os.getenv('LOG_BACKUP_COUNT', '3'))
+    if sample_rate is None:
+        sample_rate = float(os.getenv('LOG_SAMPLE_RATE', '1'))
 
-def setup_logging():
-    """Sets up logging configuration using environment variables."""
-
-    # Get logging level and output from environment variables
-    log_level = os.getenv('LOG_LEVEL', 'INFO').upper()  # Default to INFO if not set
-    log_file = os.getenv('LOG_FILE', None)  # File to log to, if set
-    log_format = '%(asctime)s - %(levelname)s - %(message)s'
-    
-    # Configure the logging level based on the environment variable
-    numeric_level = getattr(logging, log_level, logging.INFO)
-    
-    # Basic configuration
     if log_file:
-        logging.basicConfig(
-            level=numeric_level,
-            format=log_format,
-            filename=log_file,
-            filemode='app.logging'  # Append to the log file
-        )
+        handler = BufferedRotatingFileHandler(
+            log_file, mode='a', maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
     else:
-        logging.basicConfig(
-            level=numeric_level,
-            format=log_format
-        )
+        handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    _queue_handler = LazyQueueHandler(queue.SimpleQueue())
+    root = logging.getLogger()
+    root.setLevel(numeric_level)
+    root.addHandler(_queue_handler)
+
+    command_logger = logging.getLogger(COMMAND_LOGGER)
+    # LOG_FORMAT shows no caller, so the per-command logger skips looking it up (the stack
+    # walk is most of the cost of a log call); other loggers are left as they are
+    command_logger.findCaller = _no_caller
+    for old_filter in [f for f in command_logger.filters if isinstance(f, SamplingFilter)]:
+        command_logger.removeFilter(old_filter)
+    if 0 < sample_rate < 1:
+        command_logger.addFilter(SamplingFilter(round(1 / sample_rate)))
+
+    _listener = BatchingQueueListener(_queue_handler.queue, handler, respect_handler_level=True)
+    _queue_handler.listener = _listener
+    _listener.start()
+    atexit.unregister(shutdown_logging)
+    atexit.register(shutdown_logging)
+    return _listener
 
-# Initialize logging at the start of the application
-setup_logging()
+def shutdown_logging():
+    """Flush queued records, stop the listener thread and detach the queue handler."""
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    logging.getLogger().removeHandler(_queue_handler)
+    vars(logging.getLogger(COMMAND_LOGGER)).pop('findCaller', None)
+    _listener = _queue_handler = None
@@ -0,0 +1,91 @@
+"""Parsing and formatting helpers for scalar and array (batch) operands."""
+
+import ast
+import re
+import sys
+
+RANGE_PATTERN = re.compile(r'^range\(([^)]*)\)$')
+# Ints longer than about 4200 digits are slow to write as text (and past Python's
+# 4300-digit limit, impossible), so JSON/CSV output gets their summary instead
+MAX_TEXT_INT_BITS = 14000
+
+def parse_operand(value):
+    """Convert a REPL token or Python value to a float or a NumPy array.
+
+    Accepts numbers, numeric strings, NumPy arrays, lists/tuples/ranges and the
+    literals ``[1,2,3]`` and ``range(start,stop[,step])`` typed without spaces.
+    """
+    if isinstance(value, str):
+        # Fast path: plain numeric tokens are by far the most common operands
+        try:
+            return float(value)
+        except ValueError:
+            pass
+        text = value.strip()
+        if text.startswith('['):
+            import numpy as np
+            try:
+                return np.asarray(ast.literal_eval(text), dtype=np.float64)
+            except (ValueError, SyntaxError, TypeError) as e:
+                raise ValueError(f"Invalid list literal: {value}") from e
+        match = RANGE_PATTERN.match(text)
+        if match:
+            try:
+                bounds = [float(bound) for bound in match.group(1).split(',')]
+            except ValueError as e:
+                raise ValueError(f"Invalid range literal: {value}") from e
+            if not 1 <= len(bounds) <= 3:
+                raise ValueError(f"Invalid range literal: {value}")
+            import numpy as np
+            return np.arange(*bounds, dtype=np.float64)
+        return float(value)
+    if is_batch(value):
+        return value.astype(float, copy=False)
+    if isinstance(value, (list, tuple, range)):
+        import numpy as np
+        return np.asarray(value, dtype=np.float64)
+    return float(value)
+
+def is_batch(value):
+    """Return True if the value is an array operand or result."""
+    # NumPy is only imported once an array literal is used, so nothing can be an
+    # array before that and the check stays free for scalar commands.
+    np = sys.modules.get('numpy')
+    return np is not None and isinstance(value, np.ndarray)
+
+def divide_elementwise(a, b):
+    """Divide arrays elementwise, masking the elements whose divisor is zero."""
+    import numpy as np
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        quotient = np.divide(a, b)
+    return np.ma.masked_where(np.broadcast_to(b == 0, quotient.shape), quotient)
+
+def zero_divisions(result):
+    """Return the number of masked (divide-by-zero) elements of a batch result."""
+    if not is_batch(result):
+        return 0
+    import numpy as np
+    return int(np.ma.count_masked(result)) if isinstance(result, np.ma.MaskedArray) else 0
+
+def summarize(value):
+    """Return a short, fixed-size description of a batch value for the history."""
+    if not is_batch(value):
+        return value
+    import numpy as np
+    if isinstance(value, np.ma.MaskedArray):
+        value = value.filled(np.nan)
+    preview = np.array2string(value, threshold=6, edgeitems=3, separator=',', max_line_width=sys.maxsize,
+                              formatter={'float_kind': lambda x: f"{x:g}"})
+    return f"{preview} (n={value.size})"
+
+def to_builtin(value):
+    """Convert batch results to JSON/CSV friendly lists (masked elements become None)
+    and huge ints to their ``LargeResult`` summary."""
+    if is_batch(value):
+        return value.tolist()
+    if type(value) is int and value.bit_length() > MAX_TEXT_INT_BITS:
+        from app.large_result import LargeResult
+        return str(LargeResult(value))
+    return value
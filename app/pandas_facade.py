@@ -4,10 +4,10 @@ class PandasFacade:
     """A Facade for simplified Pandas data manipulation."""
 
     @staticmethod
-    def load_csv(file_path):
-        """Load data from a CSV file."""
+    def load_csv(file_path, **kwargs):
+        """Load data from a CSV file, passing any extra options to pandas."""
         try:
-            return pd.read_csv(file_path)
+            return pd.read_csv(file_path, **kwargs)
         except Exception as e:
             print(f"Error loading CSV file: {e}")
             return pd.DataFrame()
@@ -0,0 +1,73 @@
+"""Non-interactive mode that evaluates a stream of commands like a unix filter."""
+
+import csv
+import json
+import logging
+from app.operands import to_builtin
+
+class Pipeline:
+    """Reads commands line by line, evaluates them and writes one result row per line.
+
+    Input is consumed lazily so arbitrarily long streams run in constant memory, and
+    history records are flushed in batches of ``flush_every`` instead of per line.
+    """
+
+    FORMATS = ('jsonl', 'csv')
+    # Commands that only make sense at an interactive prompt
+    INTERACTIVE_COMMANDS = {'history', 'clear_history', 'compact_history', 'menu'}
+
+    def __init__(self, repl, output, output_format='jsonl', flush_every=1000):
+        if output_format not in self.FORMATS:
+            raise ValueError(f"Unknown output format: {output_format}")
+        self.repl = repl
+        self.output = output
+        self.output_format = output_format
+        self.flush_every = flush_every
+        self.csv_writer = csv.writer(output) if output_format == 'csv' else None
+
+    def run(self, lines):
+        """Evaluate every command in ``lines`` and return the number of commands processed."""
+        history_manager = self.repl.history_manager
+        self.repl.echo = False
+        history_manager.autosave = False
+        if self.csv_writer:
+            self.csv_writer.writerow(['line', 'command', 'args', 'result', 'error'])
+        processed = 0
+        try:
+            for line_number, line in enumerate(lines, start=1):
+                parsed = self.repl.parse_line(line)
+                if parsed is None or line.lstrip().startswith('#'):
+                    continue
+                command_name, args = parsed
+                if command_name == 'quit':
+                    break
+                self._write(line_number, command_name, args, *self._evaluate(command_name, args))
+                processed += 1
+                if processed % self.flush_every == 0:
+                    history_manager.flush()
+        finally:
+            history_manager.flush()
+            history_manager.autosave = True
+            self.repl.echo = True
+        return processed
+
+    def _evaluate(self, command_name, args):
+        if command_name in self.INTERACTIVE_COMMANDS:
+            return None, f"Command not available in stream mode: {command_name}"
+        try:
+            return to_builtin(self.repl.execute(command_name, args)), None
+        except Exception as e:
+            logging.error("Error executing command '%s': %s", command_name, e)
+            return None, str(e)
+
+    def _write(self, line_number, command_name, args, result, error):
+        if self.csv_writer:
+            self.csv_writer.writerow([line_number, command_name, ' '.join(args),
+                                      '' if result is None else result, error or ''])
+            return
+        row = {'line': line_number, 'command': command_name, 'args': args}
+        if error is None:
+            row['result'] = result
+        else:
+            row['error'] = error
+        self.output.write(json.dumps(row) + '\n')
@@ -1,17 +1,163 @@
+import ast
 import importlib
+import importlib.util
+import json
 import os
 
 class PluginLoader:
-    def __init__(self, plugin_dir='app/plugins'):
+    """Discovers plugins from a cached manifest and imports them on demand.
+
+    The manifest lists each module in ``plugin_dir`` (by default the directory of
+    ``package``) with its public functions and their parameters. It is built by
+    parsing the source files (nothing is imported) and cached on disk, keyed by
+    each file's mtime and size, so only new or changed plugins are parsed again.
+    Modules named ``*_plugin`` (examples and test fixtures) are left out of the
+    manifest, so they provide no commands until loaded by name.
+    """
+
+    MANIFEST_FILE = '.manifest.json'
+    MANIFEST_VERSION = 1
+    EXAMPLE_SUFFIX = '_plugin'
+
+    def __init__(self, plugin_dir=None, package='app.plugins'):
+        if plugin_dir is None:
+            # The package's own directory, whatever the current working directory is
+            plugin_dir = importlib.util.find_spec(package).submodule_search_locations[0]
         self.plugin_dir = plugin_dir
+        self.package = package
+        self.manifest_file = os.path.join(plugin_dir, self.MANIFEST_FILE)
         self.plugins = {}
+        self.manifest = None
+        # (mtime_ns, size) of each loaded plugin's source file when it was imported
+        self.versions = {}
 
     def load_plugin(self, plugin_name):
         try:
-            plugin_module = importlib.import_module(f'app.plugins.{plugin_name}')
-            self.plugins[plugin_name] = plugin_module
+            plugin_module = importlib.import_module(f'{self.package}.{plugin_name}')
+            if self.plugins.get(plugin_name) is not plugin_module:
+                self.plugins[plugin_name] = plugin_module
+                self.versions[plugin_name] = self._version(plugin_module)
         except ImportError:
             raise ImportError(f"Plugin '{plugin_name}' not found.")
 
+    def changed(self):
+        """Return the names of loaded plugins whose source file changed since they were imported."""
+        return [name for name, module in self.plugins.items() if self._version(module) != self.versions.get(name)]
+
+    def reload_plugin(self, plugin_name):
+        """Re-import a loaded plugin with ``importlib.reload`` and forget the cached manifest.
+
+        The new source is recorded as current even if it fails to import, so a
+        broken file is reported once rather than on every call.
+        """
+        module = self.plugins[plugin_name]
+        self.versions[plugin_name] = self._version(module)
+        self.manifest = None
+        # The bytecode cache is validated by whole-second mtime and size, so an edit
+        # within the same second could otherwise reload the old code
+        try:
+            os.remove(importlib.util.cache_from_source(module.__file__))
+        except (OSError, TypeError, ValueError, NotImplementedError):
+            pass
+        self.plugins[plugin_name] = importlib.reload(module)
+
+    @staticmethod
+    def _version(module):
+        try:
+            stat = os.stat(module.__file__)
+        except (OSError, TypeError):
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
     def get_plugins(self):
         return list(self.plugins.keys())
+
+    def scan(self):
+        """Return the plugin manifest, re-parsing only files whose mtime or size changed."""
+        if self.manifest is not None:
+            return self.manifest
+        cached = self._read_manifest()
+        manifest = {}
+        try:
+            file_names = sorted(os.listdir(self.plugin_dir))
+        except OSError:
+            file_names = []
+        for file_name in file_names:
+            if not file_name.endswith('.py') or file_name.startswith('_'):
+                continue
+            module_name = file_name[:-3]
+            if module_name.endswith(self.EXAMPLE_SUFFIX):
+                continue
+            stat = os.stat(os.path.join(self.plugin_dir, file_name))
+            entry = cached.get(module_name)
+            if entry is None or entry['mtime_ns'] != stat.st_mtime_ns or entry['size'] != stat.st_size:
+                entry = {
+                    'mtime_ns': stat.st_mtime_ns,
+                    'size': stat.st_size,
+                    'functions': self._parse_functions(os.path.join(self.plugin_dir, file_name)),
+                }
+            manifest[module_name] = entry
+        if manifest != cached:
+            self._write_manifest(manifest)
+        self.manifest = manifest
+        return manifest
+
+    def commands(self):
+        """Map each plugin function name to the module that provides it.
+
+        When several modules define the same function, the module named after the
+        function wins, otherwise the first module in alphabetical order.
+        """
+        commands = {}
+        for module_name, entry in self.scan().items():
+            for func_name in entry['functions']:
+                if func_name not in commands or module_name == func_name:
+                    commands[func_name] = module_name
+        return commands
+
+    def functions(self, module_name):
+        """Return the public functions of a plugin module; example modules are parsed on request."""
+        entry = self.scan().get(module_name)
+        if entry is not None:
+            return entry['functions']
+        return self._parse_functions(os.path.join(self.plugin_dir, f"{module_name}.py"))
+
+    def function_info(self, func_name, module_name):
+        """Return the manifest entry (params, doc) for one plugin function."""
+        return self.functions(module_name)[func_name]
+
+    @staticmethod
+    def _parse_functions(path):
+        try:
+            with open(path, encoding='utf-8') as source:
+                tree = ast.parse(source.read(), filename=path)
+        except (OSError, SyntaxError, ValueError):
+            return {}
+        functions = {}
+        for node in tree.body:
+            if isinstance(node, ast.FunctionDef) and not node.name.startswith('_'):
+                params = [arg.arg for arg in node.args.args]
+                doc = ast.get_docstring(node) or ''
+                functions[node.name] = {
+                    'params': params,
+                    'arity': len(params),
+                    'doc': doc.strip().splitlines()[0] if doc.strip() else '',
+                }
+        return functions
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_file, encoding='utf-8') as manifest_file:
+                data = json.load(manifest_file)
+        except (OSError, ValueError):
+            return {}
+        if data.get('version') != self.MANIFEST_VERSION:
+            return {}
+        return data.get('plugins', {})
+
+    def _write_manifest(self, manifest):
+        try:
+            with open(self.manifest_file, 'w', encoding='utf-8') as manifest_file:
+                json.dump({'version': self.MANIFEST_VERSION, 'plugins': manifest}, manifest_file, indent=2)
+        except OSError:
+            pass  # A read-only plugin directory just means no cache
@@ -0,0 +1,151 @@
+"""Supervised worker process for plugin calls, with timeouts and cancellation.
+
+Plugin functions such as ``factorial`` run C code that cannot be interrupted
+from Python, so a runaway call in the REPL process could only be stopped by
+killing the session. ``PluginWorker`` runs calls in one long-lived child
+process instead. The parent waits for the reply and can give up on it: after
+the timeout, or when Ctrl-C interrupts the wait, the worker is killed and a new
+one is started for the next call. Fast calls cost one pipe round trip to the
+already running worker.
+"""
+
+import importlib
+import logging
+import multiprocessing
+import signal
+import time
+
+class PluginTimeoutError(TimeoutError):
+    """Raised when a plugin call runs longer than the worker's timeout."""
+
+class PluginCancelledError(RuntimeError):
+    """Raised when a plugin call is cancelled with Ctrl-C."""
+
+def _serve(connection):
+    """Worker process loop: import modules on demand and answer calls until told to stop."""
+    # Ctrl-C reaches the whole foreground process group; the parent decides what to cancel
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    modules = {}
+    while True:
+        try:
+            message = connection.recv()
+        except EOFError:
+            return
+        if message is None:
+            return
+        module_name, func_name, args = message
+        try:
+            module = modules.get(module_name)
+            if module is None:
+                module = modules[module_name] = importlib.import_module(module_name)
+            reply = (True, getattr(module, func_name)(*args))
+        except Exception as e:
+            reply = (False, e)
+        try:
+            connection.send(reply)
+        except Exception as e:
+            # The result or exception could not be pickled
+            connection.send((False, RuntimeError(f"{func_name} returned an unsendable result: {e}")))
+
+class PluginWorker:
+    """Runs plugin calls in a reusable child process.
+
+    ``timeout`` (seconds, None for no limit) bounds each call. Once a call has
+    run for ``progress_after`` seconds, ``progress(func_name, elapsed)`` is
+    called every ``poll_interval`` seconds, and ``progress(func_name, None)``
+    when the call ends.
+    """
+
+    def __init__(self, package='app.plugins', timeout=None, progress=None, progress_after=1.0, poll_interval=0.25):
+        self.package = package
+        self.timeout = timeout
+        self.progress = progress
+        self.progress_after = progress_after
+        self.poll_interval = poll_interval
+        self.process = None
+        self.connection = None
+        self.starts = 0
+
+    def start(self):
+        parent, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_serve, args=(child,),
+                                               name='plugin-worker', daemon=True)
+        self.process.start()
+        child.close()
+        self.connection = parent
+        self.starts += 1
+
+    def call(self, module_name, func_name, args):
+        """Return ``func_name(*args)`` from the plugin module, computed in the worker.
+
+        Exceptions raised by the plugin are re-raised here. Raises
+        PluginTimeoutError or PluginCancelledError if the call is abandoned.
+        """
+        return self.run(f'{self.package}.{module_name}', func_name, args)
+
+    def run(self, module, func_name, args, name=None):
+        """Like ``call``, for a function of any importable module; ``name`` is shown in messages."""
+        if self.process is None or not self.process.is_alive():
+            self.start()
+        self.connection.send((module, func_name, tuple(args)))
+        func_name = name or func_name
+        started = time.monotonic()
+        reporting = False
+        try:
+            first_wait = self.progress_after if self.progress is not None else self.poll_interval
+            if self.timeout is not None:
+                first_wait = min(first_wait, self.timeout)
+            ready = self.connection.poll(first_wait)
+            while not ready:
+                elapsed = time.monotonic() - started
+                if self.timeout is not None and elapsed >= self.timeout:
+                    self.kill()
+                    raise PluginTimeoutError(f"{func_name} timed out after {self.timeout:g} s")
+                if self.progress is not None and elapsed >= self.progress_after:
+                    reporting = True
+                    self.progress(func_name, elapsed)
+                if not self.process.is_alive():
+                    self.kill()
+                    raise RuntimeError(f"Plugin worker exited while running {func_name}")
+                wait = self.poll_interval
+                if self.timeout is not None:
+                    wait = min(wait, max(self.timeout - elapsed, 0))
+                ready = self.connection.poll(wait)
+            ok, value = self.connection.recv()
+        except KeyboardInterrupt:
+            self.kill()
+            raise PluginCancelledError(f"{func_name} cancelled") from None
+        except EOFError:
+            self.kill()
+            raise RuntimeError(f"Plugin worker exited while running {func_name}") from None
+        finally:
+            if reporting:
+                self.progress(func_name, None)
+        if not ok:
+            raise value
+        return value
+
+    def kill(self):
+        """Terminate the worker immediately; the next call starts a new one."""
+        if self.process is None:
+            return
+        logging.warning("Stopping plugin worker (pid %s)", self.process.pid)
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+        self.process = self.connection = None
+
+    def stop(self):
+        """Ask the worker to exit after its current call, e.g. so reloaded plugins are re-imported."""
+        if self.process is None:
+            return
+        try:
+            self.connection.send(None)
+        except OSError:
+            pass
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.connection.close()
+        self.process = self.connection = None
@@ -1,3 +1,24 @@
+import math
+
+# Beyond 2**53 a float no longer holds every integer exactly
+MAX_EXACT_FLOAT_INT = 2 ** 53
+# Exact integer powers are only computed up to this many bits (about 79,000 digits);
+# larger ones would take seconds to minutes and raise OverflowError instead
+MAX_EXACT_BITS = 2 ** 18
+
 def power(base, exponent):
     """Raise a base number to the power of the exponent."""
-    return float(base) ** float(exponent)
+    base, exponent = float(base), float(exponent)
+    whole = base.is_integer() and exponent.is_integer() and exponent >= 0
+    try:
+        result = base ** exponent
+    except OverflowError:
+        if not whole:
+            raise
+        result = math.inf
+    if whole and abs(result) > MAX_EXACT_FLOAT_INT:
+        # Whole-number powers that a float cannot represent exactly are computed as exact ints
+        if exponent * math.log2(abs(base)) > MAX_EXACT_BITS:
+            raise OverflowError(f"power {base:g} {exponent:g} exceeds {MAX_EXACT_BITS} bits")
+        return int(base) ** int(exponent)
+    return result
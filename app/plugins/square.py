@@ -1,3 +1,9 @@
 
 def square(number):
     return float(number) ** 2
+
+def _square_array(numbers):
+    """NumPy kernel for 'sweep'."""
+    return numbers ** 2
+
+square.vectorized = _square_array
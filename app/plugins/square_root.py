@@ -12,3 +12,12 @@ def square_root(number):
         raise ValueError("Cannot calculate the square root of a negative number.")
     
     return math.sqrt(number)
+
+def _square_root_array(numbers):
+    """NumPy kernel for 'sweep'."""
+    import numpy as np
+    if (numbers < 0).any():
+        raise ValueError("Cannot calculate the square root of a negative number.")
+    return np.sqrt(numbers)
+
+square_root.vectorized = _square_root_array
@@ -11,3 +11,20 @@ def cosine(angle):
 def tangent(angle):
     """Calculate the tangent of an angle in degrees."""
     return math.tan(math.radians(float(angle)))
+
+# NumPy kernels for 'sweep'; numpy is imported only when a sweep runs
+def _sine_array(angles):
+    import numpy as np
+    return np.sin(np.radians(angles))
+
+def _cosine_array(angles):
+    import numpy as np
+    return np.cos(np.radians(angles))
+
+def _tangent_array(angles):
+    import numpy as np
+    return np.tan(np.radians(angles))
+
+sine.vectorized = _sine_array
+cosine.vectorized = _cosine_array
+tangent.vectorized = _tangent_array
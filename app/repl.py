@@ -1,113 +1,663 @@
+import atexit
+import functools
 import logging
+import math
+import os
+import re
+import signal
+import sys
+import threading
+from time import monotonic, perf_counter_ns
+from app.batch_executor import BatchExecutor
 from app.calculator import Calculator
 from app.history_manager import HistoryManager
+from app.history_reader import HistoryReader
+from app.history_schema import NUMERIC_COLUMNS, parse_detail
+from app.large_result import LargeResultStore
+from app.latency_stats import UNKNOWN_COMMAND, LatencyStats
 from app.plugin_loader import PluginLoader
-from app.command_factory import CommandFactory
-from app.logging_config import setup_logging  # Ensure logging is set up
-from app.commands import AddCommand, SubtractCommand, MultiplyCommand, DivideCommand
+from app.plugin_worker import PluginCancelledError, PluginWorker
+from app.command_factory import CommandFactory, UnknownCommandError
+from app.expression import LEADING_NAMES, ExpressionCompiler
+from app.logging_config import COMMAND_LOGGER
+from app.operands import is_batch, parse_operand, summarize, zero_divisions
+from app.result_cache import ResultCache
+from app.sweep import run_sweep
+
+HISTORY_ROW_FORMAT = "{:<16}{:>22}{:>22}  {}"
+QUERY_CONDITION = re.compile(r'^(operation|op|a|b|result)(>=|<=|=|>|<)(.+)$')
+STATS_ROW_FORMAT = "{:<16}{:<10}{:>8}{:>11}{:>11}{:>11}{:>11}"
+# Lines that are not a command but contain these are evaluated as expressions
+EXPRESSION_CHARACTERS = frozenset('()+-*/')
+command_log = logging.getLogger(COMMAND_LOGGER)
 
 class REPL:
     def __init__(self):
         self.calculator = Calculator()
-        self.history_manager = HistoryManager()
+        # HISTORY_JOURNAL=true appends records to a journal instead of rewriting the CSV
+        journal = os.getenv('HISTORY_JOURNAL', 'false').lower() in ('1', 'true', 'yes')
+        history_file = os.getenv('HISTORY_FILE', 'data/calculation_history.csv')
+        # HISTORY_BACKEND=binary keeps memory-mapped columns in the HISTORY_FILE.bin directory
+        backend = os.getenv('HISTORY_BACKEND', 'csv').lower()
+        # HISTORY_MULTI_WRITER=true lets several processes share HISTORY_FILE: each appends to
+        # its own segment and the history shows all of them merged by time
+        multi_writer = os.getenv('HISTORY_MULTI_WRITER', 'false').lower() in ('1', 'true', 'yes')
+        self.history_manager = HistoryManager(history_file=history_file, journal=journal, backend=backend,
+                                              multi_writer=multi_writer)
+        # Plain 'history' shows the last HISTORY_SHOW_ROWS records, read from the end of the
+        # files; 'history --all' (or HISTORY_SHOW_ROWS=0) loads and prints the whole history
+        self.history_show_rows = int(os.getenv('HISTORY_SHOW_ROWS', '20'))
+        # HISTORY_WRITE_BEHIND=true persists records from a background thread in fsynced groups
+        # of up to HISTORY_WRITE_BATCH records, at most HISTORY_WRITE_DELAY_MS after the first
+        if os.getenv('HISTORY_WRITE_BEHIND', 'false').lower() in ('1', 'true', 'yes'):
+            self.history_manager.start_writer(
+                max_batch=int(os.getenv('HISTORY_WRITE_BATCH', '256')),
+                max_delay=int(os.getenv('HISTORY_WRITE_DELAY_MS', '50')) / 1000,
+            )
+            atexit.register(self.history_manager.close)
+            self._handle_termination_signals()
         self.plugin_loader = PluginLoader()
-        setup_logging()  # Setup logging based on configuration
+        # Plugin command name -> module providing it, and -> (func, cache) once imported
+        self.plugin_modules = {}
+        self.plugin_functions = {}
+        # Loaded plugins whose file changed are re-imported before their next call, checking
+        # at most every PLUGIN_RELOAD_INTERVAL_MS (PLUGIN_AUTO_RELOAD=false turns this off)
+        self.plugin_reload_interval = None
+        if os.getenv('PLUGIN_AUTO_RELOAD', 'true').lower() in ('1', 'true', 'yes'):
+            self.plugin_reload_interval = int(os.getenv('PLUGIN_RELOAD_INTERVAL_MS', '1000')) / 1000
+        self._next_reload_check = 0.0
+        # PLUGIN_TIMEOUT=<seconds> runs plugin commands in a supervised worker process that is
+        # killed (and restarted for the next call) on timeout or Ctrl-C; long calls show
+        # progress after PLUGIN_PROGRESS_MS
+        self.plugin_worker = None
+        plugin_timeout = float(os.getenv('PLUGIN_TIMEOUT', '0'))
+        if plugin_timeout > 0:
+            self.plugin_worker = PluginWorker(
+                package=self.plugin_loader.package, timeout=plugin_timeout, progress=self._show_progress,
+                progress_after=int(os.getenv('PLUGIN_PROGRESS_MS', '1000')) / 1000)
+        self.batch_executor = BatchExecutor(
+            max_workers=int(os.getenv('BATCH_WORKERS', '0')) or None,
+            chunksize=int(os.getenv('BATCH_CHUNKSIZE', '1')),
+        )
+        # RESULT_CACHE=true memoizes pure plugin functions within the configured budget
+        self.result_cache = None
+        if os.getenv('RESULT_CACHE', 'false').lower() in ('1', 'true', 'yes'):
+            self.result_cache = ResultCache(
+                max_entries=int(os.getenv('RESULT_CACHE_MAX_ENTRIES', '1024')),
+                max_bytes=int(os.getenv('RESULT_CACHE_MAX_BYTES', str(64 * 1024 * 1024))),
+            )
+        # Integers with more than LARGE_RESULT_DIGITS digits are printed and recorded as a
+        # summary; LARGE_RESULT_BLOBS=true also keeps their value in HISTORY_FILE.blobs/
+        self.large_results = LargeResultStore(
+            threshold_digits=int(os.getenv('LARGE_RESULT_DIGITS', '1000')),
+            blob_dir=(f"{history_file}.blobs"
+                      if os.getenv('LARGE_RESULT_BLOBS', 'false').lower() in ('1', 'true', 'yes') else None),
+        )
+        # Print results and status messages; the streaming pipeline turns this off
+        self.echo = True
+        # Expressions compile once per distinct line; 'ans' is the previous expression result
+        self.expressions = ExpressionCompiler(self.calculator, self._expression_function)
+        self.last_result = None
+        # Per-command latency histograms (LATENCY_STATS=false turns them off);
+        # LATENCY_STATS_FILE dumps them as JSON at exit
+        self.latency_stats = None
+        self._compute_ns = None
+        self._record_ns = 0
+        if os.getenv('LATENCY_STATS', 'true').lower() in ('1', 'true', 'yes'):
+            self.latency_stats = LatencyStats()
+            stats_file = os.getenv('LATENCY_STATS_FILE')
+            if stats_file:
+                atexit.register(self.latency_stats.dump, stats_file)
 
-        # Command mappings
+        # Command registry: one dictionary lookup per line for built-ins and plugins.
+        # Arithmetic command objects are created once and reused for every call.
         self.commands = {
-            'add': AddCommand(self.calculator).execute,
-            'subtract': SubtractCommand(self.calculator).execute,
-            'multiply': MultiplyCommand(self.calculator).execute,
-            'divide': DivideCommand(self.calculator).execute,
+            name: self._arithmetic_command(name, CommandFactory.create(name, self.calculator))
+            for name in CommandFactory.COMMANDS
+        }
+        self.commands.update({
             'history': self._show_history,
             'clear_history': self._clear_history,
+            'compact_history': self._compact_history,
+            'query': self._query,
+            'calc': self._calc,
             'load_plugin': self._load_plugin,
+            'reload_plugins': self._reload_plugins,
+            'batch': self._batch,
+            'sweep': self._sweep,
+            'cache_stats': self._cache_stats,
+            'stats': self._stats,
+            'show_result': self._show_result,
             'menu': self._menu,
             'quit': self._quit
-        }
+        })
+        self.builtin_commands = frozenset(self.commands)
+        # Plugin functions are registered from the manifest; modules import on first call
+        self._register_plugin_commands()
+
+    @staticmethod
+    def _handle_termination_signals():
+        """Turn SIGTERM/SIGHUP into a normal exit so queued history is written at exit."""
+        if threading.current_thread() is not threading.main_thread():
+            return
+
+        def terminate(signum, frame):
+            logging.info("Received signal %d, exiting.", signum)
+            sys.exit(128 + signum)
+
+        for name in ('SIGTERM', 'SIGHUP'):
+            if hasattr(signal, name):
+                signal.signal(getattr(signal, name), terminate)
 
     def start(self):
         logging.info("Starting the REPL application.")
         print("Advanced Python Calculator - Type 'menu' to see available commands.")
         while True:
-            user_input = input(">> ").strip().split()
-            if not user_input:
+            line = input(">> ")
+            parse_start = perf_counter_ns()
+            parsed = self.parse_line(line)
+            if parsed is None:
                 continue
-            command_name = user_input[0].lower()
-            args = user_input[1:]
+            command_name, args = parsed
+            if self.latency_stats is not None:
+                self.latency_stats.record(command_name if command_name in self.commands else UNKNOWN_COMMAND,
+                                          'parse', perf_counter_ns() - parse_start)
 
-            # Check if it's a calculator command, if not handle other commands
-            if command_name in ['add', 'subtract', 'multiply', 'divide']:
-                try:
-                    command = CommandFactory.create(command_name, self.calculator)
-                    logging.info(f"Executing command: {command_name} with arguments {args}")
-                    result = command.execute(*args)
-                    if result is not None:
-                        self._record_and_print(command_name, args[0], args[1], result)
-                except Exception as e:
-                    logging.error(f"Error executing command '{command_name}': {e}")
-                    print(f"Error: {e}")
-            elif command_name in self.commands:
-                try:
-                    logging.info(f"Executing command: {command_name} with arguments {args}")
-                    self.commands[command_name](*args)
-                except Exception as e:
-                    logging.error(f"Error executing command '{command_name}': {e}")
-                    print(f"Error: {e}")
-            else:
-                logging.warning(f"Unknown command entered: {command_name}")
+            try:
+                self.execute(command_name, args)
+            except KeyboardInterrupt:
+                logging.warning("Command '%s' interrupted", command_name)
+                print("Cancelled.")
+            except UnknownCommandError:
+                logging.warning("Unknown command entered: %s", command_name)
                 print(f"Unknown command: {command_name}")
+            except Exception as e:
+                logging.error("Error executing command '%s': %s", command_name, e)
+                print(f"Error: {e}")
 
-    def _record_and_print(self, operation, a, b, result):
-        logging.info(f"Recording operation: {operation} with operands {a}, {b} and result {result}")
+    def parse_line(self, line):
+        """Return ``(command_name, args)`` for an input line, or None if it is blank.
+
+        A line that is not a command but contains EXPRESSION_CHARACTERS is an expression
+        for ``calc``, unless it starts with an unknown word, which is a mistyped command.
+        """
+        tokens = line.split()
+        if not tokens:
+            return None
+        command_name = tokens[0].lower()
+        if (command_name not in self.commands and not EXPRESSION_CHARACTERS.isdisjoint(line)
+                and (not tokens[0].isidentifier() or tokens[0] in LEADING_NAMES)):
+            return 'calc', tokens
+        return command_name, tokens[1:]
+
+    def execute(self, command_name, args):
+        """Run a single command and return its result; errors propagate to the caller."""
+        start = perf_counter_ns()
+        handler = self.commands.get(command_name)
+        if handler is None:
+            raise UnknownCommandError(f"Unknown command: {command_name}")
+        command_log.info("Executing command: %s with arguments %s", command_name, args)
+        if self.latency_stats is None:
+            return handler(*args)
+        self._compute_ns = None
+        self._record_ns = 0
+        try:
+            return handler(*args)
+        finally:
+            self._record_latency(command_name, perf_counter_ns() - start)
+
+    def _record_latency(self, command_name, total_ns):
+        """Split one execute() call into dispatch, compute and record time."""
+        record_ns = self._record_ns
+        # Commands that do not time their own computation count as all compute
+        compute_ns = self._compute_ns if self._compute_ns is not None else total_ns - record_ns
+        self.latency_stats.record_call(command_name, total_ns - compute_ns - record_ns,
+                                       compute_ns, record_ns, total_ns)
+
+    def _arithmetic_command(self, command_name, command):
+        """Wrap a reusable arithmetic command object so its result is recorded."""
+        def run(*args):
+            start = perf_counter_ns()
+            result = command.execute(*args)
+            self._compute_ns = perf_counter_ns() - start
+            if is_batch(result):
+                self._record_batch(command_name, args, result)
+            elif result is not None:
+                self._record_and_print(command_name, args[0], args[1], result)
+            return result
+        return run
+
+    def _record(self, operation, a, b, result):
+        start = perf_counter_ns()
+        command_log.info("Recording operation: %s with operands %s, %s and result %s", operation, a, b, result)
         record = {'operation': operation, 'a': a, 'b': b, 'result': result}
         self.history_manager.record(record)
-        print(f"Result: {result}")
+        self._record_ns += perf_counter_ns() - start
 
-    def _show_history(self):
+    def _record_and_print(self, operation, a, b, result):
+        # Large integers are recorded and shown as a summary; 'show_result' prints every digit
+        shown = self.large_results.wrap(result)
+        self._record(operation, a, b, shown)
+        if self.echo:
+            print(f"Result: {shown}")
+
+    def _record_batch(self, operation, args, result):
+        """Record an elementwise batch as a single compact history entry."""
+        a, b = (summarize(parse_operand(arg)) for arg in args[:2])
+        self._record(operation, a, b, summarize(result))
+        if self.echo:
+            print(f"Result: {result}")
+        failed = zero_divisions(result)
+        if failed:
+            logging.warning("Division by zero in %d of %d elements", failed, result.size)
+            if self.echo:
+                print(f"Warning: division by zero in {failed} of {result.size} elements (shown as --)")
+
+    def _show_history(self, *args):
         logging.info("Displaying calculation history.")
+        more = False
+        if args == ('--all',) or (not args and self.history_show_rows <= 0):
+            history = self.history_manager.history
+            rows = history[['operation', 'a', 'b', 'result', 'detail']].itertuples(index=False)
+        else:
+            # Tail and paged views are streamed from the backing files without loading the history
+            if args:
+                rows = self._history_rows(args)
+            else:
+                rows = HistoryReader(self.history_manager).tail(self.history_show_rows + 1)
+                more = len(rows) > self.history_show_rows
+                rows = rows[1:] if more else rows
+            rows = (row[1:] for row in rows)
         print("Calculation History:")
-        print(self.history_manager.get_history())
+        print(HISTORY_ROW_FORMAT.format('operation', 'a', 'b', 'result'))
+        for row in rows:
+            print(HISTORY_ROW_FORMAT.format(*self._history_cells(*row)))
+        if more:
+            print(f"(last {self.history_show_rows} records; 'history --all' shows the whole history)")
+
+    def _history_rows(self, args):
+        """Parse ``--head/--tail/--page/--since N [--size N]`` into a row iterator."""
+        if len(args) % 2:
+            raise ValueError("Usage: history [--all | --head N | --tail N | --page K [--size N] | --since ROW]")
+        options = {}
+        for option, value in zip(args[::2], args[1::2]):
+            if option not in ('--head', '--tail', '--page', '--since', '--size'):
+                raise ValueError(f"Unknown history option: {option}")
+            try:
+                options[option] = int(value)
+            except ValueError:
+                raise ValueError(f"History option {option} expects an integer, got '{value}'")
+            if options[option] < 0 or (option in ('--page', '--size') and options[option] == 0):
+                raise ValueError(f"History option {option} must be positive")
+        size = options.pop('--size', 20)
+        if len(options) != 1:
+            raise ValueError("Use exactly one of --head, --tail, --page or --since")
+        (option, value), = options.items()
+        reader = HistoryReader(self.history_manager)
+        if option == '--head':
+            return reader.head(value)
+        if option == '--tail':
+            return reader.tail(value)
+        if option == '--page':
+            return reader.page(value, size)
+        return reader.since(value)
+
+    def _query(self, *conditions):
+        """Filter the history, e.g. ``query op=divide result>1e6 a>=0 limit=20``."""
+        logging.info("Querying calculation history.")
+        filters, limit = self._parse_query(conditions)
+        matches = self.history_manager.query(**filters)
+        print(f"{len(matches)} matching record(s):")
+        print(HISTORY_ROW_FORMAT.format('operation', 'a', 'b', 'result'))
+        shown = matches if limit is None else matches.head(limit)
+        for row in shown[['operation', 'a', 'b', 'result', 'detail']].itertuples(index=False):
+            print(HISTORY_ROW_FORMAT.format(*self._history_cells(*row)))
+        return matches
+
+    @staticmethod
+    def _history_cells(operation, a, b, result, detail):
+        """Return the shown operation, a, b and result; text kept in detail replaces the float."""
+        texts = parse_detail(detail)
+        cells = [str(operation)]
+        for column, value in zip(NUMERIC_COLUMNS, (a, b, result)):
+            if column in texts:
+                cells.append(texts[column])
+            else:
+                cells.append('' if isinstance(value, float) and math.isnan(value) else str(value))
+        return cells
+
+    @staticmethod
+    def _parse_query(conditions):
+        """Turn ``field<op>value`` tokens into HistoryManager.query keyword arguments."""
+        filters = {}
+        limit = None
+        for condition in conditions:
+            if condition.startswith('limit='):
+                limit = int(condition[len('limit='):])
+                continue
+            match = QUERY_CONDITION.match(condition)
+            if not match:
+                raise ValueError(f"Invalid query condition: {condition} (use e.g. op=divide result>1e6)")
+            field, operator, value = match.groups()
+            if field in ('operation', 'op'):
+                if operator != '=':
+                    raise ValueError("Operations can only be matched with '='")
+                filters['operation'] = value
+                continue
+            number = float(value)
+            low, high = filters.get(field, (None, None))
+            if operator in ('>', '>='):
+                low = math.nextafter(number, math.inf) if operator == '>' else number
+            elif operator in ('<', '<='):
+                high = math.nextafter(number, -math.inf) if operator == '<' else number
+            else:
+                low = high = number
+            filters[field] = (low, high)
+        return filters, limit
 
     def _clear_history(self):
         logging.info("Clearing calculation history.")
         self.history_manager.clear_history()
         print("History cleared.")
 
+    def _compact_history(self):
+        logging.info("Compacting calculation history.")
+        self.history_manager.compact()
+        print("History compacted.")
+
+    def _register_plugin_commands(self):
+        """Register a lazy command for every function in the plugin manifest."""
+        for func_name, module_name in self.plugin_loader.commands().items():
+            self._register_plugin_function(module_name, func_name)
+
+    def _register_plugin_function(self, module_name, func_name):
+        if func_name in self.builtin_commands:
+            logging.warning("Plugin '%s' cannot override built-in command '%s'", module_name, func_name)
+            return
+        self.plugin_modules[func_name] = module_name
+        self.plugin_functions.pop(func_name, None)
+        # Compiled expressions may hold the previous provider
+        self.expressions.cache.clear()
+
+        # Use default arguments to capture current func_name
+        def wrapped_func(*args, func_name=func_name):
+            # Convert arguments to floats and execute the plugin function
+            logging.debug("Executing plugin function '%s' with arguments %s", func_name, args)
+            start = perf_counter_ns()
+            result = self._call_plugin(func_name, *map(float, args))
+            self._compute_ns = perf_counter_ns() - start
+
+            # Record to history
+            self._record_and_print(func_name, *self._plugin_operands(args), result)
+
+            return result  # Return the result instead of printing it
+
+        # Add the wrapped function to REPL commands
+        self.commands[func_name] = wrapped_func
+
+    def _call_plugin(self, func_name, *values):
+        """Return a plugin result from the result cache, the supervised worker or an inline call."""
+        func, cache = self._plugin_function(func_name)
+        result = ResultCache.MISS if cache is None else cache.get((func_name, values))
+        if result is ResultCache.MISS:
+            if self.plugin_worker is None:
+                result = func(*values)
+            else:
+                result = self.plugin_worker.call(self.plugin_modules[func_name], func_name, values)
+            if cache is not None:
+                cache.put((func_name, values), result)
+        return result
+
+    @staticmethod
+    def _plugin_operands(args):
+        """Return the (a, b) history operands for a plugin call."""
+        # Ensure consistent recording data structure
+        a = args[0] if len(args) > 0 else None
+        b = args[1] if len(args) > 1 else ''  # Use empty string for plugins with a single argument
+        return a, b
+
+    def _plugin_function(self, func_name):
+        """Return ``(func, cache)`` for a plugin command, importing its module if needed."""
+        if self.plugin_reload_interval is not None and monotonic() >= self._next_reload_check:
+            self._check_plugin_changes()
+        resolved = self.plugin_functions.get(func_name)
+        if resolved is None:
+            module_name = self.plugin_modules[func_name]
+            if module_name not in self.plugin_loader.plugins:
+                self.plugin_loader.load_plugin(module_name)
+            plugin = self.plugin_loader.plugins[module_name]
+            func = getattr(plugin, func_name)
+            resolved = self.plugin_functions[func_name] = (
+                func, self.result_cache if self._is_pure(plugin, func) else None)
+        return resolved
+
+    @staticmethod
+    def _is_pure(plugin, func):
+        """Plugins opt out of caching with ``cacheable = False`` or ``__cacheable__``."""
+        return getattr(func, 'cacheable', getattr(plugin, '__cacheable__', True))
+
+    def _expression_function(self, func_name):
+        """Return the callable for a plugin function used in an expression."""
+        if func_name not in self.plugin_modules:
+            raise KeyError(func_name)
+        # Cached and supervised like a direct command, so an expression cannot bypass the timeout
+        return functools.partial(self._call_plugin, func_name)
+
+    def _calc(self, *tokens):
+        """Evaluate an expression, e.g. ``calc sqrt(power(3,2)) + 4 / 2``, as one history entry."""
+        source = ' '.join(tokens)
+        if not source:
+            raise ValueError("calc expects an expression, e.g. calc sqrt(power(3,2)) + 4 / 2")
+        if self.plugin_reload_interval is not None and monotonic() >= self._next_reload_check:
+            self._check_plugin_changes()
+        start = perf_counter_ns()
+        result = self.expressions.compile(source).evaluate(self.last_result)
+        self._compute_ns = perf_counter_ns() - start
+        self.last_result = result
+        self._record_and_print('calc', source, '', result)
+        return result
+
     def _load_plugin(self, plugin_name):
         try:
             self.plugin_loader.load_plugin(plugin_name)
             plugin = self.plugin_loader.plugins[plugin_name]
-            
-            # Dynamically add plugin functions to REPL with history saving
-            for func_name in dir(plugin):
-                if not func_name.startswith('_'):
-                    func = getattr(plugin, func_name)
-
-                    # Use default arguments to capture current func and func_name
-                    def wrapped_func(*args, func=func, func_name=func_name):
-                        # Convert arguments to floats and execute the plugin function
-                        logging.debug(f"Executing plugin function '{func_name}' with arguments {args}")
-                        result = func(*map(float, args))
-                        
-                        # Ensure consistent recording data structure
-                        a = args[0] if len(args) > 0 else None
-                        b = args[1] if len(args) > 1 else ''  # Use empty string for plugins with a single argument
-                        
-                        
-                        # Record to history
-                        self._record_and_print(func_name, a, b, result)
-                        
-                        return result  # Return the result instead of printing it
-                    
-                    # Add the wrapped function to REPL commands
-                    self.commands[func_name] = wrapped_func
-
-            print(f"Plugin '{plugin_name}' loaded successfully.")
+
+            # Point the plugin's functions at this module, overriding any other provider
+            for func_name in self._public_functions(plugin):
+                self._register_plugin_function(plugin_name, func_name)
+
+            if self.echo:
+                print(f"Plugin '{plugin_name}' loaded successfully.")
         except ImportError as e:
-            logging.error(f"Failed to load plugin '{plugin_name}': {e}")
+            logging.error("Failed to load plugin '%s': %s", plugin_name, e)
+            if not self.echo:
+                raise
             print(f"Error loading plugin: {e}")
 
+    @staticmethod
+    def _public_functions(plugin):
+        return [func_name for func_name, func in vars(plugin).items()
+                if not func_name.startswith('_') and callable(func)
+                and getattr(func, '__module__', None) == plugin.__name__]
+
+    def _check_plugin_changes(self):
+        """Reload loaded plugins whose files changed; runs at most once per reload interval."""
+        self._next_reload_check = monotonic() + self.plugin_reload_interval
+        changed = self.plugin_loader.changed()
+        if changed:
+            self._reload(changed)
+
+    def _reload_plugins(self):
+        """Reload changed plugins now and register functions added to the plugin directory."""
+        reloaded = self._reload(self.plugin_loader.changed())
+        self.plugin_loader.manifest = None
+        for func_name, module_name in self.plugin_loader.commands().items():
+            if func_name not in self.plugin_modules:
+                self._register_plugin_function(module_name, func_name)
+        if self.echo:
+            print(f"Reloaded plugins: {', '.join(reloaded)}" if reloaded else "No plugin changes.")
+        return reloaded
+
+    def _reload(self, module_names):
+        """Re-import plugin modules and point their commands at the new functions."""
+        # Worker processes and compiled expressions still hold the old code
+        self.batch_executor.shutdown()
+        if self.plugin_worker is not None:
+            self.plugin_worker.stop()
+        self.expressions.cache.clear()
+        reloaded = []
+        for module_name in module_names:
+            provided = [name for name, module in self.plugin_modules.items() if module == module_name]
+            if self.result_cache is not None:
+                self.result_cache.invalidate(provided)
+            for func_name in provided:
+                self.plugin_functions.pop(func_name, None)
+            try:
+                self.plugin_loader.reload_plugin(module_name)
+            except Exception as e:
+                logging.error("Failed to reload plugin '%s': %s", module_name, e)
+                if self.echo:
+                    print(f"Error reloading plugin '{module_name}': {e}")
+                continue
+            logging.info("Reloaded plugin '%s'", module_name)
+            reloaded.append(module_name)
+            # The manifest parses the new source; reload() keeps the module's stale attributes
+            functions = list(self.plugin_loader.functions(module_name))
+            for func_name in functions:
+                if self.plugin_modules.get(func_name, module_name) == module_name:
+                    self._register_plugin_function(module_name, func_name)
+            for func_name in set(provided) - set(functions):
+                # Removed from the plugin: fall back to another provider, if any
+                del self.plugin_modules[func_name]
+                self.commands.pop(func_name, None)
+                other = self.plugin_loader.commands().get(func_name)
+                if other is not None and other != module_name:
+                    self._register_plugin_function(other, func_name)
+        return reloaded
+
+    def _show_progress(self, func_name, elapsed):
+        """Show how long a plugin call has been running; ``elapsed`` None clears the line."""
+        if not self.echo:
+            return
+        if elapsed is None:
+            sys.stderr.write('\r\033[K')
+        else:
+            sys.stderr.write(f"\r{func_name}: running for {elapsed:.1f} s (Ctrl-C to cancel)")
+        sys.stderr.flush()
+
+    def _batch(self, func_name, *arg_groups):
+        """Run a plugin function over many argument groups in parallel worker processes.
+
+        Each group is one call; multiple arguments are separated by commas,
+        e.g. ``batch power 2,10 3,5``.
+        """
+        if func_name not in self.plugin_modules:
+            raise ValueError(f"Unknown plugin function: {func_name}")
+        func, _ = self._plugin_function(func_name)
+        calls = [group.split(',') for group in arg_groups]
+        logging.info("Running batch of %d '%s' calls", len(calls), func_name)
+        arg_tuples = [tuple(map(float, args)) for args in calls]
+        if self.plugin_worker is None:
+            outcomes = self.batch_executor.map(func, arg_tuples)
+        else:
+            # Supervised calls run one at a time in the worker, each within the timeout
+            module_name, outcomes = self.plugin_modules[func_name], []
+            for values in arg_tuples:
+                try:
+                    outcomes.append((True, self.plugin_worker.call(module_name, func_name, values)))
+                except PluginCancelledError:
+                    raise
+                except Exception as e:
+                    outcomes.append((False, str(e)))
+
+        records = []
+        for args, (ok, value) in zip(calls, outcomes):
+            if ok:
+                a, b = self._plugin_operands(args)
+                shown = self.large_results.wrap(value)
+                records.append({'operation': func_name, 'a': a, 'b': b, 'result': shown})
+            else:
+                shown = 'Error: ' + value
+                logging.error("Error executing '%s' with arguments %s: %s", func_name, args, value)
+            if self.echo:
+                print(f"{func_name} {' '.join(args)}: {shown}")
+        self.history_manager.record_many(records)
+        return [value if ok else None for ok, value in outcomes]
+
+    def _sweep(self, func_name, start, stop, step, output=None):
+        """Evaluate a unary plugin function from start to stop (inclusive) in steps, as one history entry.
+
+        Plugins with a ``vectorized`` NumPy kernel are evaluated one chunk at a
+        time; others are called per point. ``output`` ending in ``.npy`` gets an
+        ``(n, 2)`` array of x and result, any other path a CSV file.
+        """
+        if func_name not in self.plugin_modules:
+            raise ValueError(f"Unknown plugin function: {func_name}")
+        func, _ = self._plugin_function(func_name)
+        start_ns = perf_counter_ns()
+        if self.plugin_worker is None:
+            summary = run_sweep(func, float(start), float(stop), float(step), output=output, column=func_name)
+        else:
+            # The whole sweep runs in the supervised worker, under one timeout
+            module = f'{self.plugin_loader.package}.{self.plugin_modules[func_name]}'
+            summary = self.plugin_worker.run('app.sweep', 'run_plugin_sweep',
+                                             (module, func_name, float(start), float(stop), float(step), output),
+                                             name=f"sweep {func_name}")
+        self._compute_ns = perf_counter_ns() - start_ns
+        self._record('sweep', f"{func_name} {start}:{stop}:{step}", output or '', summary)
+        if self.echo:
+            print(f"Result: {summary}")
+            if output:
+                print(f"Sweep written to {output}")
+        return summary
+
+    def _show_result(self, sha256_prefix=None):
+        """Print every digit of the last large result, or of a saved one by hash prefix."""
+        logging.info("Displaying a large result in full.")
+        large = self.large_results.find(sha256_prefix)
+        if large is None:
+            print("No large result to show." if sha256_prefix is None
+                  else f"No saved large result with hash {sha256_prefix} (set LARGE_RESULT_BLOBS=true to keep them).")
+            return
+        print(large.full())
+
+    def _cache_stats(self):
+        logging.info("Displaying result cache statistics.")
+        if self.result_cache is None:
+            print("Result cache is disabled (set RESULT_CACHE=true to enable it).")
+            return
+        stats = self.result_cache.stats()
+        print(f"Hits: {stats['hits']}  Misses: {stats['misses']}  Hit rate: {stats['hit_rate']:.1%}")
+        print(f"Evictions: {stats['evictions']}")
+        print(f"Entries: {stats['entries']}/{stats['max_entries']}  "
+              f"Memory: {stats['bytes']}/{stats['max_bytes']} bytes")
+
+    def _stats(self, *args):
+        """Print per-command latency percentiles; ``stats reset`` clears them."""
+        logging.info("Displaying command latency statistics.")
+        if self.latency_stats is None:
+            print("Latency statistics are disabled (LATENCY_STATS=false).")
+            return
+        if args[:1] == ('reset',):
+            self.latency_stats.clear()
+            print("Latency statistics cleared.")
+            return
+        summary = self.latency_stats.summary()
+        if not summary:
+            print("No commands timed yet.")
+            return
+        print(STATS_ROW_FORMAT.format('command', 'phase', 'count', 'p50', 'p95', 'p99', 'max'))
+        for command_name, phases in summary.items():
+            for phase, stats in phases.items():
+                print(STATS_ROW_FORMAT.format(command_name, phase, stats['count'],
+                                              *(self._format_ns(stats[key]) for key in ('p50_ns', 'p95_ns', 'p99_ns', 'max_ns'))))
+                command_name = ''
+
+    @staticmethod
+    def _format_ns(nanoseconds):
+        if nanoseconds >= 1_000_000:
+            return f"{nanoseconds / 1_000_000:.2f}ms"
+        return f"{nanoseconds / 1_000:.1f}us"
 
     def _menu(self):
         logging.info("Displaying available commands.")
@@ -125,29 +675,35 @@ class REPL:
         print("divide <number1> <number2>     : Divide first number by the second.")
     
         
-        # Plugins with usage examples
+        # Plugins with usage examples, taken from the plugin manifest
         print("\n-- Plugin Commands --")
-        
-        print("square <base> <exponent>        : Raise a base number to the power of 2.")
-        
-        print("power <base> <exponent>        : Raise a base number to the power of the exponent.")
-        
-        print("factorial <number>             : Calculate the factorial of a number.")
-        
-        print("square_root <number>           : Calculate the square root of a number.")
-        
-        print("sine <angle>                   : Calculate the sine of an angle (in degrees).")
-        
-        print("cosine <angle>                 : Calculate the cosine of an angle (in degrees).")
-        
-        print("tangent <angle>                : Calculate the tangent of an angle (in degrees).")
-        
+        for func_name, module_name in sorted(self.plugin_modules.items()):
+            info = self.plugin_loader.function_info(func_name, module_name)
+            usage = ' '.join([func_name] + [f"<{param}>" for param in info['params']])
+            description = info['doc'] or f"Provided by the '{module_name}' plugin."
+            print(f"{usage:<31}: {description}")
+
         # Other available commands
         print("\n-- General Commands --")
-        print("history                        : Display calculation history.")
+        print("history                        : Show the most recent records (HISTORY_SHOW_ROWS, default 20).")
+        print("history --all                  : Display the whole calculation history.")
+        print("history --tail N | --head N    : Show only the last / first N records.")
+        print("history --page K [--size N]    : Show page K of N records (default 20).")
+        print("history --since ROW            : Show records from zero-based row ROW onwards.")
+        print("query <conditions> [limit=N]   : Find records, e.g. query op=divide result>1e6 a>=0")
+        print("calc <expression>              : Evaluate e.g. sqrt(power(3,2)) + 4 / 2 (or type it directly).")
         print("clear_history                  : Clear the calculation history.")
-        print("load_plugin <plugin_name>      : Load a plugin by its name.")
-        print("  \nPluginNames: factorial      power       square_root     trig        square")
+        print("compact_history                : Merge the history journal (or segments) into the CSV file.")
+        print("load_plugin <plugin_name>      : Import a plugin now (plugins also load on first use).")
+        print("reload_plugins                 : Re-import plugins whose files changed.")
+        print("batch <function> <args> ...    : Run a plugin function over many inputs in parallel.")
+        print("  Example: batch factorial 100 200 300    batch power 2,10 3,5")
+        print("sweep <function> <start> <stop> <step> [out.csv|out.npy]: Tabulate a plugin over a range.")
+        print("  Example: sweep sine 0 360 0.01 sine.npy")
+        print("cache_stats                    : Show plugin result cache hit rate and memory use.")
+        print("stats [reset]                  : Show per-command latency percentiles.")
+        print("show_result [hash]             : Print every digit of the last (or a saved) large result.")
+        print(f"  \nPluginNames: {'  '.join(sorted(self.plugin_loader.scan()))}")
         print("  Example: load_plugin square_root\n")
         print("menu                           : Show this menu.")
         print("quit                           : Exit the REPL.")
@@ -155,5 +711,11 @@ class REPL:
 
     def _quit(self):
         logging.info("Exiting the REPL application.")
+        self.batch_executor.shutdown()
+        if self.plugin_worker is not None:
+            self.plugin_worker.stop()
+        self.history_manager.close()
+        if self.history_manager.journal or self.history_manager.segments is not None:
+            self.history_manager.compact()
         print("Goodbye!")
         exit()
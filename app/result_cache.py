@@ -0,0 +1,71 @@
+"""Bounded LRU cache for results of pure plugin functions."""
+
+import sys
+from collections import OrderedDict
+
+class ResultCache:
+    """Least-recently-used cache limited by entry count and by approximate bytes.
+
+    Entries are weighted by ``sys.getsizeof`` of the result, so a huge factorial
+    costs as much of the budget as its digits take in memory. A plugin opts out by
+    setting ``cacheable = False`` on a function or ``__cacheable__ = False`` on
+    its module.
+    """
+
+    MISS = object()
+
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Return the cached value for ``key`` or ``ResultCache.MISS``."""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return self.MISS
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, value):
+        """Cache ``value`` under ``key``, evicting least recently used entries as needed."""
+        size = sys.getsizeof(value)
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+        if key in self.entries:
+            self.bytes_used -= self.entries.pop(key)[1]
+        self.entries[key] = (value, size)
+        self.bytes_used += size
+        while len(self.entries) > self.max_entries or self.bytes_used > self.max_bytes:
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.bytes_used -= evicted_size
+            self.evictions += 1
+
+    def invalidate(self, func_names=None):
+        """Drop cached results for the given function names, or everything if None."""
+        if func_names is None:
+            self.entries.clear()
+            self.bytes_used = 0
+            return
+        for key in [key for key in self.entries if key[0] in func_names]:
+            self.bytes_used -= self.entries.pop(key)[1]
+
+    def stats(self):
+        """Return hit/miss counters and memory usage as a dictionary."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': len(self.entries),
+            'max_entries': self.max_entries,
+            'bytes': self.bytes_used,
+            'max_bytes': self.max_bytes,
+        }
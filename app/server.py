@@ -0,0 +1,181 @@
+"""asyncio TCP server exposing the calculator and its plugins as JSON lines."""
+
+import asyncio
+import functools
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.command_factory import CommandFactory, UnknownCommandError
+from app.operands import to_builtin
+from app.plugin_worker import PluginWorker
+from app.result_cache import ResultCache
+
+class _RecordCollector:
+    """Stands in for the REPL's HistoryManager so records can be queued instead of written."""
+
+    def __init__(self):
+        self.records = []
+
+    def record(self, record):
+        self.records.append(record)
+
+    def record_many(self, records):
+        self.records.extend(records)
+
+class CalculatorServer:
+    """Serves arithmetic and plugin commands to many clients over local TCP.
+
+    Each request is one line: either JSON (``{"id": 1, "command": "add", "args": [1, 2]}``)
+    or plain text (``add 1 2``). Each response is one JSON line with ``result`` or
+    ``error``. A connection handles one request at a time and waits for its reply
+    to drain, which gives per-connection backpressure. History records go through a
+    bounded queue to a single writer task, so clients never share disk writes.
+    Plugin calls run in a thread pool so a slow one cannot stall the event loop; when
+    the REPL has a supervised plugin worker, each pool thread gets its own.
+    """
+
+    def __init__(self, repl, host='127.0.0.1', port=8765, queue_size=1024, workers=None,
+                 write_batch=256):
+        self.repl = repl
+        self.host = host
+        self.port = port
+        self.queue_size = queue_size
+        self.write_batch = write_batch
+        self.history_manager = repl.history_manager
+        self.collector = _RecordCollector()
+        repl.history_manager = self.collector
+        repl.echo = False
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='calc-plugin')
+        # With PLUGIN_TIMEOUT set, each executor thread runs plugin calls in its own supervised worker
+        self._local = threading.local()
+        self._plugin_workers = []
+        self._plugin_workers_lock = threading.Lock()
+        # A single thread owns all writes to the HistoryManager
+        self.history_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='calc-history')
+        self.history_queue = None
+        self.server = None
+        self._writer_task = None
+
+    async def start(self):
+        """Start listening and the history writer; returns the bound (host, port)."""
+        self.history_queue = asyncio.Queue(maxsize=self.queue_size)
+        self._writer_task = asyncio.create_task(self._history_writer())
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        self.host, self.port = self.server.sockets[0].getsockname()[:2]
+        logging.info("Calculator server listening on %s:%s", self.host, self.port)
+        return self.host, self.port
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def stop(self):
+        """Stop accepting clients, write every queued record and release the workers."""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self._writer_task is not None:
+            await self.history_queue.join()
+            self._writer_task.cancel()
+            self._writer_task = None
+        self.executor.shutdown(wait=True)
+        self.history_executor.shutdown(wait=True)
+        for worker in self._plugin_workers:
+            worker.stop()
+        self._plugin_workers = []
+
+    async def handle_client(self, reader, writer):
+        peer = writer.get_extra_info('peername')
+        logging.info("Client connected: %s", peer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                response = await self.handle_request(line.decode('utf-8', errors='replace'))
+                writer.write((json.dumps(response) + '\n').encode('utf-8'))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            logging.info("Client disconnected: %s", peer)
+
+    async def handle_request(self, line):
+        """Evaluate one request line and return the response dictionary."""
+        request_id = None
+        try:
+            if line.lstrip().startswith('{'):
+                request = json.loads(line)
+                request_id = request.get('id')
+                command_name = str(request['command']).lower()
+                args = [str(arg) for arg in request.get('args', [])]
+            else:
+                tokens = line.split()
+                command_name, args = tokens[0].lower(), tokens[1:]
+            result = await self.evaluate(command_name, args)
+            response = {'result': to_builtin(result)}
+        except Exception as e:
+            response = {'error': str(e)}
+        if request_id is not None:
+            response['id'] = request_id
+        return response
+
+    async def evaluate(self, command_name, args):
+        """Run an arithmetic or plugin command and queue its history record."""
+        if command_name in CommandFactory.COMMANDS:
+            # Cheap built-ins run inline; the event loop is single threaded, so the
+            # collector only ever holds this command's records.
+            result = self.repl.execute(command_name, args)
+            records, self.collector.records = self.collector.records, []
+        elif command_name in self.repl.plugin_modules:
+            func, cache = self.repl._plugin_function(command_name)
+            values = tuple(map(float, args))
+            result = ResultCache.MISS if cache is None else cache.get((command_name, values))
+            if result is ResultCache.MISS:
+                if self.repl.plugin_worker is not None:
+                    func = functools.partial(self._supervised_call, command_name)
+                result = await asyncio.get_running_loop().run_in_executor(self.executor, func, *values)
+                if cache is not None:
+                    cache.put((command_name, values), result)
+            a, b = self.repl._plugin_operands(args)
+            shown = self.repl.large_results.wrap(result)
+            records = [{'operation': command_name, 'a': a, 'b': b, 'result': shown}]
+        else:
+            raise UnknownCommandError(f"Unknown command: {command_name}")
+        for record in records:
+            await self.history_queue.put(record)
+        return result
+
+    def _supervised_call(self, func_name, *values):
+        """Run a plugin call in this executor thread's worker process, within the REPL's timeout."""
+        worker = getattr(self._local, 'worker', None)
+        if worker is None:
+            supervisor = self.repl.plugin_worker
+            worker = self._local.worker = PluginWorker(package=supervisor.package, timeout=supervisor.timeout)
+            with self._plugin_workers_lock:
+                self._plugin_workers.append(worker)
+        return worker.call(self.repl.plugin_modules[func_name], func_name, values)
+
+    async def _history_writer(self):
+        """Drain the history queue in groups and write them from one thread."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.history_queue.get()]
+            while len(batch) < self.write_batch and not self.history_queue.empty():
+                batch.append(self.history_queue.get_nowait())
+            try:
+                await loop.run_in_executor(self.history_executor, self.history_manager.record_many, batch)
+            except Exception as e:
+                logging.error("Error writing history: %s", e)
+            finally:
+                for _ in batch:
+                    self.history_queue.task_done()
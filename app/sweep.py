@@ -0,0 +1,96 @@
+"""Evaluate a unary plugin function over an evenly spaced grid (``sweep`` command).
+
+A plugin function can provide a NumPy kernel as its ``vectorized`` attribute,
+e.g. ``sine.vectorized = lambda degrees: np.sin(np.radians(degrees))``; the
+grid is then evaluated one chunk at a time with a single NumPy call per chunk.
+Other functions are called element by element in a tight ``np.fromiter`` loop.
+Chunks are written to the output as they are computed, so memory use does not
+grow with the size of the grid.
+"""
+
+import importlib
+import math
+
+# Points evaluated (and written) per chunk
+CHUNK_SIZE = 1 << 16
+# Values shown at each end of the history summary, like operands.summarize
+EDGE_ITEMS = 3
+
+def grid_size(start, stop, step):
+    """Return the number of points of ``start, start + step, ...`` up to and including ``stop``."""
+    if step == 0 or not all(map(math.isfinite, (start, stop, step))):
+        raise ValueError("Sweep bounds must be finite and the step non-zero")
+    if (stop - start) / step < 0:
+        raise ValueError("Sweep step must go from start towards stop")
+    intervals = (stop - start) / step
+    # Tolerate rounding, e.g. 360 / 0.01 = 35999.999999999996
+    return int(math.floor(intervals + 1e-9)) + 1
+
+def chunks(func, start, stop, step, chunk_size=CHUNK_SIZE):
+    """Yield ``(x, y)`` float64 arrays for consecutive chunks of the grid."""
+    import numpy as np
+
+    count = grid_size(start, stop, step)
+    kernel = getattr(func, 'vectorized', None)
+    for first in range(0, count, chunk_size):
+        # start + i * step rather than a running sum, so errors do not accumulate
+        x = start + np.arange(first, min(first + chunk_size, count), dtype=np.float64) * step
+        if kernel is not None:
+            y = np.asarray(kernel(x), dtype=np.float64)
+        else:
+            y = np.fromiter(map(func, x.tolist()), dtype=np.float64, count=len(x))
+        yield x, y
+
+def run_sweep(func, start, stop, step, output=None, chunk_size=CHUNK_SIZE, column='y'):
+    """Evaluate the grid, writing ``x,<column>`` rows to ``output`` (``.npy`` or CSV) if given.
+
+    Returns a short description of the results for the history, in the format
+    of ``operands.summarize``.
+    """
+    count = grid_size(start, stop, step)
+    results = chunks(func, start, stop, step, chunk_size)
+    if output is None:
+        head, tail = _edges(results)
+    elif output.endswith('.npy'):
+        head, tail = _edges(_write_npy(output, results, count))
+    else:
+        head, tail = _edges(_write_csv(output, results, column))
+    values = head if count <= 2 * EDGE_ITEMS else head[:EDGE_ITEMS] + ['...'] + tail
+    return f"[{','.join(values)}] (n={count})"
+
+def run_plugin_sweep(module, func_name, start, stop, step, output=None):
+    """Import ``func_name`` from ``module`` and sweep it; lets a plugin worker run the whole sweep."""
+    func = getattr(importlib.import_module(module), func_name)
+    return run_sweep(func, start, stop, step, output=output, column=func_name)
+
+def _edges(results):
+    """Consume the chunks and return the formatted first 2 * EDGE_ITEMS and last EDGE_ITEMS values."""
+    head, tail = [], []
+    for _, y in results:
+        if len(head) < 2 * EDGE_ITEMS:
+            head.extend(y[:2 * EDGE_ITEMS - len(head)].tolist())
+        tail = (tail + y[-EDGE_ITEMS:].tolist())[-EDGE_ITEMS:]
+    return [f"{value:g}" for value in head], [f"{value:g}" for value in tail]
+
+def _write_npy(path, results, count):
+    """Stream chunks into an ``(n, 2)`` float64 ``.npy`` file through a memory map."""
+    import numpy as np
+
+    table = np.lib.format.open_memmap(path, mode='w+', dtype=np.float64, shape=(count, 2))
+    row = 0
+    for x, y in results:
+        table[row:row + len(x), 0] = x
+        table[row:row + len(x), 1] = y
+        row += len(x)
+        yield x, y
+    table.flush()
+    del table
+
+def _write_csv(path, results, column):
+    with open(path, 'w', encoding='utf-8') as output:
+        output.write(f"x,{column}\n")
+        for x, y in results:
+            # repr keeps every float exact and is the fastest float-to-text conversion
+            output.write('\n'.join(map(','.join, zip(map(repr, x.tolist()), map(repr, y.tolist())))))
+            output.write('\n')
+            yield x, y
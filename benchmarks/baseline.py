@@ -0,0 +1,126 @@
+"""Benchmark result files: saving, loading and comparing against a baseline.
+
+A result file maps benchmark ids to timings in seconds per call::
+
+    {"python": "3.11.4", "machine": "x86_64", "benchmarks": {"<id>": {"median": 1.2e-06, ...}}}
+
+Comparison uses the median time. A benchmark regresses when it is slower than
+the threshold plus ``NOISE_FACTOR`` times the spread measured in either file,
+so noisy benchmarks need a larger slowdown to fail; benchmarks can also carry
+their own, larger ``tolerance`` (IO-bound ones use ``IO_TOLERANCE``).
+
+Timings also move between sessions on the same machine, so a baseline is best
+merged from several saved runs; the merged spread covers that variation too.
+
+Usage::
+
+    python -m benchmarks.baseline compare NEW.json [BASELINE.json] [--threshold 0.25]
+    python -m benchmarks.baseline merge RUN1.json RUN2.json RUN3.json -o BASELINE.json
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+
+DEFAULT_BASELINE = 'benchmarks/baseline.json'
+DEFAULT_THRESHOLD = 0.25
+# Allowed slowdown per unit of relative spread (interquartile range / median)
+NOISE_FACTOR = 2
+# Tolerance for benchmarks dominated by file or process IO, whose times vary with the OS cache
+IO_TOLERANCE = 1.0
+
+def save_results(path, benchmarks):
+    results = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'benchmarks': dict(sorted(benchmarks.items())),
+    }
+    with open(path, 'w', encoding='utf-8') as output:
+        json.dump(results, output, indent=2)
+        output.write('\n')
+
+def load_results(path):
+    with open(path, encoding='utf-8') as source:
+        return json.load(source)['benchmarks']
+
+def spread(runs):
+    """Return the interquartile range of per-call times relative to their median."""
+    if len(runs) < 2:
+        return 0.0
+    low, _, high = statistics.quantiles(runs, n=4)
+    return (high - low) / statistics.median(runs)
+
+def regression(current, baseline, threshold):
+    """Return the median slowdown ratio if it exceeds the allowed slowdown, else None.
+
+    The allowed slowdown is ``threshold`` (or the benchmark's ``tolerance``, if larger)
+    plus ``NOISE_FACTOR`` times the larger spread of the two timings.
+    """
+    if not baseline or baseline['median'] <= 0:
+        return None
+    ratio = current['median'] / baseline['median']
+    allowed = max(threshold, current.get('tolerance', 0.0)) + \
+        NOISE_FACTOR * max(current.get('spread', 0.0), baseline.get('spread', 0.0))
+    return ratio if ratio > 1 + allowed else None
+
+def merge(runs):
+    """Combine the timings of several sessions: median of medians, widest spread.
+
+    A benchmark's spread becomes the larger of its spread within a session and
+    the range of its session medians relative to their median.
+    """
+    merged = {}
+    for benchmark_id in sorted(set().union(*runs)):
+        timings = [run[benchmark_id] for run in runs if benchmark_id in run]
+        medians = [timing['median'] for timing in timings]
+        median = statistics.median(medians)
+        between = (max(medians) - min(medians)) / median if median > 0 else 0.0
+        merged[benchmark_id] = {
+            'best': min(timing['best'] for timing in timings),
+            'median': median,
+            'spread': max([between] + [timing.get('spread', 0.0) for timing in timings]),
+            'calls': sum(timing['calls'] for timing in timings),
+        }
+        tolerances = [timing['tolerance'] for timing in timings if 'tolerance' in timing]
+        if tolerances:
+            merged[benchmark_id]['tolerance'] = max(tolerances)
+    return merged
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """Return ``(benchmark_id, ratio)`` for every benchmark that regressed."""
+    regressions = []
+    for benchmark_id, timing in sorted(current.items()):
+        ratio = regression(timing, baseline.get(benchmark_id), threshold)
+        if ratio is not None:
+            regressions.append((benchmark_id, ratio))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subcommands = parser.add_subparsers(dest='command', required=True)
+    compare_parser = subcommands.add_parser('compare', help="Fail if NEW regressed against BASELINE.")
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('baseline', nargs='?', default=DEFAULT_BASELINE)
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                                help="Allowed slowdown as a fraction (default: 0.25).")
+    merge_parser = subcommands.add_parser('merge', help="Merge the results of several sessions into one file.")
+    merge_parser.add_argument('runs', nargs='+')
+    merge_parser.add_argument('-o', '--output', default=DEFAULT_BASELINE)
+    args = parser.parse_args(argv)
+
+    if args.command == 'merge':
+        save_results(args.output, merge([load_results(path) for path in args.runs]))
+        print(f"Merged {len(args.runs)} runs into {args.output}")
+        return 0
+    current = load_results(args.new)
+    baseline = load_results(args.baseline)
+    regressions = compare(current, baseline, args.threshold)
+    for benchmark_id, ratio in regressions:
+        print(f"REGRESSION {benchmark_id}: {ratio:.2f}x baseline")
+    print(f"{len(current)} benchmarks, {len(regressions)} regressed past {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""Load-time benchmark: history CSV parsing versus the memory-mapped binary store.
+
+Generates a synthetic history of ``--rows`` rows, writes it both as CSV and as a
+binary store, then times ``history_schema.read_csv`` against opening the binary
+columns with ``np.memmap`` and against building a full DataFrame from them.
+
+Usage::
+
+    python -m benchmarks.binary_history [--rows N]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.binary_history import BinaryHistoryStore
+from app.history_schema import build_frame, for_csv, read_csv
+
+def synthetic_history(rows, seed=0):
+    """Return a history DataFrame in the schema's dtypes, one record per millisecond."""
+    rng = np.random.default_rng(seed)
+    a = rng.uniform(-1e6, 1e6, rows)
+    b = rng.uniform(-1e6, 1e6, rows)
+    operation = pd.Categorical.from_codes(rng.integers(0, 4, rows), categories=['add', 'subtract', 'multiply', 'divide'])
+    timestamps = 1_700_000_000 * 10 ** 9 + np.arange(rows, dtype=np.int64) * 10 ** 6
+    return build_frame(timestamps, operation, {'a': a, 'b': b, 'result': a + b}, {})
+
+def timed(func):
+    start = time.perf_counter()
+    value = func()
+    return time.perf_counter() - start, value
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000, help="History rows (default: 1000000).")
+    args = parser.parse_args(argv)
+
+    frame = synthetic_history(args.rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'history.csv')
+        store_dir = os.path.join(tmp, 'history.bin')
+        for_csv(frame).to_csv(csv_path, index=False)
+        BinaryHistoryStore(store_dir).append_frame(frame)
+
+        csv_seconds, _ = timed(lambda: read_csv(csv_path))
+        memmap_seconds, columns = timed(lambda: BinaryHistoryStore(store_dir).columns())
+        sum_seconds, _ = timed(lambda: float(np.nansum(columns['result'])))
+        frame_seconds, _ = timed(lambda: BinaryHistoryStore(store_dir).to_dataframe())
+
+    print(f"{args.rows} rows:")
+    print(f"  CSV read_csv            : {csv_seconds * 1000:10.1f} ms")
+    print(f"  binary memmap open      : {memmap_seconds * 1000:10.3f} ms")
+    print(f"  sum(result) over memmap : {sum_seconds * 1000:10.1f} ms")
+    print(f"  binary to_dataframe     : {frame_seconds * 1000:10.1f} ms")
+
+if __name__ == '__main__':
+    main()
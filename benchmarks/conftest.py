@@ -0,0 +1,111 @@
+"""Pytest configuration for the benchmark suite.
+
+Run with ``python -m pytest benchmarks`` (the default ``testpaths`` only cover
+``tests/``). Options:
+
+``--benchmark-save PATH``
+    Write every timing to a JSON result file, e.g. one of the sessions merged into
+    ``baseline.json`` (see ``python -m benchmarks.baseline merge``).
+``--benchmark-compare [PATH]``
+    Fail each benchmark whose median is more than ``--benchmark-threshold``
+    (widened by its measured noise, see ``benchmarks.baseline``) slower than its
+    entry in the baseline (default ``benchmarks/baseline.json``). An apparent
+    regression is measured a second time before it fails.
+
+The 10^6-row history and 8-writer cases are marked ``slow``; deselect them with ``-m "not slow"``.
+"""
+
+import logging
+import statistics
+import time
+import timeit
+
+import pytest
+
+from benchmarks.baseline import DEFAULT_BASELINE, DEFAULT_THRESHOLD, load_results, regression, save_results, spread
+
+RESULTS = pytest.StashKey[dict]()
+BASELINE = pytest.StashKey[dict]()
+# Fast benchmarks are repeated until they have run this long (up to MAX_REPEAT runs),
+# so their median and spread rest on enough samples
+MIN_TIME = 1.0
+MAX_REPEAT = 25
+
+def pytest_addoption(parser):
+    group = parser.getgroup('benchmark')
+    group.addoption('--benchmark-save', metavar='PATH', help="Write benchmark results to a JSON file.")
+    group.addoption('--benchmark-compare', metavar='PATH', nargs='?', const=DEFAULT_BASELINE,
+                    help=f"Compare against a baseline JSON file (default: {DEFAULT_BASELINE}).")
+    group.addoption('--benchmark-threshold', type=float, default=DEFAULT_THRESHOLD,
+                    help="Allowed slowdown before a benchmark fails, as a fraction (default: 0.25).")
+
+def pytest_configure(config):
+    config.stash[RESULTS] = {}
+    baseline_path = config.getoption('--benchmark-compare', None)
+    config.stash[BASELINE] = load_results(baseline_path) if baseline_path else {}
+
+def pytest_sessionfinish(session):
+    path = session.config.getoption('--benchmark-save', None)
+    if path and session.config.stash[RESULTS]:
+        save_results(path, session.config.stash[RESULTS])
+
+def pytest_terminal_summary(terminalreporter, config):
+    results = config.stash.get(RESULTS, {})
+    if not results:
+        return
+    baseline = config.stash[BASELINE]
+    terminalreporter.section('benchmarks')
+    for benchmark_id, timing in sorted(results.items()):
+        line = f"{timing['median'] * 1e6:14.2f} us  ±{timing['spread']:4.0%}  {benchmark_id}"
+        if benchmark_id in baseline:
+            line += f"  ({timing['median'] / baseline[benchmark_id]['median']:.2f}x baseline)"
+        terminalreporter.write_line(line)
+
+@pytest.fixture(autouse=True)
+def quiet_logging():
+    logging.disable(logging.CRITICAL)
+    yield
+    logging.disable(logging.NOTSET)
+
+def _measure(timer, repeat, number):
+    """Return the timing of at least ``repeat`` runs of ``number`` calls, in seconds per call."""
+    runs = []
+    start = time.perf_counter()
+    while len(runs) < repeat or (len(runs) < MAX_REPEAT and time.perf_counter() - start < MIN_TIME):
+        runs.append(timer.timeit(number) / number)
+    return {'best': min(runs), 'median': statistics.median(runs), 'spread': spread(runs),
+            'calls': number * len(runs)}
+
+@pytest.fixture
+def benchmark(request):
+    """Time a callable: median of at least ``repeat`` runs of ``number`` calls, in seconds per call.
+
+    ``number`` defaults to enough calls for a run to take about 0.2 s, and fast
+    benchmarks get more runs (see ``MIN_TIME``). The timing is recorded under the
+    test id and compared against the baseline if requested; ``tolerance`` allows
+    a larger slowdown than ``--benchmark-threshold`` for IO-bound benchmarks.
+    """
+    config = request.config
+
+    def run(func, repeat=5, number=None, tolerance=None):
+        timer = timeit.Timer(func)
+        if number is None:
+            number, _ = timer.autorange()
+        benchmark_id = request.node.nodeid.split('::', 1)[-1]
+        benchmark_id = f"{request.node.module.__name__.rsplit('.', 1)[-1]}::{benchmark_id}"
+        baseline = config.stash[BASELINE].get(benchmark_id)
+        threshold = config.getoption('--benchmark-threshold')
+        timing = _measure(timer, repeat, number)
+        if tolerance is not None:
+            timing['tolerance'] = tolerance
+        if regression(timing, baseline, threshold) is not None:
+            # Confirm with a second measurement so that one noisy stretch does not fail the benchmark
+            retry = _measure(timer, repeat, number)
+            if retry['median'] < timing['median']:
+                timing.update(retry)
+        config.stash[RESULTS][benchmark_id] = timing
+        ratio = regression(timing, baseline, threshold)
+        if ratio is not None:
+            pytest.fail(f"{benchmark_id} regressed: {ratio:.2f}x baseline", pytrace=False)
+        return timing
+    return run
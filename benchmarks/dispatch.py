@@ -0,0 +1,90 @@
+"""Micro-benchmark of per-command dispatch overhead in the REPL.
+
+Compares the old dispatch path (list membership test plus an if/elif
+``CommandFactory`` that allocates a new command object for every line) with the
+command registry (one dictionary lookup, reused command objects). History
+recording and logging are disabled so only parsing and dispatch are measured.
+
+Usage::
+
+    python -m benchmarks.dispatch [--lines N] [--repeat N]
+"""
+
+import argparse
+import logging
+import timeit
+
+from app.commands import AddCommand, SubtractCommand, MultiplyCommand, DivideCommand
+from app.operands import is_batch
+from app.repl import REPL
+
+LINE = "add 1 2"
+
+def legacy_create(command_name, calculator):
+    """The if/elif factory used before the command registry."""
+    if command_name == 'add':
+        return AddCommand(calculator)
+    elif command_name == 'subtract':
+        return SubtractCommand(calculator)
+    elif command_name == 'multiply':
+        return MultiplyCommand(calculator)
+    elif command_name == 'divide':
+        return DivideCommand(calculator)
+    raise ValueError(f"Unknown command: {command_name}")
+
+def make_repl():
+    """A REPL whose history recording is a no-op, so only dispatch is timed."""
+    repl = REPL()
+    repl.echo = False
+    repl._record = lambda operation, a, b, result: None
+    return repl
+
+def legacy_dispatch(repl):
+    """The REPL loop body as it was before the registry."""
+    def run():
+        tokens = LINE.strip().split()
+        command_name, args = tokens[0].lower(), tokens[1:]
+        if command_name in ['add', 'subtract', 'multiply', 'divide']:
+            command = legacy_create(command_name, repl.calculator)
+            logging.info(f"Executing command: {command_name} with arguments {args}")
+            result = command.execute(*args)
+            if is_batch(result):
+                repl._record_batch(command_name, args, result)
+            elif result is not None:
+                repl._record_and_print(command_name, args[0], args[1], result)
+    return run
+
+def registry_dispatch(repl):
+    def run():
+        tokens = LINE.strip().split()
+        repl.execute(tokens[0].lower(), tokens[1:])
+    return run
+
+def arithmetic_only(repl):
+    def run():
+        repl.calculator.add(1.0, 2.0)
+    return run
+
+def measure(func, lines, repeat):
+    """Best-of-``repeat`` nanoseconds per call."""
+    return min(timeit.repeat(func, number=lines, repeat=repeat)) / lines * 1e9
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--lines', type=int, default=100000, help="Lines per timing run (default: 100000).")
+    parser.add_argument('--repeat', type=int, default=5, help="Timing runs; the best is reported (default: 5).")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.CRITICAL)
+    repl = make_repl()
+    arithmetic = measure(arithmetic_only(repl), args.lines, args.repeat)
+    legacy = measure(legacy_dispatch(repl), args.lines, args.repeat)
+    registry = measure(registry_dispatch(repl), args.lines, args.repeat)
+
+    print(f"'{LINE}' per line (best of {args.repeat} x {args.lines}):")
+    print(f"  arithmetic only   : {arithmetic:8.0f} ns")
+    print(f"  legacy dispatch   : {legacy:8.0f} ns  (overhead {legacy - arithmetic:.0f} ns)")
+    print(f"  registry dispatch : {registry:8.0f} ns  (overhead {registry - arithmetic:.0f} ns)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Memory report: the history DataFrame before and after the explicit schema.
+
+Writes a synthetic ``--rows`` history CSV in the layout used before the schema
+(raw operand tokens, ``''`` for a missing ``b``, ``calc`` expressions and large
+factorials mixed in), then compares ``PandasFacade.load_csv`` on it with
+``history_schema.read_csv`` on the migrated file: bytes per column
+(``memory_usage(deep=True)``), dtypes and load time.
+
+Usage::
+
+    python -m benchmarks.history_memory [--rows N]
+"""
+
+import argparse
+import math
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from app import history_schema
+from app.pandas_facade import PandasFacade
+from benchmarks.binary_history import timed
+
+def legacy_history(rows, seed=0):
+    """Return a history in the pre-schema layout: text tokens as the REPL recorded them."""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(-1000, 1000, rows)
+    b = rng.integers(1, 1000, rows)
+    kinds = rng.choice(['add', 'multiply', 'divide', 'square_root', 'calc', 'factorial'], rows,
+                       p=[0.3, 0.3, 0.2, 0.15, 0.04, 0.01])
+    frame = pd.DataFrame({'operation': kinds, 'a': a.astype(str), 'b': b.astype(str),
+                          'result': (a + b).astype(float)}).astype(object)
+    unary = np.isin(kinds, ['square_root', 'calc', 'factorial'])
+    frame.loc[unary, 'b'] = ''
+    calc = kinds == 'calc'
+    frame.loc[calc, 'a'] = [f"sqrt({value}) + 1" for value in np.abs(a[calc])]
+    factorial = np.flatnonzero(kinds == 'factorial')
+    frame.loc[factorial, 'a'] = '30'
+    frame.loc[factorial, 'result'] = str(math.factorial(30))
+    return frame
+
+def memory_bytes(frame):
+    """Return the bytes a DataFrame holds, counting the contents of object columns."""
+    return int(frame.memory_usage(index=False, deep=True).sum())
+
+def report(name, frame, seconds):
+    usage = frame.memory_usage(index=False, deep=True)
+    print(f"{name}: {usage.sum() / 2 ** 20:.1f} MiB, loaded in {seconds:.2f} s")
+    for column in frame.columns:
+        print(f"  {column:<10} {str(frame[column].dtype):<16} {usage[column] / 2 ** 20:>8.1f} MiB")
+    return usage.sum()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000, help="History rows (default: 1000000).")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'history.csv')
+        legacy_history(args.rows).to_csv(path, index=False)
+        print(f"{args.rows} rows, {os.path.getsize(path) / 2 ** 20:.1f} MiB of CSV before migration")
+        before = report("before", *reversed(timed(lambda: PandasFacade.load_csv(path))))
+        conform_seconds, _ = timed(lambda: history_schema.read_csv(path))
+        migrate_seconds, _ = timed(lambda: history_schema.migrate(path, backup=False))
+        print(f"conforming the old file on load: {conform_seconds:.2f} s, migrating it: {migrate_seconds:.2f} s")
+        after = report("after", *reversed(timed(lambda: history_schema.read_csv(path))))
+    print(f"after / before: {after / before:.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""Query benchmark: indexed HistoryIndex lookups versus a pandas boolean-mask scan.
+
+For each history size, builds the index once and times a selective query
+(``operation == 'divide' and result > 1e6 and 0 <= a < 1e6``) both through the
+index and as a full DataFrame scan. Index build time is reported separately.
+
+Usage::
+
+    python -m benchmarks.history_query [--sizes 1000 10000 ...] [--repeat N]
+"""
+
+import argparse
+import math
+
+from app.history_index import HistoryIndex
+from benchmarks.binary_history import synthetic_history, timed
+
+CONDITIONS = {'operation': 'divide', 'result': (1e6, None), 'a': (0, math.nextafter(1e6, 0))}
+
+def scan(frame):
+    mask = ((frame['operation'] == 'divide') & (frame['result'] >= 1e6)
+            & (frame['a'] >= 0) & (frame['a'] < 1e6))
+    return frame[mask]
+
+def best_of(func, repeat):
+    return min(timed(func)[0] for _ in range(repeat))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000, 1_000_000],
+                        help="History sizes to measure.")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs per query, best is kept (default: 5).")
+    args = parser.parse_args(argv)
+
+    print(f"{'rows':>10} {'matches':>8} {'build ms':>10} {'index ms':>10} {'scan ms':>10}")
+    for size in args.sizes:
+        frame = synthetic_history(size)
+        build_seconds, index = timed(lambda: HistoryIndex.from_frame(frame))
+        matches = len(index.query(**CONDITIONS))
+        assert matches == len(scan(frame))
+        index_seconds = best_of(lambda: frame.iloc[index.query(**CONDITIONS)], args.repeat)
+        scan_seconds = best_of(lambda: scan(frame), args.repeat)
+        print(f"{size:>10} {matches:>8} {build_seconds * 1000:>10.1f} "
+              f"{index_seconds * 1000:>10.3f} {scan_seconds * 1000:>10.3f}")
+
+if __name__ == '__main__':
+    main()
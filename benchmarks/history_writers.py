@@ -0,0 +1,73 @@
+"""Stress test for multi-writer history: N processes each recording M records.
+
+Every writer process records into the same history file in multi-writer mode.
+Afterwards the merged history is checked for lost or duplicated rows, and the
+aggregate throughput (records per second over all writers) is reported for
+each writer count. ``--compact`` also compacts repeatedly while they write.
+
+Usage::
+
+    python -m benchmarks.history_writers [--records M] [--writers 1,2,4,8] [--compact] [--write-behind]
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+
+from app.history_manager import HistoryManager
+
+def write_records(history_file, writer, count, write_behind=False):
+    """Record ``count`` additions whose operands identify the writer and the record."""
+    manager = HistoryManager(history_file=history_file, multi_writer=True)
+    if write_behind:
+        manager.start_writer()
+    for number in range(count):
+        manager.record({'operation': 'add', 'a': float(writer), 'b': float(number), 'result': float(writer + number)})
+    manager.close()
+
+def lost_rows(history_file, writers, count):
+    """Return ``(missing, duplicated)`` row counts in the merged history."""
+    history = HistoryManager(history_file=history_file, multi_writer=True).history
+    seen = list(zip(history['a'].astype(float), history['b'].astype(float)))
+    expected = {(float(writer), float(number)) for writer in range(writers) for number in range(count)}
+    return len(expected - set(seen)), len(seen) - len(set(seen))
+
+def run(history_file, writers, count, compact=False, write_behind=False):
+    """Run ``writers`` processes of ``count`` records; return records per second."""
+    processes = [multiprocessing.Process(target=write_records, args=(history_file, writer, count, write_behind))
+                 for writer in range(writers)]
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    compactor = HistoryManager(history_file=history_file, multi_writer=True)
+    while compact and any(process.is_alive() for process in processes):
+        compactor.compact()
+    for process in processes:
+        process.join()
+        if process.exitcode:
+            raise RuntimeError(f"Writer process failed with exit code {process.exitcode}")
+    elapsed = time.perf_counter() - start
+    return writers * count / elapsed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--records', type=int, default=2000, help="Records per writer (default: 2000).")
+    parser.add_argument('--writers', default='1,2,4,8', help="Comma separated writer counts (default: 1,2,4,8).")
+    parser.add_argument('--compact', action='store_true', help="Compact continuously while writing.")
+    parser.add_argument('--write-behind', action='store_true', help="Use a write-behind thread in each writer.")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.CRITICAL)
+    print(f"{args.records} records per writer:")
+    with tempfile.TemporaryDirectory() as tmp:
+        for writers in (int(count) for count in args.writers.split(',')):
+            history_file = os.path.join(tmp, f'history-{writers}.csv')
+            rate = run(history_file, writers, args.records, compact=args.compact, write_behind=args.write_behind)
+            missing, duplicated = lost_rows(history_file, writers, args.records)
+            print(f"  {writers:4d} writers: {rate:10.0f} records/s, {missing} missing, {duplicated} duplicated")
+
+if __name__ == '__main__':
+    main()
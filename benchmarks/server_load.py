@@ -0,0 +1,61 @@
+"""Local load test for the asyncio calculator server.
+
+Starts a server on an ephemeral port with a temporary journal-mode history and
+drives it with 1, 10 and 100 concurrent clients, each sending requests one at a
+time and waiting for every reply. Reports requests per second at each level.
+
+Usage::
+
+    python -m benchmarks.server_load [--requests N] [--clients 1,10,100] [--command "add 1 2"]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+
+from app.history_manager import HistoryManager
+from app.repl import REPL
+from app.server import CalculatorServer
+
+async def client(host, port, request, count):
+    reader, writer = await asyncio.open_connection(host, port)
+    payload = (request + '\n').encode('utf-8')
+    for _ in range(count):
+        writer.write(payload)
+        await writer.drain()
+        await reader.readline()
+    writer.close()
+    await writer.wait_closed()
+
+async def run_level(clients, total_requests, request, history_file):
+    repl = REPL()
+    repl.history_manager = HistoryManager(history_file=history_file, journal=True)
+    server = CalculatorServer(repl, port=0)
+    host, port = await server.start()
+    per_client = max(1, total_requests // clients)
+    start = time.perf_counter()
+    await asyncio.gather(*[client(host, port, request, per_client) for _ in range(clients)])
+    elapsed = time.perf_counter() - start
+    await server.stop()
+    return clients * per_client / elapsed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=20000, help="Requests per level (default: 20000).")
+    parser.add_argument('--clients', default='1,10,100', help="Comma separated client counts (default: 1,10,100).")
+    parser.add_argument('--command', default='add 1 2', help="Request line to send (default: 'add 1 2').")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.CRITICAL)
+    print(f"'{args.command}', {args.requests} requests per level:")
+    with tempfile.TemporaryDirectory() as tmp:
+        for clients in (int(count) for count in args.clients.split(',')):
+            history_file = os.path.join(tmp, f'history-{clients}.csv')
+            rate = asyncio.run(run_level(clients, args.requests, args.command, history_file))
+            print(f"  {clients:4d} clients: {rate:10.0f} req/s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""Startup-time benchmark for the calculator.
+
+Reports the ``-X importtime`` breakdown of ``import main`` and the wall-clock time
+of a one-shot computation (``add 1 2`` through ``main.py --stream``).
+
+Usage::
+
+    python -m benchmarks.startup [--runs N] [--top N] [--json results.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('pandas', 'numpy')
+
+def import_breakdown():
+    """Return ``(module, self_us, cumulative_us)`` rows for ``import main``."""
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import main'],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        rows.append((module.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+def one_shot_times(runs):
+    """Wall-clock seconds for ``runs`` one-shot ``add 1 2`` invocations."""
+    times = []
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, LOG_LEVEL='ERROR', HISTORY_JOURNAL='true',
+                   HISTORY_FILE=os.path.join(tmp, 'history.csv'))
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, 'main.py', '--stream'], cwd=ROOT, env=env,
+                           input='add 1 2\n', capture_output=True, text=True, check=True)
+            times.append(time.perf_counter() - start)
+    return times
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10, help="One-shot runs to time (default: 10).")
+    parser.add_argument('--top', type=int, default=15, help="Slowest imports to list (default: 15).")
+    parser.add_argument('--json', metavar='PATH', help="Also write the results to a JSON file.")
+    args = parser.parse_args(argv)
+
+    rows = import_breakdown()
+    total_us = next((cumulative for module, _, cumulative in reversed(rows) if module == 'main'), 0)
+    heavy = sorted({module for module, _, _ in rows if module.split('.')[0] in HEAVY_MODULES})
+    times = one_shot_times(args.runs)
+
+    print(f"import main: {total_us / 1000:.1f} ms cumulative")
+    print(f"heavy modules imported at startup: {', '.join(heavy) if heavy else 'none'}")
+    print(f"\nTop {args.top} imports by cumulative time:")
+    for module, self_us, cumulative_us in sorted(rows, key=lambda row: row[2], reverse=True)[:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  (self {self_us / 1000:6.1f} ms)  {module}")
+    print(f"\nOne-shot 'add 1 2' over {args.runs} runs: "
+          f"min {min(times) * 1000:.1f} ms, median {statistics.median(times) * 1000:.1f} ms")
+
+    if args.json:
+        results = {
+            'python': sys.version.split()[0],
+            'import_main_ms': total_us / 1000,
+            'heavy_modules': heavy,
+            'one_shot_min_ms': min(times) * 1000,
+            'one_shot_median_ms': statistics.median(times) * 1000,
+        }
+        with open(args.json, 'w', encoding='utf-8') as output:
+            json.dump(results, output, indent=2)
+
+if __name__ == '__main__':
+    main()
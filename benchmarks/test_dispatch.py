@@ -0,0 +1,14 @@
+"""Benchmarks for REPL command dispatch with history recording stubbed out."""
+
+import pytest
+
+from benchmarks.dispatch import make_repl
+
+@pytest.fixture(scope='module')
+def repl():
+    return make_repl()
+
+@pytest.mark.parametrize('line', ['add 1 2', 'divide 7 3', 'multiply [1,2,3] 2'])
+def test_execute(benchmark, repl, line):
+    tokens = line.split()
+    benchmark(lambda: repl.execute(tokens[0], tokens[1:]))
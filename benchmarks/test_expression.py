@@ -0,0 +1,40 @@
+"""Benchmarks for compound calculations: separate commands versus one expression.
+
+``sqrt(power(3,2)) + 4 / 2`` is computed as four REPL commands (four dispatches
+and four history records) and as one ``calc`` line, with a journal history so
+the record cost is realistic. ``compile`` times parsing and folding alone with
+the cache cleared.
+"""
+
+import pytest
+
+from app.history_manager import HistoryManager
+from app.repl import REPL
+
+EXPRESSION = "sqrt(power(3,2)) + 4 / 2"
+COMMANDS = [('power', ['3', '2']), ('square_root', ['9']), ('divide', ['4', '2']), ('add', ['3', '2'])]
+
+@pytest.fixture
+def repl(tmp_path):
+    repl = REPL()
+    repl.echo = False
+    repl.history_manager = HistoryManager(str(tmp_path / 'history.csv'), journal=True)
+    repl.execute('power', ['1', '1'])  # import the plugins before timing
+    repl.execute('square_root', ['1'])
+    return repl
+
+def test_separate_commands(benchmark, repl):
+    def run():
+        for command_name, args in COMMANDS:
+            repl.execute(command_name, args)
+    benchmark(run)
+
+def test_expression(benchmark, repl):
+    tokens = EXPRESSION.split()
+    benchmark(lambda: repl.execute('calc', tokens))
+
+def test_compile(benchmark, repl):
+    def run():
+        repl.expressions.cache.clear()
+        repl.expressions.compile(EXPRESSION)
+    benchmark(run)
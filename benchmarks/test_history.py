@@ -0,0 +1,62 @@
+"""Benchmarks for HistoryManager: recording, loading and tail reads by history length."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from app.history_manager import HistoryManager
+from app.history_reader import HistoryReader
+from app.history_schema import for_csv
+from benchmarks.baseline import IO_TOLERANCE
+from benchmarks.binary_history import synthetic_history
+from benchmarks.startup import ROOT
+
+SIZES = [1_000, 10_000, 100_000, pytest.param(1_000_000, marks=pytest.mark.slow)]
+RECORD = {'operation': 'add', 'a': 1.0, 'b': 2.0, 'result': 3.0}
+
+@pytest.fixture(scope='module', params=SIZES, ids=lambda size: f'{size}')
+def history_csv(request, tmp_path_factory):
+    """A history CSV with ``size`` synthetic rows, shared by the module's benchmarks."""
+    path = tmp_path_factory.mktemp('history') / 'history.csv'
+    for_csv(synthetic_history(request.param)).to_csv(path, index=False)
+    return str(path)
+
+def _copy(path, tmp_path):
+    copy = tmp_path / os.path.basename(path)
+    copy.write_bytes(open(path, 'rb').read())
+    return str(copy)
+
+def test_load_history(benchmark, history_csv):
+    benchmark(lambda: HistoryManager(history_csv).history, repeat=3)
+
+@pytest.mark.parametrize('journal', [False, True], ids=['snapshot', 'journal'])
+def test_record(benchmark, history_csv, journal, tmp_path):
+    manager = HistoryManager(_copy(history_csv, tmp_path), journal=journal)
+    manager.history
+    benchmark(lambda: manager.record(RECORD), repeat=3, number=None if journal else 1,
+              tolerance=IO_TOLERANCE)
+
+def test_tail(benchmark, history_csv):
+    reader = HistoryReader(HistoryManager(history_csv))
+    benchmark(lambda: reader.tail(20))
+
+def test_first_prompt(benchmark, history_csv):
+    """Start the REPL on the history, show the recent records with plain 'history' and quit."""
+    env = dict(os.environ, LOG_LEVEL='ERROR', HISTORY_FILE=history_csv)
+    command = [sys.executable, 'main.py']
+    benchmark(lambda: subprocess.run(command, cwd=ROOT, env=env, input='history\nquit\n',
+                                     capture_output=True, text=True, check=True),
+              repeat=5, number=1, tolerance=IO_TOLERANCE)
+
+@pytest.mark.parametrize('journal', [False, True], ids=['snapshot', 'journal'])
+def test_record_write_behind(benchmark, history_csv, journal, tmp_path):
+    """Recording cost seen by a command when a background thread writes (and fsyncs) the history."""
+    manager = HistoryManager(_copy(history_csv, tmp_path), journal=journal)
+    manager.history
+    manager.start_writer()
+    try:
+        benchmark(lambda: manager.record(RECORD), repeat=3, tolerance=IO_TOLERANCE)
+    finally:
+        manager.close()
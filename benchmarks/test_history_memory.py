@@ -0,0 +1,42 @@
+"""Benchmarks for the history schema: loading a pre-schema CSV and its migrated copy.
+
+The pre-schema load (``PandasFacade.load_csv``) is kept for comparison; the
+migrated history must also take at most half its memory.
+"""
+
+import shutil
+
+import pytest
+
+from app import history_schema
+from app.pandas_facade import PandasFacade
+from benchmarks.history_memory import legacy_history, memory_bytes
+
+SIZES = [100_000, pytest.param(1_000_000, marks=pytest.mark.slow)]
+
+@pytest.fixture(scope='module', params=SIZES, ids=lambda size: f'{size}')
+def histories(request, tmp_path_factory):
+    """A pre-schema history CSV and its migrated copy, shared by the module's benchmarks."""
+    directory = tmp_path_factory.mktemp('history')
+    legacy, migrated = str(directory / 'legacy.csv'), str(directory / 'history.csv')
+    legacy_history(request.param).to_csv(legacy, index=False)
+    shutil.copyfile(legacy, migrated)
+    history_schema.migrate(migrated, backup=False)
+    return legacy, migrated
+
+def test_load_before_schema(benchmark, histories):
+    legacy, _ = histories
+    benchmark(lambda: PandasFacade.load_csv(legacy), repeat=3, number=1)
+
+def test_conform_on_load(benchmark, histories):
+    legacy, _ = histories
+    benchmark(lambda: history_schema.read_csv(legacy), repeat=3, number=1)
+
+def test_load_schema(benchmark, histories):
+    _, migrated = histories
+    benchmark(lambda: history_schema.read_csv(migrated), repeat=3, number=1)
+
+def test_memory(histories):
+    legacy, migrated = histories
+    before = memory_bytes(PandasFacade.load_csv(legacy))
+    assert memory_bytes(history_schema.read_csv(migrated)) <= before / 2
@@ -0,0 +1,30 @@
+"""Benchmarks for multi-writer history: N processes recording into one history at once.
+
+Each run starts ``writers`` processes that record ``RECORDS`` rows each into a
+fresh history file (optionally compacting continuously meanwhile), then checks
+that the merged history lost and duplicated no row.
+"""
+
+import itertools
+
+import pytest
+
+from benchmarks.baseline import IO_TOLERANCE
+from benchmarks.history_writers import lost_rows, run
+
+RECORDS = 500
+WRITERS = [1, 2, 4, pytest.param(8, marks=pytest.mark.slow)]
+
+@pytest.mark.parametrize('compact', [False, True], ids=['append', 'compact'])
+@pytest.mark.parametrize('writers', WRITERS, ids=lambda writers: f'{writers}')
+def test_writers(benchmark, tmp_path, writers, compact):
+    names = (str(tmp_path / f'history-{number}.csv') for number in itertools.count())
+    history_files = []
+
+    def write():
+        history_files.append(next(names))
+        run(history_files[-1], writers, RECORDS, compact=compact)
+
+    benchmark(write, repeat=3, number=1, tolerance=IO_TOLERANCE)
+    for history_file in history_files:
+        assert lost_rows(history_file, writers, RECORDS) == (0, 0)
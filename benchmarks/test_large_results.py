@@ -0,0 +1,49 @@
+"""Benchmarks for large factorial results: computing, summarising and converting to text.
+
+``str`` is the previous path (quadratic int-to-decimal conversion, as done by
+``print`` and the CSV writer); it is only timed up to 10^5 since 10^6! would
+take minutes. ``summary`` is what the REPL now prints and records;
+``full_text`` is the ``show_result`` conversion.
+"""
+
+import math
+import sys
+
+import pytest
+
+from app.large_result import LargeResult, to_decimal_string
+
+SIZES = [1_000, 10_000, 100_000, pytest.param(1_000_000, marks=pytest.mark.slow)]
+
+_factorials = {}
+
+def factorial_of(n):
+    if n not in _factorials:
+        _factorials[n] = math.factorial(n)
+    return _factorials[n]
+
+@pytest.fixture
+def unlimited_int_text():
+    limit = sys.get_int_max_str_digits()
+    sys.set_int_max_str_digits(0)
+    yield
+    sys.set_int_max_str_digits(limit)
+
+@pytest.mark.parametrize('n', SIZES)
+def test_factorial(benchmark, n):
+    benchmark(lambda: math.factorial(n), repeat=3, number=1)
+
+@pytest.mark.parametrize('n', SIZES)
+def test_summary(benchmark, n):
+    value = factorial_of(n)
+    benchmark(lambda: LargeResult(value), repeat=3)
+
+@pytest.mark.parametrize('n', [1_000, 10_000, pytest.param(100_000, marks=pytest.mark.slow)])
+def test_str(benchmark, n, unlimited_int_text):
+    value = factorial_of(n)
+    benchmark(lambda: str(value), repeat=3, number=1)
+
+@pytest.mark.parametrize('n', SIZES)
+def test_full_text(benchmark, n):
+    value = factorial_of(n)
+    benchmark(lambda: to_decimal_string(value), repeat=3, number=1)
@@ -0,0 +1,49 @@
+"""Benchmarks for the per-command cost of logging in REPL dispatch.
+
+``filtered`` runs with LOG_LEVEL=WARNING, so the INFO lines are dropped before
+formatting. ``sync-file`` writes every record to a plain FileHandler in the
+command thread (the previous setup). ``queue-file`` and ``queue-sampled`` use
+``setup_logging``, optionally keeping 1% of the per-command INFO lines.
+"""
+
+import logging
+
+import pytest
+
+from app.logging_config import LOG_FORMAT, setup_logging, shutdown_logging
+from benchmarks.dispatch import make_repl
+
+@pytest.fixture
+def quiet_logging():
+    """Override the suite-wide fixture: these benchmarks need logging enabled."""
+    logging.disable(logging.NOTSET)
+    yield
+
+@pytest.fixture
+def configured(request, tmp_path):
+    root = logging.getLogger()
+    level = root.level
+    log_file = str(tmp_path / 'app.log')
+    if request.param == 'filtered':
+        setup_logging(level='WARNING', log_file=log_file)
+    elif request.param == 'sync-file':
+        handler = logging.FileHandler(log_file)
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        root.addHandler(handler)
+        root.setLevel(logging.INFO)
+    elif request.param == 'queue-file':
+        setup_logging(level='INFO', log_file=log_file)
+    else:
+        setup_logging(level='INFO', log_file=log_file, sample_rate=0.01)
+    yield request.param
+    shutdown_logging()
+    if request.param == 'sync-file':
+        root.removeHandler(handler)
+        handler.close()
+    root.setLevel(level)
+
+@pytest.mark.parametrize('configured', ['filtered', 'sync-file', 'queue-file', 'queue-sampled'], indirect=True)
+def test_execute_with_logging(benchmark, configured):
+    repl = make_repl()
+    repl.latency_stats = None
+    benchmark(lambda: repl.execute('add', ['1', '2']), repeat=5, number=20_000)
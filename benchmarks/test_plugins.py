@@ -0,0 +1,49 @@
+"""Benchmarks for plugin discovery, import and the bundled trig/factorial plugins."""
+
+import sys
+
+import pytest
+
+from app.history_manager import HistoryManager
+from app.plugin_loader import PluginLoader
+from app.plugins.factorial import factorial
+from app.plugins.trig import sine
+from app.repl import REPL
+
+def test_load_plugin_cold(benchmark):
+    loader = PluginLoader()
+
+    def load():
+        sys.modules.pop('app.plugins.trig', None)
+        loader.load_plugin('trig')
+    benchmark(load)
+
+def test_load_plugin_cached(benchmark):
+    loader = PluginLoader()
+    benchmark(lambda: loader.load_plugin('trig'))
+
+def test_scan_manifest(benchmark):
+    benchmark(lambda: PluginLoader().scan())
+
+def test_sine(benchmark):
+    benchmark(lambda: sine(30))
+
+@pytest.mark.parametrize('number', [20, 1_000, 10_000])
+def test_factorial(benchmark, number):
+    benchmark(lambda: factorial(number))
+
+@pytest.mark.parametrize('timeout', [None, '30'], ids=['inline', 'worker'])
+def test_plugin_command(benchmark, timeout, monkeypatch, tmp_path):
+    """A fast plugin command run in the REPL process and in the supervised worker."""
+    if timeout:
+        monkeypatch.setenv('PLUGIN_TIMEOUT', timeout)
+    repl = REPL()
+    repl.echo = False
+    repl.history_manager = HistoryManager(str(tmp_path / 'history.csv'), journal=True)
+    try:
+        repl.execute('sine', ['30'])
+        benchmark(lambda: repl.execute('sine', ['30']))
+        assert repl.plugin_worker is None or repl.plugin_worker.starts == 1
+    finally:
+        if repl.plugin_worker is not None:
+            repl.plugin_worker.stop()
@@ -0,0 +1,14 @@
+"""Benchmarks for process startup: ``import main`` and a one-shot streamed command."""
+
+import subprocess
+import sys
+
+from benchmarks.baseline import IO_TOLERANCE
+from benchmarks.startup import ROOT, one_shot_times
+
+def test_import_main(benchmark):
+    command = [sys.executable, '-c', 'import main']
+    benchmark(lambda: subprocess.run(command, cwd=ROOT, check=True), repeat=5, number=1, tolerance=IO_TOLERANCE)
+
+def test_one_shot_add(benchmark):
+    benchmark(lambda: one_shot_times(1), repeat=5, number=1, tolerance=IO_TOLERANCE)
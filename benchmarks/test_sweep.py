@@ -0,0 +1,39 @@
+"""Benchmarks for ``sweep`` over a million-point grid.
+
+``vectorized`` uses the plugin's NumPy kernel, ``loop`` calls the scalar
+function per point, ``npy`` and ``csv`` include streaming the table to a file.
+``per_command`` is one ``sine`` REPL command, for comparison with a sweep's
+cost per point.
+"""
+
+import pytest
+
+from app.history_manager import HistoryManager
+from app.plugins.trig import sine
+from app.repl import REPL
+from app.sweep import run_sweep
+
+# 0 to 360 degrees in 1e6 steps
+GRID = (0.0, 360.0, 360 / 1_000_000)
+
+def _scalar_sine(angle):
+    return sine(angle)
+
+def test_vectorized(benchmark):
+    benchmark(lambda: run_sweep(sine, *GRID), repeat=3)
+
+def test_loop(benchmark):
+    benchmark(lambda: run_sweep(_scalar_sine, *GRID), repeat=3)
+
+def test_npy(benchmark, tmp_path):
+    benchmark(lambda: run_sweep(sine, *GRID, output=str(tmp_path / 'sine.npy')), repeat=3)
+
+@pytest.mark.slow
+def test_csv(benchmark, tmp_path):
+    benchmark(lambda: run_sweep(sine, *GRID, output=str(tmp_path / 'sine.csv')), repeat=3, number=1)
+
+def test_per_command(benchmark, tmp_path):
+    repl = REPL()
+    repl.echo = False
+    repl.history_manager = HistoryManager(str(tmp_path / 'history.csv'), journal=True)
+    benchmark(lambda: repl.execute('sine', ['30']))
@@ -1,21 +1,48 @@
-import os
+import argparse
 import logging
+import sys
+from app.logging_config import setup_logging
 from app.repl import REPL
-from app.history_manager import HistoryManager
-from app.plugin_loader import PluginLoader
+from app.pipeline import Pipeline
 from dotenv import load_dotenv
 
-def setup_logging():
-    """Configure logging based on environment variables."""
-    load_dotenv()  # Load environment variables from a .env file if present
-    log_level = os.getenv('LOG_LEVEL', 'INFO').upper()
-    logging.basicConfig(
-        level=getattr(logging, log_level, logging.INFO),
-        format='%(asctime)s - %(levelname)s - %(message)s'
-    )
-
-def main():
-    # Setup logging configuration
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Advanced Python Calculator")
+    parser.add_argument('--stream', nargs='?', const='-', metavar='FILE',
+                        help="Evaluate commands from FILE (or stdin with '-') instead of the interactive prompt.")
+    parser.add_argument('--format', choices=Pipeline.FORMATS, default='jsonl',
+                        help="Output format for stream mode (default: jsonl).")
+    parser.add_argument('--flush-every', type=int, default=1000, metavar='N',
+                        help="Write history to disk every N commands in stream mode (default: 1000).")
+    parser.add_argument('--serve', metavar='[HOST:]PORT',
+                        help="Serve calculator commands as JSON lines over TCP (default host 127.0.0.1).")
+    return parser.parse_args(argv)
+
+def run_stream(repl, source, output_format, flush_every):
+    """Run the calculator as a filter over a file or stdin."""
+    pipeline = Pipeline(repl, sys.stdout, output_format=output_format, flush_every=flush_every)
+    if source == '-':
+        return pipeline.run(sys.stdin)
+    with open(source, encoding='utf-8') as lines:
+        return pipeline.run(lines)
+
+def run_server(repl, address):
+    """Serve the calculator over TCP until interrupted."""
+    # asyncio and the server are only imported here, so other modes do not pay for them at startup
+    import asyncio
+    from app.server import CalculatorServer
+    host, _, port = address.rpartition(':')
+    server = CalculatorServer(repl, host=host or '127.0.0.1', port=int(port))
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        logging.info("Calculator server stopped.")
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # Load a .env file if present, then configure logging once for the whole process
+    load_dotenv()
     setup_logging()
 
     # Display startup message
@@ -23,7 +50,12 @@ def main():
 
     # Initialize REPL and start the calculator
     repl = REPL()
-    repl.start()
+    if args.serve:
+        run_server(repl, args.serve)
+    elif args.stream:
+        run_stream(repl, args.stream, args.format, args.flush_every)
+    else:
+        repl.start()
 
 if __name__ == "__main__":
     main()
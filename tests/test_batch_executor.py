@@ -0,0 +1,36 @@
+"""
+Unit tests for the BatchExecutor class.
+"""
+
+import pytest
+from app.batch_executor import BatchExecutor
+from app.plugins.factorial import factorial
+from app.plugins.power import power
+
+@pytest.fixture
+def executor():
+    """Fixture to create a BatchExecutor with two workers."""
+    executor = BatchExecutor(max_workers=2, chunksize=2)
+    yield executor
+    executor.shutdown()
+
+def test_results_in_submission_order(executor):
+    """Test that results are returned in the order the calls were submitted."""
+    outcomes = executor.map(factorial, [(n,) for n in range(10, 0, -1)])
+    assert [value for _, value in outcomes] == [factorial(n) for n in range(10, 0, -1)]
+
+def test_multiple_arguments(executor):
+    """Test calls that take more than one argument."""
+    assert executor.map(power, [(2, 3), (3, 2)]) == [(True, 8.0), (True, 9.0)]
+
+def test_errors_are_reported_per_call(executor):
+    """Test that a failing call does not abort the rest of the batch."""
+    outcomes = executor.map(factorial, [(3,), (-1,), (4,)])
+    assert outcomes[0] == (True, 6)
+    assert outcomes[1] == (False, "Cannot calculate the factorial of a negative number.")
+    assert outcomes[2] == (True, 24)
+
+def test_empty_batch_does_not_start_workers(executor):
+    """Test that an empty batch returns immediately."""
+    assert executor.map(factorial, []) == []
+    assert executor._pool is None
@@ -0,0 +1,63 @@
+"""
+Unit tests for the binary, memory-mapped history store.
+"""
+
+import math
+import numpy as np
+import pytest
+from app.binary_history import BinaryHistoryStore, binary_to_csv, csv_to_binary
+from app.history_schema import exact_value
+
+@pytest.fixture
+def store(tmp_path):
+    """Fixture to create an empty store in a temporary directory."""
+    return BinaryHistoryStore(str(tmp_path / "history.bin"))
+
+def test_append_and_memmap_columns(store):
+    """Test that appended records are readable as memory-mapped typed columns."""
+    store.append([{'operation': 'add', 'a': '1', 'b': '2', 'result': 3.0},
+                  {'operation': 'square_root', 'a': '16', 'b': '', 'result': 4.0}])
+    store.append([{'operation': 'add', 'a': 2, 'b': 2, 'result': 4}])
+
+    columns = BinaryHistoryStore(store.directory).columns()
+    assert len(store) == 3
+    assert isinstance(columns['result'], np.memmap)
+    assert columns['result'].tolist() == [3.0, 4.0, 4.0]
+    assert np.isnan(columns['b'][1])
+    assert columns['operation'].tolist() == [0, 1, 0]
+
+def test_to_dataframe_restores_exact_values(store):
+    """Test that large integers and text come back from the extras file."""
+    big = math.factorial(40)
+    store.append([{'operation': 'factorial', 'a': '40', 'b': '', 'result': big},
+                  {'operation': 'add', 'a': '[1,2] (n=2)', 'b': 1.0, 'result': '[2,3] (n=2)'}])
+
+    frame = BinaryHistoryStore(store.directory).to_dataframe()
+    assert list(frame['operation']) == ['factorial', 'add']
+    assert frame['result'].dtype == np.float64
+    assert exact_value(frame, 0, 'result') == big
+    assert np.isnan(frame.at[1, 'a'])
+    assert exact_value(frame, 1, 'a') == '[1,2] (n=2)'
+
+def test_csv_round_trip(store, tmp_path):
+    """Test converting a store to CSV and back."""
+    store.append([{'operation': 'multiply', 'a': 2, 'b': 3, 'result': 6},
+                  {'operation': 'factorial', 'a': 25, 'b': '', 'result': math.factorial(25)}])
+    csv_path = str(tmp_path / "history.csv")
+    binary_to_csv(store.directory, csv_path)
+
+    converted = csv_to_binary(csv_path, str(tmp_path / "converted.bin"), chunksize=1)
+    frame = converted.to_dataframe()
+    assert list(frame['operation']) == ['multiply', 'factorial']
+    assert exact_value(frame, 1, 'result') == math.factorial(25)
+    assert frame['timestamp'].isna().all()
+
+def test_partial_append_is_ignored(store):
+    """Test that a torn write in one column does not produce a partial row."""
+    store.append([{'operation': 'add', 'a': 1, 'b': 1, 'result': 2}])
+    with open(store._path('result.f8'), 'ab') as column_file:
+        column_file.write(b'\x00' * 8)  # only one column got the next row
+
+    assert len(store) == 1
+    store.append([{'operation': 'add', 'a': 2, 'b': 2, 'result': 4}])
+    assert store.columns()['result'].tolist() == [2.0, 4.0]
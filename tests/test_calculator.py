@@ -2,6 +2,7 @@
 Unit tests for the Calculator class.
 """
 
+import numpy as np
 import pytest
 from app.calculator import Calculator
 
@@ -37,3 +38,15 @@ def test_divide(calculator):
     # Check division by zero
     with pytest.raises(ValueError, match="Cannot divide by zero"):
         calculator.divide(10, 0)
+
+def test_array_operands(calculator):
+    """Test that array operands are evaluated elementwise with broadcasting."""
+    a = np.array([1.0, 2.0, 3.0])
+    np.testing.assert_array_equal(calculator.add(a, 1.0), [2.0, 3.0, 4.0])
+    np.testing.assert_array_equal(calculator.multiply(a, a), [1.0, 4.0, 9.0])
+
+def test_array_divide_by_zero(calculator):
+    """Test that array division masks zero divisors instead of raising."""
+    result = calculator.divide(np.array([1.0, 2.0]), np.array([0.0, 2.0]))
+    assert result.mask.tolist() == [True, False]
+    assert result[1] == 1.0
@@ -4,7 +4,7 @@ Unit tests for the CommandFactory class in command_factory.py.
 
 import pytest
 from app.calculator import Calculator
-from app.command_factory import CommandFactory
+from app.command_factory import CommandFactory, UnknownCommandError
 from app.commands import AddCommand, SubtractCommand, MultiplyCommand, DivideCommand
 
 @pytest.fixture
@@ -44,3 +44,9 @@ def test_create_invalid_command(calculator):
     """Test creating an invalid command using the CommandFactory."""
     with pytest.raises(ValueError, match="Unknown command: invalid"):
         CommandFactory.create('invalid', calculator)
+
+def test_unknown_command_error_is_a_value_error(calculator):
+    """Test that unknown commands raise UnknownCommandError, a ValueError subclass."""
+    with pytest.raises(UnknownCommandError):
+        CommandFactory.create('invalid', calculator)
+    assert issubclass(UnknownCommandError, ValueError)
@@ -64,3 +64,8 @@ def test_divide_command_with_invalid_args(calculator):
     divide_command = DivideCommand(calculator)
     with pytest.raises(ValueError):
         divide_command.execute('invalid', 'args')
+
+def test_commands_accept_array_literals(calculator):
+    """Test that commands evaluate list and range literals elementwise."""
+    result = AddCommand(calculator).execute('[1,2,3]', 'range(0,3)')
+    assert result.tolist() == [1.0, 3.0, 5.0]
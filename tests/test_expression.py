@@ -0,0 +1,71 @@
+"""
+Unit tests for the expression compiler.
+"""
+
+import math
+import pytest
+from app.calculator import Calculator
+from app.expression import ExpressionCompiler
+from app.plugins.power import power
+from app.plugins.square_root import square_root
+
+@pytest.fixture
+def compiler():
+    """Fixture with the power and square_root plugins plus a counting plugin."""
+    calls = []
+
+    def counter(x):
+        calls.append(x)
+        return x + 1
+
+    functions = {'power': power, 'square_root': square_root, 'counter': counter}
+    compiler = ExpressionCompiler(Calculator(), lambda name: functions[name])
+    compiler.calls = calls
+    return compiler
+
+@pytest.mark.parametrize('source, expected', [
+    ("sqrt(power(3,2)) + 4 / 2", 5.0),
+    ("2 ** 10 - -1", 1025.0),
+    ("multiply(add(1, 2), 4)", 12.0),
+    ("2 * pi", 2 * math.pi),
+])
+def test_evaluate(compiler, source, expected):
+    """Test operators, built-in and plugin calls, aliases and constants."""
+    assert compiler.evaluate(source) == pytest.approx(expected)
+
+def test_constant_arithmetic_folds_and_is_cached(compiler):
+    """Test that constant built-in arithmetic folds to a value and repeated text skips parsing."""
+    compiled = compiler.compile("multiply(2, pi) + 4 / -2")
+    assert compiled.constant
+    assert compiler.compile("multiply(2, pi) + 4 / -2") is compiled
+    assert (compiler.hits, compiler.misses) == (1, 1)
+
+def test_plugin_calls_and_ans_are_not_folded(compiler):
+    """Test that plugin calls, even with constant arguments, run per evaluation."""
+    assert not compiler.compile("sqrt(16) * 2").constant
+    compiled = compiler.compile("counter(1) + ans")
+    assert compiler.calls == []
+    assert not compiled.constant
+    assert compiled.evaluate(10) == 12.0
+    assert compiled.evaluate(20) == 22.0
+    assert compiler.calls == [1.0, 1.0]
+
+@pytest.mark.parametrize('source, message', [
+    ("1 / 0", "Cannot divide by zero"),
+    ("unknown(1)", "Unknown function"),
+    ("__import__('os')", "Unknown function"),
+    ("1 +", "Invalid expression"),
+    ("'text'", "Unsupported expression element"),
+    ("ans + 1", "'ans' has no value yet"),
+])
+def test_errors(compiler, source, message):
+    """Test that unsupported input and runtime errors raise ValueErrors."""
+    with pytest.raises(ValueError, match=message):
+        compiler.evaluate(source)
+
+def test_cache_is_bounded():
+    """Test that the oldest compiled expression is evicted past max_entries."""
+    compiler = ExpressionCompiler(Calculator(), lambda name: (_ for _ in ()).throw(KeyError(name)), max_entries=2)
+    for source in ("1 + 1", "2 + 2", "3 + 3"):
+        compiler.compile(source)
+    assert list(compiler.cache) == ["2 + 2", "3 + 3"]
@@ -0,0 +1,53 @@
+"""
+Unit tests for the HistoryBuffer class.
+"""
+
+import math
+import numpy as np
+from app.history_buffer import HistoryBuffer
+from app.history_schema import exact_value
+
+def test_append_stores_typed_columns():
+    """Test that operands and results are stored as floats with interned operations."""
+    buffer = HistoryBuffer()
+    buffer.append({'operation': 'add', 'a': '10', 'b': '5', 'result': 15.0})
+    buffer.append({'operation': 'add', 'a': 1, 'b': 2, 'result': 3})
+
+    assert len(buffer) == 2
+    assert buffer.operations == ['add']
+    assert list(buffer.columns['a']) == [10.0, 1.0]
+
+def test_missing_operand_becomes_nan():
+    """Test that the empty-string placeholder used by unary plugins is stored as NaN."""
+    buffer = HistoryBuffer()
+    buffer.append({'operation': 'square_root', 'a': '16', 'b': '', 'result': 4.0})
+
+    dataframe = buffer.to_dataframe()
+    assert np.isnan(dataframe.at[0, 'b'])
+
+def test_large_integers_are_kept_exact():
+    """Test that integers too large for a float survive materialization unchanged."""
+    buffer = HistoryBuffer()
+    big = math.factorial(50)
+    buffer.append({'operation': 'factorial', 'a': '50', 'b': '', 'result': big})
+
+    dataframe = buffer.to_dataframe()
+    assert dataframe['result'].dtype == np.float64
+    assert exact_value(dataframe, 0, 'result') == big
+
+def test_to_dataframe_preserves_order():
+    """Test that the materialized DataFrame keeps the append order of operations."""
+    buffer = HistoryBuffer()
+    for operation in ['add', 'divide', 'add']:
+        buffer.append({'operation': operation, 'a': 1, 'b': 1, 'result': 1})
+
+    assert list(buffer.to_dataframe()['operation']) == ['add', 'divide', 'add']
+
+def test_clear_empties_buffer():
+    """Test that clearing drops buffered rows."""
+    buffer = HistoryBuffer()
+    buffer.append({'operation': 'add', 'a': 1, 'b': 1, 'result': 2})
+    buffer.clear()
+
+    assert len(buffer) == 0
+    assert buffer.to_dataframe().empty
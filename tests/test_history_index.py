@@ -0,0 +1,57 @@
+"""
+Unit tests for the history secondary indexes.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from app.history_index import HistoryIndex, SortedColumn
+
+@pytest.fixture
+def frame():
+    """Fixture with a mix of operations, a NaN result and an exact big int."""
+    return pd.DataFrame({
+        'operation': ['add', 'divide', 'divide', 'multiply', 'divide', 'factorial'],
+        'a': [1, 4e6, 3, 2, -5, 30],
+        'b': [2, 2, 0, 8, 1, None],
+        'result': [3, 2e6, None, 16, -5, 2**107],
+    })
+
+def _scan(frame, operation=None, **ranges):
+    mask = pd.Series(True, index=frame.index)
+    if operation is not None:
+        mask &= frame['operation'] == operation
+    for column, (low, high) in ranges.items():
+        values = frame[column].astype(float)
+        mask &= values.between(-np.inf if low is None else low, np.inf if high is None else high)
+    return list(np.flatnonzero(mask.to_numpy()))
+
+def test_sorted_column_merges_tail():
+    """Test that range lookups see both merged and pending values."""
+    column = SortedColumn(merge_threshold=2)
+    for row, value in enumerate([5.0, 1.0, float('nan'), 3.0, 9.0]):
+        column.add(value, row)
+    assert sorted(column.rows_between(2.0, 9.0).tolist()) == [0, 3, 4]
+    column.flush()
+    assert list(column.values) == [1.0, 3.0, 5.0, 9.0]
+
+@pytest.mark.parametrize('conditions', [
+    {'operation': 'divide'},
+    {'operation': 'divide', 'result': (1e6, None)},
+    {'a': (0, 10)},
+    {'a': (0, None), 'b': (2, 2)},
+    {'result': (None, 0)},
+    {'operation': 'missing'},
+    {},
+])
+def test_query_matches_full_scan(frame, conditions):
+    """Test indexed queries against a plain boolean-mask scan."""
+    index = HistoryIndex.from_frame(frame)
+    assert index.query(**conditions).tolist() == _scan(frame, **conditions)
+
+def test_add_keeps_index_in_sync(frame):
+    """Test that appended records are queryable without a rebuild."""
+    index = HistoryIndex.from_frame(frame)
+    index.add({'operation': 'divide', 'a': 8, 'b': 4, 'result': 2})
+    assert index.query(operation='divide', a=(0, 10)).tolist() == [2, 6]
+    assert index.query(result=(2**100, None)).tolist() == [5]
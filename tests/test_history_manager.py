@@ -2,6 +2,7 @@
 Unit tests for the HistoryManager class.
 """
 
+import os
 import pytest
 from app.history_manager import HistoryManager
 
@@ -59,3 +60,113 @@ def test_invalid_record(history_manager):
     # The history should not contain the invalid record
     history = history_manager.get_history()
     assert 'None' not in history
+
+@pytest.fixture
+def journal_manager(tmp_path):
+    """Fixture to create a journaling HistoryManager with a temporary file."""
+    temp_file = tmp_path / "temp_calculation_history.csv"
+    return HistoryManager(history_file=str(temp_file), journal=True)
+
+def test_journal_appends_without_rewriting_snapshot(journal_manager):
+    """Test that journal mode appends records instead of rewriting the snapshot."""
+    journal_manager.record({'operation': 'add', 'a': 1, 'b': 2, 'result': 3})
+    journal_manager.record({'operation': 'multiply', 'a': 2, 'b': 4, 'result': 8})
+
+    with open(journal_manager.journal_file, encoding='utf-8') as journal:
+        # Each line starts with the record's timestamp
+        lines = [line.split(',', 1)[1] for line in journal.read().splitlines()]
+    assert lines == ['add,1.0,2.0,3.0,', 'multiply,2.0,4.0,8.0,']
+    assert not os.path.exists(journal_manager.history_file)
+
+def test_journal_reload_rebuilds_from_snapshot_and_journal(journal_manager):
+    """Test that loading combines the snapshot with the journal."""
+    journal_manager.record({'operation': 'add', 'a': 1, 'b': 2, 'result': 3})
+    journal_manager.compact()
+    journal_manager.record({'operation': 'divide', 'a': 9, 'b': 3, 'result': 3})
+
+    reloaded = HistoryManager(history_file=journal_manager.history_file, journal=True)
+    assert list(reloaded.history['operation']) == ['add', 'divide']
+
+def test_compact_merges_journal_into_snapshot(journal_manager):
+    """Test that compaction writes every record to the snapshot and removes the journal."""
+    journal_manager.record({'operation': 'subtract', 'a': 5, 'b': 3, 'result': 2})
+    journal_manager.compact()
+
+    assert not os.path.exists(journal_manager.journal_file)
+    snapshot = HistoryManager(history_file=journal_manager.history_file)
+    assert list(snapshot.history['operation']) == ['subtract']
+
+def test_history_dataframe_is_cached_until_next_append(journal_manager):
+    """Test that the materialized DataFrame is reused until a new record arrives."""
+    journal_manager.record({'operation': 'add', 'a': 1, 'b': 2, 'result': 3})
+    first = journal_manager.history
+    assert journal_manager.history is first
+
+    journal_manager.record({'operation': 'add', 'a': 2, 'b': 2, 'result': 4})
+    assert len(journal_manager.history) == 2
+
+def test_flush_writes_pending_records_when_autosave_is_off(journal_manager):
+    """Test that records are only written on flush when autosave is disabled."""
+    journal_manager.autosave = False
+    journal_manager.record({'operation': 'add', 'a': 1, 'b': 2, 'result': 3})
+    assert not os.path.exists(journal_manager.journal_file)
+
+    journal_manager.flush()
+    with open(journal_manager.journal_file, encoding='utf-8') as journal:
+        assert journal.read().split(',', 1)[1] == 'add,1.0,2.0,3.0,\n'
+
+def test_record_many_skips_invalid_records(history_manager):
+    """Test that bulk recording keeps valid records and drops invalid ones."""
+    history_manager.record_many([
+        {'operation': 'add', 'a': 1, 'b': 2, 'result': 3},
+        {'operation': 'add', 'a': 1, 'b': None, 'result': None},
+        {'operation': 'add', 'a': 2, 'b': 2, 'result': 4},
+    ])
+    assert list(history_manager.history['result']) == [3, 4]
+
+def test_record_many_reports_records_that_fail_to_normalize(history_manager, capsys):
+    """Test that a record that does not fit the schema is reported without losing the others."""
+    history_manager.record_many([
+        {'operation': 'add', 'a': 1, 'b': 2, 'result': 3},
+        {'operation': 'calc', 'a': 'ans', 'b': '', 'result': 1, 'detail': '{not json'},
+        {'operation': 'add', 'a': 2, 'b': 2, 'result': 4},
+    ])
+    assert 'Error recording history' in capsys.readouterr().out
+    assert list(HistoryManager(history_file=history_manager.history_file).history['result']) == [3, 4]
+
+def test_binary_backend(tmp_path):
+    """Test recording and reloading through the binary history backend."""
+    history_file = str(tmp_path / "history.csv")
+    manager = HistoryManager(history_file=history_file, backend='binary')
+    manager.record({'operation': 'add', 'a': 1, 'b': 2, 'result': 3})
+    manager.record({'operation': 'divide', 'a': 9, 'b': 3, 'result': 3})
+
+    reloaded = HistoryManager(history_file=history_file, backend='binary')
+    assert list(reloaded.history['operation']) == ['add', 'divide']
+
+    reloaded.clear_history()
+    assert HistoryManager(history_file=history_file, backend='binary').history.empty
+
+def test_binary_backend_with_default_history_file(tmp_path, monkeypatch):
+    """Test that the binary backend works next to an existing CSV at the default path."""
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("data")
+    with open("data/calculation_history.csv", "w", encoding="utf-8") as csv_file:
+        csv_file.write("timestamp,operation,a,b,result,detail\n")
+    manager = HistoryManager(backend='binary')
+    manager.record({'operation': 'add', 'a': 1, 'b': 2, 'result': 3})
+
+    assert os.path.isdir("data/calculation_history.csv.bin")
+    assert list(HistoryManager(backend='binary').history['result']) == [3.0]
+
+def test_query_uses_index_and_sees_new_records(history_manager):
+    """Test HistoryManager.query before and after appends."""
+    history_manager.record_many([
+        {'operation': 'divide', 'a': 4e6, 'b': 2, 'result': 2e6},
+        {'operation': 'add', 'a': 1, 'b': 2, 'result': 3},
+    ])
+    assert list(history_manager.query(operation='divide', result=(1e6, None))['a']) == [4e6]
+
+    history_manager.record({'operation': 'divide', 'a': 9e6, 'b': 3, 'result': 3e6})
+    assert list(history_manager.query(operation='divide', result=(1e6, None))['a']) == [4e6, 9e6]
+    assert len(history_manager.query(a=(None, 2))) == 1
@@ -0,0 +1,66 @@
+"""
+Unit tests for the streaming HistoryReader.
+"""
+
+import pytest
+from app.history_manager import HistoryManager
+from app.history_reader import HistoryReader, tail_lines
+from app.history_schema import COLUMNS
+
+A = COLUMNS.index('a')
+
+def _records(count, start=0):
+    return [{'operation': 'add', 'a': n, 'b': 1, 'result': n + 1} for n in range(start, start + count)]
+
+@pytest.fixture
+def journal_manager(tmp_path):
+    """Fixture with rows in the snapshot, the journal and the unflushed buffer."""
+    manager = HistoryManager(history_file=str(tmp_path / "history.csv"), journal=True)
+    manager.record_many(_records(5))
+    manager.compact()
+    manager.record_many(_records(3, start=5))
+    manager.autosave = False
+    manager.record_many(_records(2, start=8))
+    return manager
+
+def test_tail_lines_reads_backwards_in_blocks(tmp_path):
+    """Test the reverse block reader with blocks smaller than a line."""
+    path = tmp_path / "lines.csv"
+    path.write_text("header\n" + "".join(f"row{n}\n" for n in range(100)), encoding="utf-8")
+
+    assert tail_lines(str(path), 3, block_size=4) == ["row97\n", "row98\n", "row99\n"]
+    assert tail_lines(str(path), 1000, skip_header=True)[0] == "row0\n"
+
+def test_tail_spans_snapshot_journal_and_pending(journal_manager):
+    """Test that tail stitches rows from every source in order."""
+    rows = HistoryReader(journal_manager).tail(7)
+    assert [row[A] for row in rows] == ['3.0', '4.0', '5.0', '6.0', '7.0', '8.0', '9.0']
+
+def test_head_page_and_since(journal_manager):
+    """Test the forward views."""
+    reader = HistoryReader(journal_manager)
+    assert [row[A] for row in reader.head(2)] == ['0.0', '1.0']
+    assert [row[A] for row in reader.page(2, 4)] == ['4.0', '5.0', '6.0', '7.0']
+    assert [row[A] for row in reader.since(8)] == ['8.0', '9.0']
+
+def test_tail_does_not_load_the_dataframe(journal_manager):
+    """Test that tail reads the files without materializing the history."""
+    manager = HistoryManager(history_file=journal_manager.history_file, journal=True)
+    assert len(HistoryReader(manager).tail(3)) == 3
+    assert not manager.loaded
+
+def test_legacy_rows_are_padded(tmp_path):
+    """Test that rows of a file written before the schema come back in its column order."""
+    path = tmp_path / "history.csv"
+    path.write_text("operation,a,b,result\nadd,1,2,3\n", encoding="utf-8")
+    manager = HistoryManager(history_file=str(path))
+    assert HistoryReader(manager).tail(1) == [['', 'add', '1', '2', '3', '']]
+
+def test_binary_backend_views(tmp_path):
+    """Test head and tail on the memory-mapped binary backend."""
+    manager = HistoryManager(history_file=str(tmp_path / "history.csv"), backend='binary')
+    manager.record_many(_records(6))
+    reader = HistoryReader(manager)
+
+    assert [row[A] for row in reader.tail(2)] == ['4.0', '5.0']
+    assert [row[A] for row in reader.page(2, 2)] == ['2.0', '3.0']
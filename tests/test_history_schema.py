@@ -0,0 +1,115 @@
+"""
+Unit tests for the history schema, its enforcement and the migration of old files.
+"""
+
+import math
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from app import history_schema
+from app.history_manager import HistoryManager
+from app.history_schema import COLUMNS, exact_value, normalize
+
+LEGACY_CSV = (
+    "operation,a,b,result\n"
+    "add,10,5,15\n"
+    "square_root,16,,4.0\n"
+    "calc,sqrt(16) + 1,,5.0\n"
+    f"factorial,25,,{math.factorial(25)}\n"
+)
+
+@pytest.fixture
+def legacy_file(tmp_path):
+    """Fixture for a history CSV written before the schema."""
+    path = tmp_path / "history.csv"
+    path.write_text(LEGACY_CSV, encoding="utf-8")
+    return str(path)
+
+def _assert_schema(frame):
+    assert list(frame.columns) == COLUMNS
+    assert frame['timestamp'].dtype == 'datetime64[ns]'
+    assert isinstance(frame['operation'].dtype, pd.CategoricalDtype)
+    for column in ('a', 'b', 'result'):
+        assert frame[column].dtype == np.float64
+
+def test_normalize_moves_text_to_detail():
+    """Test that tokens become floats, missing operands NaN and text goes to detail."""
+    record = normalize({'operation': 'calc', 'a': 'ans * 2', 'b': '', 'result': 10.0}, 123)
+    assert record['timestamp'] == 123
+    assert math.isnan(record['a']) and math.isnan(record['b'])
+    assert record['result'] == 10.0
+    assert record['detail'] == '{"a": "ans * 2"}'
+    assert normalize({'operation': 'add', 'a': '10', 'b': '5', 'result': 15.0}, 1)['detail'] == ''
+
+def test_large_integers_keep_nearest_float_and_exact_text():
+    """Test that an integer beyond float precision is kept both ways."""
+    big = 2 ** 100 + 1
+    record = normalize({'operation': 'power', 'a': '2', 'b': '100', 'result': big}, 1)
+    assert record['result'] == float(big)
+    assert record['detail'] == f'{{"result": "{big}"}}'
+
+def test_integers_beyond_float_range_are_recorded(tmp_path):
+    """Test that an integer too large for a float is recorded as inf with its exact digits."""
+    history_file = str(tmp_path / "history.csv")
+    manager = HistoryManager(history_file=history_file)
+    manager.record({'operation': 'power', 'a': '10', 'b': '400', 'result': 10 ** 400})
+    manager.record({'operation': 'multiply', 'a': '-1', 'b': '1e400', 'result': -10 ** 400})
+    for history in (manager.history, HistoryManager(history_file=history_file).history):
+        assert history['result'].tolist() == [math.inf, -math.inf]
+        assert exact_value(history, 0, 'result') == 10 ** 400
+        assert exact_value(history, 1, 'result') == -10 ** 400
+
+def test_legacy_file_with_integers_beyond_float_range(tmp_path):
+    """Test that an old CSV holding a 400-digit result loads and migrates."""
+    path = tmp_path / "history.csv"
+    path.write_text(f"operation,a,b,result\nfactorial,200,,{math.factorial(200)}\n", encoding="utf-8")
+    history = HistoryManager(history_file=str(path)).history
+    assert history['result'].tolist() == [math.inf]
+    assert exact_value(history, 0, 'result') == math.factorial(200)
+    assert history_schema.migrate(str(path))
+    assert exact_value(history_schema.read_csv(str(path)), 0, 'result') == math.factorial(200)
+
+def test_recorded_history_has_schema_dtypes(tmp_path):
+    """Test that records are enforced to the schema, in memory and after reloading."""
+    history_file = str(tmp_path / "history.csv")
+    manager = HistoryManager(history_file=history_file)
+    manager.record({'operation': 'add', 'a': '10', 'b': '5', 'result': 15.0})
+    manager.record({'operation': 'square_root', 'a': '16', 'b': '', 'result': 4.0})
+    for history in (manager.history, HistoryManager(history_file=history_file).history):
+        _assert_schema(history)
+        assert history['b'].isna().tolist() == [False, True]
+        assert history['timestamp'].notna().all()
+
+def test_legacy_file_is_conformed_on_load(legacy_file):
+    """Test that an old CSV with text operands loads with the schema's dtypes."""
+    history = HistoryManager(history_file=legacy_file).history
+    _assert_schema(history)
+    assert history['timestamp'].isna().all()
+    assert history['a'].tolist()[:2] == [10.0, 16.0]
+    assert np.isnan(history.at[2, 'a'])
+    assert exact_value(history, 2, 'a') == 'sqrt(16) + 1'
+    assert exact_value(history, 3, 'result') == math.factorial(25)
+
+def test_appending_to_legacy_file_migrates_it(legacy_file):
+    """Test that the first append rewrites an old CSV in the new layout and keeps a backup."""
+    manager = HistoryManager(history_file=legacy_file)
+    manager.record({'operation': 'multiply', 'a': '2', 'b': '3', 'result': 6.0})
+    assert history_schema.file_columns(legacy_file) == COLUMNS
+    with open(f"{legacy_file}.bak", encoding="utf-8") as backup:
+        assert backup.read() == LEGACY_CSV
+    history = HistoryManager(history_file=legacy_file).history
+    assert list(history['operation']) == ['add', 'square_root', 'calc', 'factorial', 'multiply']
+    assert exact_value(history, 3, 'result') == math.factorial(25)
+
+def test_migrate_journal(tmp_path):
+    """Test the migration of a headerless journal, and that a current file is left alone."""
+    journal = tmp_path / "history.csv.journal"
+    journal.write_text("add,1,2,3\ncalc,1 + 1,,2.0\n", encoding="utf-8")
+    assert history_schema.main(['migrate', str(journal)]) == 0
+    frame = history_schema.read_csv(str(journal), header=False)
+    _assert_schema(frame)
+    assert exact_value(frame, 1, 'a') == '1 + 1'
+    os.remove(f"{journal}.bak")
+    assert not history_schema.migrate(str(journal), header=False)
+    assert not os.path.exists(f"{journal}.bak")
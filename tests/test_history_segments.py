@@ -0,0 +1,105 @@
+"""
+Unit tests for multi-writer history segments.
+"""
+
+import multiprocessing
+import os
+import pytest
+from app.history_manager import HistoryManager
+from app.history_reader import HistoryReader
+from app.history_segments import SegmentedHistory
+
+WRITERS = 4
+RECORDS = 200
+
+@pytest.fixture
+def history_file(tmp_path):
+    """Fixture for a history file path in a temporary directory."""
+    return str(tmp_path / "history.csv")
+
+def _write_segment(history_file, name, rows):
+    segments = SegmentedHistory(history_file)
+    segments.name = name
+    segments.append(rows)
+
+def _record(history_file, writer, count):
+    manager = HistoryManager(history_file=history_file, multi_writer=True)
+    for number in range(count):
+        manager.record({'operation': 'add', 'a': float(writer), 'b': float(number), 'result': float(writer + number)})
+    manager.close()
+
+def _run_writers(history_file, compact=False):
+    processes = [multiprocessing.Process(target=_record, args=(history_file, writer, RECORDS))
+                 for writer in range(WRITERS)]
+    for process in processes:
+        process.start()
+    compactor = HistoryManager(history_file=history_file, multi_writer=True)
+    while compact and any(process.is_alive() for process in processes):
+        compactor.compact()
+    for process in processes:
+        process.join(60)
+        assert process.exitcode == 0
+
+def _rows(history):
+    return sorted(zip(history['a'].astype(float), history['b'].astype(float)))
+
+def test_segments_merge_by_timestamp(history_file):
+    """Test that rows from several segments are read back in timestamp order."""
+    _write_segment(history_file, "host-1.csv", [[10, 'add', 1, 1, 2, ''], [30, 'add', 3, 3, 6, '']])
+    _write_segment(history_file, "host-2.csv", [[20, 'add', 2, 2, 4, ''], [40, 'add', 4, 4, 8, '']])
+    manager = HistoryManager(history_file=history_file, multi_writer=True)
+    assert list(manager.history['a']) == [1.0, 2.0, 3.0, 4.0]
+    reader = HistoryReader(manager)
+    assert [row[2] for row in reader.since(0)] == ['1', '2', '3', '4']
+    assert [row[2] for row in reader.tail(3)] == ['2', '3', '4']
+
+def test_incomplete_rows_are_skipped(history_file):
+    """Test that a partial row left by a crashed writer is ignored."""
+    _write_segment(history_file, "host-1.csv", [[10, 'add', 1, 1, 2, ''], [20, 'add', 2, 2]])
+    manager = HistoryManager(history_file=history_file, multi_writer=True)
+    assert len(manager.history) == 1
+
+def test_records_go_to_own_segment(history_file):
+    """Test that a process appends to its own segment, not to the shared snapshot."""
+    manager = HistoryManager(history_file=history_file, multi_writer=True)
+    manager.record({'operation': 'add', 'a': 1, 'b': 2, 'result': 3})
+    assert not os.path.exists(history_file)
+    assert manager.segments.paths() == [manager.segments.path]
+    assert os.path.basename(manager.segments.path).endswith(f"-{os.getpid()}.csv")
+
+def test_compact_merges_segments(history_file):
+    """Test that compaction folds all segments into the snapshot and removes them."""
+    _write_segment(history_file, "host-1.csv", [[10, 'add', 1, 1, 2, '']])
+    manager = HistoryManager(history_file=history_file, multi_writer=True)
+    manager.record({'operation': 'add', 'a': 2, 'b': 2, 'result': 4})
+    manager.compact()
+    assert manager.segments.paths() == []
+    assert list(HistoryManager(history_file=history_file).history['a']) == [1.0, 2.0]
+    assert len(manager.history) == 2
+
+def test_clear_removes_segments(history_file):
+    """Test that clearing the history removes every process's segment."""
+    _write_segment(history_file, "host-1.csv", [[10, 'add', 1, 1, 2, '']])
+    manager = HistoryManager(history_file=history_file, multi_writer=True)
+    manager.clear_history()
+    assert manager.segments.paths() == []
+    assert HistoryManager(history_file=history_file, multi_writer=True).history.empty
+
+def test_binary_backend_rejected(history_file):
+    """Test that multi-writer mode is only available with the csv backend."""
+    with pytest.raises(ValueError):
+        HistoryManager(history_file=history_file, backend='binary', multi_writer=True)
+
+def test_concurrent_writers_lose_no_rows(history_file):
+    """Stress test: several processes record at once and every row survives exactly once."""
+    _run_writers(history_file)
+    history = HistoryManager(history_file=history_file, multi_writer=True).history
+    assert _rows(history) == sorted((float(w), float(n)) for w in range(WRITERS) for n in range(RECORDS))
+
+def test_compaction_during_writes_loses_no_rows(history_file):
+    """Stress test: compacting while processes record neither loses nor duplicates rows."""
+    _run_writers(history_file, compact=True)
+    manager = HistoryManager(history_file=history_file, multi_writer=True)
+    manager.compact()
+    history = HistoryManager(history_file=history_file).history
+    assert _rows(history) == sorted((float(w), float(n)) for w in range(WRITERS) for n in range(RECORDS))
@@ -0,0 +1,108 @@
+"""
+Unit tests for the write-behind HistoryWriter and atomic history flushes.
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import time
+import pytest
+from app.history_manager import HistoryManager
+
+RECORD = {'operation': 'add', 'a': 1.0, 'b': 2.0, 'result': 3.0}
+
+@pytest.fixture
+def history_file(tmp_path):
+    """Fixture for a history file path in a temporary directory."""
+    return str(tmp_path / "history.csv")
+
+def _lines(path):
+    with open(path, encoding='utf-8') as file:
+        return file.read().splitlines()
+
+def test_writer_groups_records(history_file):
+    """Test that a burst of records is written in a few groups, not one write per record."""
+    manager = HistoryManager(history_file=history_file, journal=True)
+    writer = manager.start_writer(max_batch=100, max_delay=1.0)
+    for _ in range(250):
+        manager.record(RECORD)
+    manager.close()
+    assert len(_lines(manager.journal_file)) == 250
+    assert writer.flushes <= 4
+    assert manager.writer is None
+
+def test_writer_flushes_after_delay(history_file):
+    """Test that a small group is written once max_delay has passed."""
+    manager = HistoryManager(history_file=history_file, journal=True)
+    writer = manager.start_writer(max_batch=100, max_delay=0.01)
+    manager.record(RECORD)
+    deadline = time.monotonic() + 5
+    while not writer.flushes and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert writer.flushes == 1
+    assert len(_lines(manager.journal_file)) == 1
+    manager.close()
+
+def test_writer_enables_fsync(history_file, monkeypatch):
+    """Test that write-behind mode syncs each group to disk."""
+    synced = []
+    original_fsync = os.fsync
+    monkeypatch.setattr(os, 'fsync', lambda fd: synced.append(fd) or original_fsync(fd))
+    manager = HistoryManager(history_file=history_file, journal=True)
+    manager.start_writer()
+    manager.record(RECORD)
+    manager.close()
+    assert manager.fsync
+    assert synced
+
+def test_snapshot_flush_appends_atomically(history_file):
+    """Test that CSV flushes extend the snapshot through a temporary file."""
+    manager = HistoryManager(history_file=history_file)
+    manager.record(RECORD)
+    manager.record({'operation': 'multiply', 'a': 2.0, 'b': 3.0, 'result': 6.0})
+    lines = _lines(history_file)
+    assert lines[0] == 'timestamp,operation,a,b,result,detail'
+    assert len(lines) == 3
+    assert not os.path.exists(f"{history_file}.tmp")
+    assert len(HistoryManager(history_file=history_file).history) == 2
+
+def test_failed_flush_keeps_file_and_records(history_file, monkeypatch):
+    """Test that a failed rename leaves the old snapshot intact and the records pending."""
+    manager = HistoryManager(history_file=history_file)
+    manager.record(RECORD)
+    before = _lines(history_file)
+
+    def fail(source, destination):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, 'replace', fail)
+    manager.record(RECORD)
+    assert _lines(history_file) == before
+    assert len(manager.pending) == 1
+
+    monkeypatch.undo()
+    manager.flush()
+    assert len(_lines(history_file)) == 3
+    assert not manager.pending
+
+@pytest.mark.skipif(not hasattr(signal, 'SIGTERM') or os.name == 'nt', reason="POSIX signals only")
+def test_sigterm_drains_queue(tmp_path):
+    """Test that queued records are written when the REPL is terminated with SIGTERM."""
+    history_file = str(tmp_path / "history.csv")
+    env = dict(os.environ, HISTORY_FILE=history_file, HISTORY_JOURNAL='true', HISTORY_WRITE_BEHIND='true',
+               HISTORY_WRITE_DELAY_MS='60000', HISTORY_WRITE_BATCH='1000000', PYTHONUNBUFFERED='1')
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    process = subprocess.Popen([sys.executable, 'main.py'], cwd=root, env=env, text=True,
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    process.stdin.write("add 1 2\n" * 50 + "menu\n")
+    process.stdin.flush()
+    output = ''
+    # The menu is printed after the 50 additions have been executed
+    while '=== Available Commands ===' not in output:
+        line = process.stdout.readline()
+        assert line, "REPL exited early"
+        output += line
+    process.send_signal(signal.SIGTERM)
+    assert process.wait(timeout=10) == 128 + signal.SIGTERM
+    assert len(_lines(history_file + '.journal')) == 50
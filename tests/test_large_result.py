@@ -0,0 +1,49 @@
+"""
+Unit tests for large integer result summaries.
+"""
+
+import math
+import sys
+import pytest
+from app.large_result import LargeResult, LargeResultStore, to_decimal_string
+
+@pytest.fixture(autouse=True)
+def unlimited_int_text(monkeypatch):
+    """Fixture lifting the int-to-str digit limit so tests can compare against str()."""
+    if hasattr(sys, 'set_int_max_str_digits'):
+        limit = sys.get_int_max_str_digits()
+        sys.set_int_max_str_digits(0)
+        yield
+        sys.set_int_max_str_digits(limit)
+    else:
+        yield
+
+@pytest.mark.parametrize('value', [
+    math.factorial(3000), -(3 ** 5000), 10 ** 400, 10 ** 400 - 1, 2 ** 50 * 10 ** 300, 12345 * 10 ** 300,
+], ids=['factorial', 'negative', 'power_of_ten', 'nines', 'trailing_zeros', 'short_leading'])
+def test_summary_matches_decimal_text(value):
+    """Test digit count, edge digits and the full conversion against str()."""
+    text = str(abs(value))
+    large = LargeResult(value)
+    assert large.digits == len(text)
+    assert large.leading == text[:20]
+    assert large.trailing == text[-20:]
+    assert large.full() == str(value)
+    assert f"({len(text)} digits; sha256:" in str(large)
+
+def test_to_decimal_string_small_values():
+    """Test the conversion below the split threshold."""
+    assert to_decimal_string(0) == '0'
+    assert to_decimal_string(-42) == '-42'
+
+def test_store_wraps_only_large_ints_and_reloads_blobs(tmp_path):
+    """Test the threshold and the blob round trip by hash prefix."""
+    store = LargeResultStore(threshold_digits=50, blob_dir=str(tmp_path / "blobs"))
+    assert store.wrap(10 ** 40) == 10 ** 40
+    assert store.wrap(1e300) == 1e300
+    large = store.wrap(10 ** 60 + 7)
+    assert isinstance(large, LargeResult)
+
+    reloaded = LargeResultStore(threshold_digits=50, blob_dir=str(tmp_path / "blobs")).find(large.sha256[:12])
+    assert reloaded.value == 10 ** 60 + 7
+    assert store.find('ffff' if not large.sha256.startswith('ffff') else '0000') is None
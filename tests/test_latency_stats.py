@@ -0,0 +1,39 @@
+"""
+Unit tests for the latency histograms.
+"""
+
+import json
+import pytest
+from app.latency_stats import LatencyStats, LogHistogram
+
+@pytest.mark.parametrize('value', [0, 1, 15, 16, 17, 31, 32, 1000, 123_456_789])
+def test_bucket_bounds_contain_value(value):
+    """Test that every value falls inside the bounds of its bucket."""
+    low, high = LogHistogram.bucket_bounds(LogHistogram.bucket(value))
+    assert low <= value <= high
+    assert high - low <= max(value // 8, 0)
+
+def test_percentiles_are_within_bucket_precision():
+    """Test percentiles against exact values for a uniform spread."""
+    histogram = LogHistogram()
+    for value in range(1, 10_001):
+        histogram.record(value * 1000)
+    assert histogram.count == 10_000
+    assert 5_000_000 <= histogram.percentile(50) <= 5_000_000 * 1.125
+    assert 9_900_000 <= histogram.percentile(99) <= 9_900_000 * 1.125
+    assert histogram.percentile(100) == histogram.max == 10_000_000
+
+def test_record_call_and_dump(tmp_path):
+    """Test per-phase summaries and the JSON dump."""
+    stats = LatencyStats()
+    stats.record('add', 'parse', 500)
+    stats.record_call('add', 100, 2000, 0, 2100)
+    stats.record_call('add', 100, 3000, 40_000, 43_100)
+    summary = stats.summary()
+    assert list(summary['add']) == ['parse', 'dispatch', 'compute', 'record', 'total']
+    assert summary['add']['record']['count'] == 1
+    assert summary['add']['total']['max_ns'] == 43_100
+
+    path = tmp_path / "latency.json"
+    stats.dump(str(path))
+    assert json.loads(path.read_text())['add']['compute']['count'] == 2
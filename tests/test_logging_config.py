@@ -0,0 +1,74 @@
+"""
+Unit tests for the queue-based logging setup.
+"""
+
+import logging
+import pytest
+from app.logging_config import COMMAND_LOGGER, SamplingFilter, setup_logging, shutdown_logging
+
+@pytest.fixture
+def restore_root_level():
+    """Fixture that shuts logging down and restores the root level after a test."""
+    level = logging.getLogger().level
+    yield
+    shutdown_logging()
+    logging.getLogger().setLevel(level)
+
+def test_setup_is_idempotent_and_writes_on_shutdown(tmp_path, restore_root_level):
+    """Test that a second setup call is a no-op and queued records reach the file."""
+    log_file = tmp_path / "app.log"
+    listener = setup_logging(level='INFO', log_file=str(log_file))
+    assert setup_logging(level='DEBUG') is listener
+    assert logging.getLogger().level == logging.INFO
+
+    logging.info("value %s", 42)
+    shutdown_logging()
+    assert "INFO - value 42" in log_file.read_text()
+
+def test_log_file_rotates_by_size(tmp_path, restore_root_level):
+    """Test size-based rotation with the configured backup count."""
+    log_file = tmp_path / "app.log"
+    setup_logging(level='INFO', log_file=str(log_file), max_bytes=200, backup_count=2)
+    for n in range(50):
+        logging.info("record %d", n)
+    shutdown_logging()
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["app.log", "app.log.1", "app.log.2"]
+    assert "record 49" in log_file.read_text()
+
+def test_sampling_keeps_commands_together(tmp_path, restore_root_level):
+    """Test that sampling keeps one in N per-command records and every warning."""
+    log_file = tmp_path / "app.log"
+    setup_logging(level='INFO', log_file=str(log_file), sample_rate=0.25)
+    command_log = logging.getLogger(COMMAND_LOGGER)
+    for n in range(8):
+        command_log.info("Executing command: %d", n)
+        command_log.info("Recording operation: %d", n)
+    command_log.warning("slow command")
+    shutdown_logging()
+
+    text = log_file.read_text()
+    assert text.count("Executing command") == 2
+    assert "Executing command: 4" in text and "Recording operation: 4" in text
+    assert "slow command" in text
+
+def test_sampling_filter_passes_everything_at_rate_one():
+    """Test that a sampling interval of one keeps every record."""
+    sampler = SamplingFilter(1)
+    record = logging.makeLogRecord({'msg': 'x', 'levelno': logging.INFO})
+    assert all(sampler.filter(record) for _ in range(5))
+
+def test_errors_are_written_before_the_call_returns(tmp_path, restore_root_level):
+    """Test that an error reaches the log at once instead of after the listener's pause."""
+    log_file = tmp_path / "app.log"
+    setup_logging(level='INFO', log_file=str(log_file))
+    logging.info("queued")
+    logging.error("failed")
+    assert [line.split(" - ")[-1] for line in log_file.read_text().splitlines()] == ["queued", "failed"]
+
+def test_logging_module_is_not_patched(restore_root_level):
+    """Test that setup leaves the process-wide logging settings and other loggers alone."""
+    settings = (logging._srcfile, logging.logThreads, logging.logProcesses, logging.logMultiprocessing)
+    setup_logging(level='INFO')
+    assert (logging._srcfile, logging.logThreads, logging.logProcesses, logging.logMultiprocessing) == settings
+    assert 'findCaller' not in vars(logging.getLogger('other'))
@@ -0,0 +1,48 @@
+"""
+Unit tests for the operand parsing helpers in operands.py.
+"""
+
+import numpy as np
+import pytest
+from app.operands import parse_operand, divide_elementwise, summarize, to_builtin, zero_divisions
+
+def test_parse_scalar():
+    """Test that scalar tokens are converted to floats."""
+    assert parse_operand("2.5") == 2.5
+    assert parse_operand(3) == 3.0
+
+def test_parse_list_literal():
+    """Test parsing a list literal typed at the REPL."""
+    np.testing.assert_array_equal(parse_operand("[1,2,3]"), [1.0, 2.0, 3.0])
+
+def test_parse_range_literal():
+    """Test parsing a range literal typed at the REPL."""
+    np.testing.assert_array_equal(parse_operand("range(0,6,2)"), [0.0, 2.0, 4.0])
+    np.testing.assert_array_equal(parse_operand(range(3)), [0.0, 1.0, 2.0])
+
+def test_parse_invalid_literals():
+    """Test that malformed literals raise ValueError."""
+    with pytest.raises(ValueError, match="Invalid list literal"):
+        parse_operand("[1,2")
+    with pytest.raises(ValueError, match="Invalid range literal"):
+        parse_operand("range(a,b)")
+    with pytest.raises(ValueError):
+        parse_operand("invalid")
+
+def test_divide_elementwise_masks_zero_divisors():
+    """Test that division by zero is reported per element."""
+    result = divide_elementwise(np.array([1.0, 2.0, 3.0]), np.array([1.0, 0.0, 2.0]))
+    assert zero_divisions(result) == 1
+    assert to_builtin(result) == [1.0, None, 1.5]
+
+def test_summarize_is_compact():
+    """Test that large batches are summarized to a short string."""
+    summary = summarize(np.arange(100000, dtype=float))
+    assert summary.endswith("(n=100000)")
+    assert len(summary) < 80
+    assert summarize(4.0) == 4.0
+
+def test_to_builtin_summarizes_huge_ints():
+    """Test that ints too long for text output become their summary."""
+    assert to_builtin(2 ** 100) == 2 ** 100
+    assert "(15052 digits; sha256:" in to_builtin(2 ** 50000)
@@ -0,0 +1,74 @@
+"""
+Unit tests for the streaming Pipeline mode.
+"""
+
+import io
+import json
+import pytest
+from app.history_manager import HistoryManager
+from app.pipeline import Pipeline
+from app.repl import REPL
+
+@pytest.fixture
+def repl(tmp_path):
+    """Fixture to create a REPL that records history to a temporary file."""
+    repl = REPL()
+    repl.history_manager = HistoryManager(history_file=str(tmp_path / "history.csv"))
+    return repl
+
+def test_jsonl_output(repl):
+    """Test that each command produces one JSON line with its result or error."""
+    output = io.StringIO()
+    processed = Pipeline(repl, output).run(iter(["add 1 2", "", "divide 1 0", "unknown 1"]))
+
+    rows = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert processed == 3
+    assert rows[0] == {'line': 1, 'command': 'add', 'args': ['1', '2'], 'result': 3.0}
+    assert rows[1]['error'] == "Cannot divide by zero"
+    assert rows[2]['error'] == "Unknown command: unknown"
+
+def test_expression_lines(repl):
+    """Test that bare expressions are evaluated as in the REPL."""
+    output = io.StringIO()
+    Pipeline(repl, output).run(iter(["1+2*3", "ans / 7", "foo -1"]))
+
+    rows = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [row.get('result') for row in rows[:2]] == [7.0, 1.0]
+    assert rows[0]['command'] == 'calc'
+    assert rows[2]['error'] == "Unknown command: foo"
+
+def test_csv_output(repl):
+    """Test the CSV output format."""
+    output = io.StringIO()
+    Pipeline(repl, output, output_format='csv').run(iter(["multiply 2 3"]))
+
+    assert output.getvalue().splitlines() == ['line,command,args,result,error', '1,multiply,2 3,6.0,']
+
+def test_quit_stops_the_stream(repl):
+    """Test that 'quit' ends processing without exiting the interpreter."""
+    output = io.StringIO()
+    processed = Pipeline(repl, output).run(iter(["add 1 1", "quit", "add 2 2"]))
+    assert processed == 1
+
+def test_interactive_commands_are_rejected(repl):
+    """Test that prompt-only commands are reported as errors."""
+    output = io.StringIO()
+    Pipeline(repl, output).run(iter(["menu"]))
+    assert 'not available in stream mode' in json.loads(output.getvalue())['error']
+
+def test_history_is_flushed_in_batches(repl, monkeypatch):
+    """Test that history is written once per batch rather than once per line."""
+    flushes = []
+    original_flush = repl.history_manager.flush
+    monkeypatch.setattr(repl.history_manager, 'flush', lambda: flushes.append(1) or original_flush())
+
+    Pipeline(repl, io.StringIO(), flush_every=2).run(iter(["add 1 1"] * 5))
+
+    assert len(flushes) == 3  # after lines 2 and 4, then once at the end
+    reloaded = HistoryManager(history_file=repl.history_manager.history_file)
+    assert len(reloaded.history) == 5
+
+def test_invalid_format(repl):
+    """Test that an unknown output format is rejected."""
+    with pytest.raises(ValueError, match="Unknown output format"):
+        Pipeline(repl, io.StringIO(), output_format='xml')
@@ -2,6 +2,7 @@
 Unit tests for the PluginLoader class.
 """
 
+import os
 import pytest
 from app.plugin_loader import PluginLoader
 
@@ -16,6 +17,21 @@ def test_load_existing_plugin(plugin_loader):
     plugin_loader.load_plugin('example_plugin')
     assert 'example_plugin' in plugin_loader.plugins
 
+def test_default_plugin_dir_is_independent_of_cwd(tmp_path, monkeypatch):
+    """Test that the default plugin directory is found from the package, not the cwd."""
+    monkeypatch.chdir(tmp_path)
+    loader = PluginLoader()
+    assert os.path.samefile(loader.plugin_dir, os.path.join(os.path.dirname(__file__), '..', 'app', 'plugins'))
+    assert 'factorial' in loader.commands()
+
+def test_examples_and_fixtures_are_not_commands(plugin_loader):
+    """Test that *_plugin modules are left out of the manifest but can still be loaded by name."""
+    commands = plugin_loader.commands()
+    assert 'unknown_function' not in commands
+    assert commands['square'] == 'square'
+    assert not any(module.endswith('_plugin') for module in plugin_loader.scan())
+    assert plugin_loader.function_info('unknown_function', 'unknown_plugin')['params'] == ['number']
+
 def test_load_non_existing_plugin(plugin_loader):
     """Test loading a non-existing plugin."""
     with pytest.raises(ImportError):
@@ -45,3 +61,74 @@ def test_load_plugin_with_import_error(monkeypatch, plugin_loader):
 
     with pytest.raises(ImportError):
         plugin_loader.load_plugin('non_existing_plugin')
+
+@pytest.fixture
+def plugin_dir(tmp_path):
+    """Fixture to create a temporary plugin directory with two plugins."""
+    (tmp_path / "double.py").write_text(
+        "import math\n\ndef double(number):\n    \"\"\"Double a number.\"\"\"\n    return number * 2\n",
+        encoding="utf-8")
+    (tmp_path / "combine.py").write_text(
+        "def combine(a, b):\n    return a + b\n\ndef _helper():\n    pass\n", encoding="utf-8")
+    return tmp_path
+
+def test_scan_builds_manifest_without_importing(plugin_dir):
+    """Test that scanning lists public functions and their arity from source."""
+    manifest = PluginLoader(plugin_dir=str(plugin_dir)).scan()
+
+    assert manifest['double']['functions'] == {
+        'double': {'params': ['number'], 'arity': 1, 'doc': 'Double a number.'}}
+    assert list(manifest['combine']['functions']) == ['combine']
+    assert manifest['combine']['functions']['combine']['arity'] == 2
+
+def test_manifest_is_cached_on_disk(plugin_dir, monkeypatch):
+    """Test that unchanged plugins are not parsed again by a new loader."""
+    PluginLoader(plugin_dir=str(plugin_dir)).scan()
+    assert (plugin_dir / PluginLoader.MANIFEST_FILE).exists()
+
+    def fail_parse(path):
+        raise AssertionError(f"{path} should have come from the cache")
+
+    monkeypatch.setattr(PluginLoader, '_parse_functions', staticmethod(fail_parse))
+    assert 'double' in PluginLoader(plugin_dir=str(plugin_dir)).scan()
+
+def test_manifest_is_invalidated_when_a_plugin_changes(plugin_dir):
+    """Test that editing a plugin file refreshes its manifest entry."""
+    PluginLoader(plugin_dir=str(plugin_dir)).scan()
+    (plugin_dir / "double.py").write_text("def triple(number):\n    return number * 3\n", encoding="utf-8")
+
+    manifest = PluginLoader(plugin_dir=str(plugin_dir)).scan()
+    assert list(manifest['double']['functions']) == ['triple']
+
+def test_commands_prefer_module_named_after_function(plugin_loader):
+    """Test that duplicate function names resolve to the module of the same name."""
+    commands = plugin_loader.commands()
+    assert commands['square'] == 'square'
+    assert commands['square_root'] == 'square_root'
+    assert commands['sine'] == 'trig'
+    assert 'math' not in commands
+
+@pytest.fixture
+def plugin_package(tmp_path, monkeypatch):
+    """Fixture to create an importable plugin package with one plugin, 'scale'."""
+    package = f"plugins_{tmp_path.name}"
+    (tmp_path / package).mkdir()
+    (tmp_path / package / "__init__.py").write_text("", encoding="utf-8")
+    (tmp_path / package / "scale.py").write_text("def double(number):\n    return number * 2\n", encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    return PluginLoader(plugin_dir=str(tmp_path / package), package=package)
+
+def test_changed_plugins_are_reloaded(plugin_package):
+    """Test that an edited plugin is detected by mtime and re-imported with its new code."""
+    plugin_package.load_plugin('scale')
+    assert plugin_package.changed() == []
+
+    path = os.path.join(plugin_package.plugin_dir, "scale.py")
+    with open(path, 'w', encoding='utf-8') as source:
+        source.write("def double(number):\n    return number * 2.0\n\ndef triple(number):\n    return number * 3\n")
+    assert plugin_package.changed() == ['scale']
+
+    plugin_package.reload_plugin('scale')
+    assert plugin_package.changed() == []
+    assert plugin_package.plugins['scale'].triple(2) == 6
+    assert 'triple' in plugin_package.commands()
@@ -0,0 +1,105 @@
+"""
+Unit tests for the supervised plugin worker process.
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import pytest
+from app.history_manager import HistoryManager
+from app.plugin_worker import PluginTimeoutError, PluginWorker
+from app.repl import REPL
+
+@pytest.fixture
+def worker():
+    """Fixture for a worker with a short timeout, stopped after the test."""
+    worker = PluginWorker(timeout=1.0)
+    yield worker
+    worker.stop()
+
+def test_worker_is_reused(worker):
+    """Test that consecutive calls are served by the same process."""
+    assert worker.call('power', 'power', (2, 10)) == 1024.0
+    pid = worker.process.pid
+    for number in range(50):
+        assert worker.call('square', 'square', (number,)) == number ** 2
+    assert worker.process.pid == pid
+    assert worker.starts == 1
+
+def test_plugin_errors_are_reraised(worker):
+    """Test that an exception raised by the plugin reaches the caller with its type."""
+    with pytest.raises(ValueError, match="negative"):
+        worker.call('square_root', 'square_root', (-1,))
+    assert worker.call('square_root', 'square_root', (16,)) == 4.0
+    assert worker.starts == 1
+
+def test_timeout_kills_and_replaces_worker(worker):
+    """Test that a runaway call times out and the next call gets a fresh worker."""
+    with pytest.raises(PluginTimeoutError):
+        worker.call('factorial', 'factorial', (10 ** 8,))
+    assert worker.process is None
+    assert worker.call('factorial', 'factorial', (5,)) == 120
+    assert worker.starts == 2
+
+@pytest.fixture
+def supervised_repl(tmp_path):
+    """Fixture for a REPL whose plugin calls run in a worker with a short timeout."""
+    repl = REPL()
+    repl.history_manager = HistoryManager(history_file=str(tmp_path / "history.csv"))
+    repl.plugin_worker = PluginWorker(timeout=0.5)
+    yield repl
+    repl.plugin_worker.stop()
+
+def test_calc_honours_timeout(supervised_repl):
+    """Test that plugin calls inside an expression are supervised like direct commands."""
+    with pytest.raises(PluginTimeoutError):
+        supervised_repl.execute('calc', ['factorial(100000000)'])
+    assert supervised_repl.execute('calc', ['factorial(5)', '+', '1']) == 121
+    # One timeout, not a second one from folding the call at compile time
+    assert supervised_repl.plugin_worker.starts == 2
+
+def test_batch_and_sweep_honour_timeout(supervised_repl, tmp_path):
+    """Test that batch calls time out one by one and a sweep as a whole."""
+    assert supervised_repl.execute('batch', ['factorial', '5', '100000000']) == [120, None]
+    with pytest.raises(PluginTimeoutError, match="sweep factorial"):
+        supervised_repl.execute('sweep', ['factorial', '100000000', '100000001', '1'])
+    output = str(tmp_path / "square.csv")
+    assert supervised_repl.execute('sweep', ['square', '0', '3', '1', output]) == "[0,1,4,9] (n=4)"
+    assert os.path.exists(output)
+
+def test_progress_is_reported():
+    """Test that long calls report progress and clear it when they end."""
+    reports = []
+    worker = PluginWorker(timeout=0.5, progress=lambda name, elapsed: reports.append((name, elapsed)),
+                          progress_after=0.1, poll_interval=0.05)
+    try:
+        with pytest.raises(PluginTimeoutError):
+            worker.call('factorial', 'factorial', (10 ** 8,))
+    finally:
+        worker.stop()
+    assert len(reports) >= 2
+    assert all(name == 'factorial' for name, _ in reports)
+    assert reports[-1][1] is None
+
+@pytest.mark.skipif(os.name == 'nt', reason="POSIX signals only")
+def test_ctrl_c_cancels_call_and_keeps_session(tmp_path):
+    """Test that SIGINT during a plugin call cancels it and the REPL keeps running."""
+    env = dict(os.environ, HISTORY_FILE=str(tmp_path / "history.csv"), PLUGIN_TIMEOUT='60',
+               PLUGIN_PROGRESS_MS='100', PYTHONUNBUFFERED='1')
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    process = subprocess.Popen([sys.executable, 'main.py'], cwd=root, env=env, text=True,
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    process.stdin.write("factorial 100000000\n")
+    process.stdin.flush()
+    # Wait for the progress indicator, i.e. until the call is running in the worker
+    seen = ''
+    while 'running for' not in seen:
+        character = process.stderr.read(1)
+        assert character, "REPL exited early"
+        seen += character
+    process.send_signal(signal.SIGINT)
+    output, _ = process.communicate("add 1 2\nquit\n", timeout=30)
+    assert "Error: factorial cancelled" in output
+    assert "Result: 3.0" in output
+    assert process.returncode == 0
@@ -3,7 +3,7 @@ Unit tests for the power function in the power plugin.
 """
 
 import pytest
-from app.plugins.power import power
+from app.plugins.power import MAX_EXACT_BITS, power
 
 def test_power():
     """Test the power function for various inputs."""
@@ -29,3 +29,19 @@ def test_power():
     # Test string input should raise an error
     with pytest.raises(ValueError):
         power("base", "exponent")
+
+def test_power_large_whole_numbers_are_exact():
+    """Test that whole-number powers beyond float precision return exact ints."""
+    assert power(3, 40) == 3 ** 40
+    assert power(2, 5000) == 2 ** 5000
+    assert isinstance(power(2, 10), float)
+
+def test_power_exact_results_are_bounded():
+    """Test that exact powers stop at MAX_EXACT_BITS and larger ones raise OverflowError."""
+    assert power(2, MAX_EXACT_BITS) == 2 ** MAX_EXACT_BITS
+    with pytest.raises(OverflowError):
+        power(2, MAX_EXACT_BITS + 1)
+    with pytest.raises(OverflowError):
+        power(10, 1e7)
+    with pytest.raises(OverflowError):
+        power(2.5, 1e6)
@@ -2,7 +2,14 @@
 Comprehensive unit tests for the REPL class, covering all commands, plugins, and edge cases.
 """
 
+import math
+import os
+import subprocess
+import sys
 import pytest
+from app.history_manager import HistoryManager
+from app.history_schema import exact_value
+from app.plugin_loader import PluginLoader
 from app.repl import REPL
 
 @pytest.fixture
@@ -173,3 +180,292 @@ def test_quit_command(repl, monkeypatch):
 
     with pytest.raises(SystemExit):
         repl.start()
+
+def test_batch_command_records_one_entry(repl, monkeypatch, capsys, tmp_path):
+    """Test that an array command is recorded as a single compact history entry."""
+    repl.history_manager = HistoryManager(history_file=str(tmp_path / "history.csv"))
+    inputs = iter(["divide range(0,4) [1,0,2,0]", "quit"])
+    monkeypatch.setattr('builtins.input', lambda _: next(inputs))
+
+    try:
+        repl.start()
+    except SystemExit:
+        pass
+
+    captured = capsys.readouterr()
+    assert "division by zero in 2 of 4 elements" in captured.out
+    assert len(repl.history_manager.history) == 1
+    assert "(n=4)" in repl.history_manager.get_history()
+
+def test_batch_plugin_command(repl, monkeypatch, tmp_path):
+    """Test running a plugin over several inputs with one bulk history write."""
+    repl.history_manager = HistoryManager(history_file=str(tmp_path / "history.csv"))
+    writes = []
+    append_snapshot = repl.history_manager._append_snapshot
+    monkeypatch.setattr(repl.history_manager, '_append_snapshot',
+                        lambda records: writes.append(len(records)) or append_snapshot(records))
+    inputs = iter(["load_plugin factorial", "batch factorial 3 4 5", "quit"])
+    monkeypatch.setattr('builtins.input', lambda _: next(inputs))
+
+    try:
+        repl.start()
+    except SystemExit:
+        pass
+
+    assert list(repl.history_manager.history['result']) == [6, 24, 120]
+    assert writes == [3]
+
+def test_sweep_command(repl, monkeypatch, capsys, tmp_path):
+    """Test that a sweep writes its table and records a single history entry."""
+    repl.history_manager = HistoryManager(history_file=str(tmp_path / "history.csv"))
+    output = str(tmp_path / "sine.csv")
+    inputs = iter([f"sweep sine 0 360 0.5 {output}", "quit"])
+    monkeypatch.setattr('builtins.input', lambda _: next(inputs))
+
+    try:
+        repl.start()
+    except SystemExit:
+        pass
+
+    history = repl.history_manager.history
+    assert len(history) == 1
+    assert history['operation'][0] == 'sweep'
+    assert exact_value(history, 0, 'result').endswith("(n=721)")
+    assert len(open(output).read().splitlines()) == 722
+    assert f"Sweep written to {output}" in capsys.readouterr().out
+
+def test_plugin_results_are_cached(monkeypatch, capsys, tmp_path):
+    """Test that repeated plugin calls are served from the result cache when enabled."""
+    monkeypatch.setenv('RESULT_CACHE', 'true')
+    repl = REPL()
+    repl.history_manager = HistoryManager(history_file=str(tmp_path / "history.csv"))
+    inputs = iter(["load_plugin power", "power 2 10", "power 2 10", "cache_stats", "quit"])
+    monkeypatch.setattr('builtins.input', lambda _: next(inputs))
+
+    try:
+        repl.start()
+    except SystemExit:
+        pass
+
+    captured = capsys.readouterr()
+    assert "Hits: 1  Misses: 1  Hit rate: 50.0%" in captured.out
+    assert len(repl.history_manager.history) == 2
+
+def test_arithmetic_does_not_import_pandas(tmp_path):
+    """Test that startup and arithmetic in journal mode run without importing pandas."""
+    script = (
+        "import sys\n"
+        "from app.repl import REPL\n"
+        "repl = REPL()\n"
+        "repl.execute('add', ['1', '2'])\n"
+        "print('pandas' in sys.modules, 'numpy' in sys.modules)\n"
+    )
+    env = dict(os.environ, HISTORY_JOURNAL='true', HISTORY_FILE=str(tmp_path / "history.csv"))
+    completed = subprocess.run([sys.executable, '-c', script], env=env,
+                               capture_output=True, text=True, check=True)
+    assert completed.stdout.splitlines()[-1] == "False False"
+
+def test_plugin_commands_import_on_first_call(repl, monkeypatch, tmp_path):
+    """Test that plugin commands are available without load_plugin and import lazily."""
+    repl.history_manager = HistoryManager(history_file=str(tmp_path / "history.csv"))
+    imported = []
+    original_load = repl.plugin_loader.load_plugin
+    monkeypatch.setattr(repl.plugin_loader, 'load_plugin',
+                        lambda name: imported.append(name) or original_load(name))
+
+    assert 'factorial' in repl.commands
+    assert repl.execute('factorial', ['5']) == 120
+    repl.execute('factorial', ['3'])
+    assert imported == ['factorial']
+
+def test_changed_plugins_reload_before_next_call(monkeypatch, capsys, tmp_path):
+    """Test that editing a plugin re-registers its commands and drops its cached results."""
+    monkeypatch.setenv('RESULT_CACHE', 'true')
+    monkeypatch.setenv('PLUGIN_RELOAD_INTERVAL_MS', '0')
+    package = f"plugins_{tmp_path.name}"
+    plugin_dir = tmp_path / package
+    plugin_dir.mkdir()
+    (plugin_dir / "__init__.py").write_text("", encoding="utf-8")
+    plugin_file = plugin_dir / "scale.py"
+    plugin_file.write_text("def double(number):\n    return number * 2\n", encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr('app.repl.PluginLoader', lambda: PluginLoader(plugin_dir=str(plugin_dir), package=package))
+    repl = REPL()
+    repl.history_manager = HistoryManager(history_file=str(tmp_path / "history.csv"))
+
+    assert repl.execute('double', ['2']) == 4
+    plugin_file.write_text("def double(number):\n    return number * 20\n\ndef triple(number):\n    return number * 3\n",
+                           encoding="utf-8")
+    assert repl.execute('double', ['2']) == 40
+    assert repl.execute('triple', ['2']) == 6
+
+    plugin_file.write_text("def triple(number):\n    return number * 3.0\n", encoding="utf-8")
+    repl.execute('reload_plugins', [])
+    assert 'double' not in repl.commands
+    assert repl.execute('reload_plugins', []) == []
+    output = capsys.readouterr().out
+    assert "Reloaded plugins: scale" in output
+    assert "No plugin changes." in output
+
+def test_dispatch_reuses_registered_commands(repl, monkeypatch, tmp_path):
+    """Test that arithmetic dispatch uses the registry instead of the factory per line."""
+    repl.history_manager = HistoryManager(history_file=str(tmp_path / "history.csv"))
+
+    def fail_create(command_name, calculator):
+        raise AssertionError("CommandFactory.create should not run per command")
+
+    monkeypatch.setattr('app.command_factory.CommandFactory.create', fail_create)
+    assert repl.execute('add', ['1', '2']) == 3.0
+    assert repl.execute('multiply', ['2', '4']) == 8.0
+
+def test_history_tail_option(repl, monkeypatch, capsys, tmp_path):
+    """Test the paginated 'history --tail' view and its argument checking."""
+    repl.history_manager = HistoryManager(history_file=str(tmp_path / "history.csv"))
+    inputs = iter(["add 1 1", "add 2 2", "add 3 3", "history --tail 1", "history --tail x", "quit"])
+    monkeypatch.setattr('builtins.input', lambda _: next(inputs))
+
+    try:
+        repl.start()
+    except SystemExit:
+        pass
+
+    captured = capsys.readouterr()
+    history_output = captured.out.split("Calculation History:")[1]
+    assert "6.0" in history_output
+    assert "2.0" not in history_output.split("Error")[0]
+    assert "expects an integer" in captured.out
+
+def test_history_shows_recent_records_without_loading(repl, capsys, tmp_path):
+    """Test that plain 'history' reads only the last records and '--all' loads them all."""
+    history_file = str(tmp_path / "history.csv")
+    HistoryManager(history_file=history_file).record_many(
+        [{'operation': 'add', 'a': str(n), 'b': '1000', 'result': float(n + 1000)} for n in range(30)])
+    repl.history_manager = HistoryManager(history_file=history_file)
+    repl.history_show_rows = 5
+
+    repl.execute('history', [])
+    output = capsys.readouterr().out
+    assert not repl.history_manager.loaded
+    assert "1029.0" in output and "1025.0" in output and "1024.0" not in output
+    assert "'history --all'" in output
+
+    repl.execute('history', ['--all'])
+    assert repl.history_manager.loaded
+    assert "1024.0" in capsys.readouterr().out
+
+def test_history_all_matches_recent_view(repl, capsys, tmp_path):
+    """Test that 'history --all' formats rows like plain 'history': exact values, no raw columns."""
+    history_file = str(tmp_path / "history.csv")
+    HistoryManager(history_file=history_file).record_many([
+        {'operation': 'add', 'a': '1', 'b': '2', 'result': 3.0},
+        {'operation': 'calc', 'a': 'ans * 2', 'b': '', 'result': 6.0},
+        {'operation': 'factorial', 'a': '30', 'b': '', 'result': math.factorial(30)},
+    ])
+    repl.history_manager = HistoryManager(history_file=history_file)
+
+    repl.execute('history', [])
+    recent = capsys.readouterr().out
+    repl.execute('history', ['--all'])
+    everything = capsys.readouterr().out
+    assert everything == recent
+    assert str(math.factorial(30)) in everything and 'ans * 2' in everything
+    assert 'NaN' not in everything and 'timestamp' not in everything and '{' not in everything
+
+def test_query_command(repl, monkeypatch, capsys, tmp_path):
+    """Test the 'query' command filters and its condition parsing."""
+    repl.history_manager = HistoryManager(history_file=str(tmp_path / "history.csv"))
+    inputs = iter(["divide 4000000 2", "divide 3 1", "add 5 5",
+                   "query op=divide result>1e6", "query a<3", "query a~3", "quit"])
+    monkeypatch.setattr('builtins.input', lambda _: next(inputs))
+
+    try:
+        repl.start()
+    except SystemExit:
+        pass
+
+    captured = capsys.readouterr()
+    assert "1 matching record(s)" in captured.out
+    assert "0 matching record(s)" in captured.out
+    assert "Invalid query condition: a~3" in captured.out
+    assert repl._parse_query(['a>1', 'a<=5', 'limit=3'])[0]['a'][0] > 1
+
+def test_stats_command_reports_phases(repl, monkeypatch, capsys, tmp_path):
+    """Test that executed commands show up in 'stats' with their phases."""
+    repl.history_manager = HistoryManager(history_file=str(tmp_path / "history.csv"))
+    inputs = iter(["add 1 2", "add 2 2", "stats", "quit"])
+    monkeypatch.setattr('builtins.input', lambda _: next(inputs))
+
+    try:
+        repl.start()
+    except SystemExit:
+        pass
+
+    stats_output = capsys.readouterr().out.split("p99")[1]
+    assert "add" in stats_output
+    for phase in ('parse', 'dispatch', 'compute', 'record', 'total'):
+        assert phase in stats_output
+    assert repl.latency_stats.summary()['add']['total']['count'] == 2
+
+def test_stats_share_one_entry_for_unknown_commands(repl, monkeypatch):
+    """Test that mistyped command names do not each get their own histograms."""
+    inputs = iter(["foo", "bar 1", "baz", "quit"])
+    monkeypatch.setattr('builtins.input', lambda _: next(inputs))
+
+    try:
+        repl.start()
+    except SystemExit:
+        pass
+
+    summary = repl.latency_stats.summary()
+    assert summary['<unknown>']['parse']['count'] == 3
+    assert not {'foo', 'bar', 'baz'} & set(summary)
+
+def test_large_results_are_summarized(repl, monkeypatch, capsys, tmp_path):
+    """Test that a large factorial is printed and recorded as a summary and shown on request."""
+    repl.history_manager = HistoryManager(history_file=str(tmp_path / "history.csv"))
+    inputs = iter(["factorial 2000", "show_result", "quit"])
+    monkeypatch.setattr('builtins.input', lambda _: next(inputs))
+
+    try:
+        repl.start()
+    except SystemExit:
+        pass
+
+    output = capsys.readouterr().out
+    assert "Result: 33162750924506332411...00000000000000000000 (5736 digits; sha256:" in output
+    assert "\n3316275092450633241175393380576324038281117208105780394571935437060380779056008224002732" in output
+    history = repl.history_manager.history
+    recorded = exact_value(history, len(history) - 1, 'result')
+    assert recorded.startswith("33162750924506332411...") and len(recorded) < 100
+    assert history.at[len(history) - 1, 'result'] == math.inf
+    assert len(repl.history_manager.query(operation='factorial', result=(1e6, None))) == 1
+
+def test_expression_lines_record_one_entry(repl, monkeypatch, capsys, tmp_path):
+    """Test that typed expressions evaluate, support 'ans' and record one entry each."""
+    repl.history_manager = HistoryManager(history_file=str(tmp_path / "history.csv"))
+    inputs = iter(["sqrt(power(3,2)) + 4 / 2", "ans * 2", "calc 1 / 0", "quit"])
+    monkeypatch.setattr('builtins.input', lambda _: next(inputs))
+
+    try:
+        repl.start()
+    except SystemExit:
+        pass
+
+    output = capsys.readouterr().out
+    assert "Result: 5.0" in output and "Result: 10.0" in output
+    assert "Error: Cannot divide by zero" in output
+    history = repl.history_manager.history
+    assert list(history['operation']) == ['calc', 'calc']
+    assert [exact_value(history, row, 'a') for row in range(2)] == ['sqrt(power(3,2)) + 4 / 2', 'ans * 2']
+    assert list(history['result']) == [5.0, 10.0]
+
+@pytest.mark.parametrize('line, parsed', [
+    ("add 1 2", ('add', ['1', '2'])),
+    ("1+2*3", ('calc', ['1+2*3'])),
+    ("pi * 2", ('calc', ['pi', '*', '2'])),
+    ("foo -1", ('foo', ['-1'])),
+    ("   ", None),
+])
+def test_parse_line(repl, line, parsed):
+    """Test that bare expressions go to calc and a mistyped command stays a command."""
+    assert repl.parse_line(line) == parsed
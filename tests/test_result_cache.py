@@ -0,0 +1,51 @@
+"""
+Unit tests for the ResultCache class.
+"""
+
+import math
+from app.result_cache import ResultCache
+
+def test_hit_and_miss_counts():
+    """Test that lookups are counted as hits or misses."""
+    cache = ResultCache()
+    assert cache.get(('square', (2.0,))) is ResultCache.MISS
+    cache.put(('square', (2.0,)), 4.0)
+    assert cache.get(('square', (2.0,))) == 4.0
+
+    stats = cache.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+    assert stats['hit_rate'] == 0.5
+
+def test_lru_eviction_by_entry_count():
+    """Test that the least recently used entry is evicted first."""
+    cache = ResultCache(max_entries=2)
+    cache.put(('f', (1.0,)), 1)
+    cache.put(('f', (2.0,)), 2)
+    cache.get(('f', (1.0,)))
+    cache.put(('f', (3.0,)), 3)
+
+    assert cache.get(('f', (2.0,))) is ResultCache.MISS
+    assert cache.get(('f', (1.0,))) == 1
+    assert cache.stats()['evictions'] == 1
+
+def test_large_results_are_weighted_by_size():
+    """Test that the byte budget accounts for the size of big integers."""
+    big = math.factorial(10000)
+    cache = ResultCache(max_bytes=3000)
+    cache.put(('factorial', (5.0,)), 120)
+    cache.put(('factorial', (10000.0,)), big)
+
+    # 10000! alone is larger than the budget and is not cached at all
+    assert cache.get(('factorial', (10000.0,))) is ResultCache.MISS
+    assert cache.stats()['bytes'] < 3000
+
+def test_invalidate_by_function_name():
+    """Test dropping the cached results of a single function."""
+    cache = ResultCache()
+    cache.put(('sine', (90.0,)), 1.0)
+    cache.put(('cosine', (0.0,)), 1.0)
+    cache.invalidate({'sine'})
+
+    assert cache.get(('sine', (90.0,))) is ResultCache.MISS
+    assert cache.get(('cosine', (0.0,))) == 1.0
@@ -0,0 +1,98 @@
+"""
+Unit tests for the asyncio CalculatorServer.
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import pytest
+from app.history_manager import HistoryManager
+from app.plugin_worker import PluginWorker
+from app.repl import REPL
+from app.server import CalculatorServer
+
+@pytest.fixture
+def server(tmp_path):
+    """Fixture to create a server on an ephemeral port with a temporary history file."""
+    repl = REPL()
+    repl.history_manager = HistoryManager(history_file=str(tmp_path / "history.csv"), journal=True)
+    return CalculatorServer(repl, port=0)
+
+async def _request_lines(host, port, lines):
+    reader, writer = await asyncio.open_connection(host, port)
+    responses = []
+    for line in lines:
+        writer.write((line + '\n').encode('utf-8'))
+        await writer.drain()
+        responses.append(json.loads(await reader.readline()))
+    writer.close()
+    await writer.wait_closed()
+    return responses
+
+def test_json_and_text_requests(server):
+    """Test arithmetic, plugin and unknown commands over one connection."""
+    async def scenario():
+        host, port = await server.start()
+        responses = await _request_lines(host, port, [
+            'add 1 2',
+            json.dumps({'id': 'x', 'command': 'factorial', 'args': [5]}),
+            'history',
+        ])
+        await server.stop()
+        return responses
+
+    responses = asyncio.run(scenario())
+    assert responses[0] == {'result': 3.0}
+    assert responses[1] == {'result': 120, 'id': 'x'}
+    assert responses[2] == {'error': 'Unknown command: history'}
+
+def test_concurrent_clients_are_all_recorded(server):
+    """Test that records from concurrent clients all reach the history through the writer."""
+    async def scenario():
+        host, port = await server.start()
+        await asyncio.gather(*[
+            _request_lines(host, port, [f'add {client} {n}' for n in range(10)])
+            for client in range(10)
+        ])
+        await server.stop()
+
+    asyncio.run(scenario())
+    reloaded = HistoryManager(history_file=server.history_manager.history_file, journal=True)
+    assert len(reloaded.history) == 100
+
+def test_invalid_json_reports_error(server):
+    """Test that a malformed JSON request is answered with an error."""
+    async def scenario():
+        host, port = await server.start()
+        responses = await _request_lines(host, port, ['{"command": '])
+        await server.stop()
+        return responses
+
+    assert 'error' in asyncio.run(scenario())[0]
+
+def test_plugin_calls_honour_timeout(tmp_path):
+    """Test that server plugin calls run in supervised workers when the REPL has one."""
+    repl = REPL()
+    repl.history_manager = HistoryManager(history_file=str(tmp_path / "history.csv"), journal=True)
+    repl.plugin_worker = PluginWorker(timeout=0.5)
+    server = CalculatorServer(repl, port=0)
+
+    async def scenario():
+        host, port = await server.start()
+        responses = await _request_lines(host, port, ['factorial 100000000', 'factorial 5'])
+        await server.stop()
+        return responses
+
+    slow, fast = asyncio.run(scenario())
+    assert 'timed out' in slow['error']
+    assert fast['result'] == 120
+
+def test_main_does_not_import_server():
+    """Test that importing main leaves asyncio and the server to the --serve mode."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    script = "import sys, main\nprint('asyncio' in sys.modules, 'app.server' in sys.modules)\n"
+    completed = subprocess.run([sys.executable, '-c', script], cwd=root,
+                               capture_output=True, text=True, check=True)
+    assert completed.stdout.splitlines()[-1] == "False False"
@@ -0,0 +1,74 @@
+"""
+Unit tests for range sweeps over plugin functions.
+"""
+
+import math
+import numpy as np
+import pytest
+from app.plugins.square import square
+from app.plugins.square_root import square_root
+from app.plugins.trig import sine
+from app.sweep import chunks, grid_size, run_sweep
+
+def _values(func, start, stop, step, chunk_size=4):
+    return np.concatenate([y for _, y in chunks(func, start, stop, step, chunk_size)])
+
+@pytest.mark.parametrize('start, stop, step, expected', [
+    (0, 360, 0.01, 36001),
+    (0, 1, 0.3, 4),
+    (5, 5, 1, 1),
+    (10, 0, -2.5, 5),
+])
+def test_grid_size(start, stop, step, expected):
+    """Test that the grid includes stop when it falls on a step, despite rounding."""
+    assert grid_size(start, stop, step) == expected
+
+@pytest.mark.parametrize('start, stop, step', [(0, 1, 0), (0, 1, -1), (0, math.inf, 1)])
+def test_invalid_grid(start, stop, step):
+    """Test that a zero, backwards or infinite sweep is rejected."""
+    with pytest.raises(ValueError):
+        grid_size(start, stop, step)
+
+def test_vectorized_kernel_matches_function():
+    """Test that the NumPy kernel gives the same values as calling the function per point."""
+    expected = [sine(0.5 * i) for i in range(21)]
+    assert np.allclose(_values(sine, 0, 10, 0.5), expected)
+    assert np.array_equal(_values(square, 0, 10, 0.5), [square(0.5 * i) for i in range(21)])
+
+def test_loop_fallback():
+    """Test that functions without a kernel are called once per point."""
+    calls = []
+
+    def counter(x):
+        calls.append(x)
+        return 2 * x
+
+    assert list(_values(counter, 0, 9, 1)) == [2.0 * i for i in range(10)]
+    assert calls == [float(i) for i in range(10)]
+
+def test_kernel_errors_propagate():
+    """Test that a kernel rejecting its input fails the sweep like the scalar function would."""
+    with pytest.raises(ValueError):
+        run_sweep(square_root, -1, 1, 0.5)
+
+def test_summary():
+    """Test the history summary of a sweep's results."""
+    assert run_sweep(square, 1, 5, 1) == "[1,4,9,16,25] (n=5)"
+    assert run_sweep(square, 1, 100, 1, chunk_size=7) == "[1,4,9,...,9604,9801,10000] (n=100)"
+
+def test_npy_output(tmp_path):
+    """Test that a .npy output holds x and result columns for every point."""
+    path = str(tmp_path / "table.npy")
+    run_sweep(square, 0, 99, 1, output=path, chunk_size=16)
+    table = np.load(path)
+    assert table.shape == (100, 2)
+    assert np.array_equal(table[:, 0], np.arange(100.0))
+    assert np.array_equal(table[:, 1], np.arange(100.0) ** 2)
+
+def test_csv_output(tmp_path):
+    """Test that a CSV output has a header and one exact row per point."""
+    path = tmp_path / "table.csv"
+    run_sweep(sine, 0, 90, 45, output=str(path), column='sine', chunk_size=2)
+    lines = path.read_text().splitlines()
+    assert lines[0] == "x,sine"
+    assert [float(line.split(',')[1]) for line in lines[1:]] == [sine(0), sine(45), sine(90)]